@@ -0,0 +1,104 @@
+"""Alvo FastAPI do loadtest: app ASGI em processo (httpx), banco criado pelo Alembic"""
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+from loadtest import PASSWORD, SeedUser
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fastapi-backend")
+INSERT_BATCH_SIZE = 5000
+
+class Target:
+    name = "fastapi"
+    ROUTES = {
+        "login": ("POST", "/auth/login"),
+        "list_collections": ("GET", "/collections/?limit=50"),
+        "list_flashcards": ("GET", "/flashcards/collections/{collection_id}?limit=50"),
+        "create_flashcard": ("POST", "/flashcards/collections/{collection_id}"),
+        "generate": ("POST", "/flashcards/generate?collection_id={collection_id}"),
+    }
+
+    def __init__(self, database_url: str | None, llm_latency_ms: float):
+        database_url = database_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="loadtest-"), "fastapi.db")
+        self.database_vendor = "postgresql" if database_url.startswith("postgres") else "sqlite"
+        self.llm_latency = llm_latency_ms / 1000
+        # Configuração lida no import de app.config
+        os.environ["DATABASE_URL"] = database_url
+        os.environ.setdefault("JWT_SECRET", "loadtest-secret-with-at-least-32-bytes")
+        os.environ.setdefault("OPENAI_API_KEY", "sk-loadtest")
+        os.environ["DEBUG"] = "false"
+        os.environ["SQL_ECHO"] = "false"
+        # Sem limite de rajada: a carga mede o caminho de geração, não o 429
+        os.environ["GENERATION_RATE_LIMIT"] = "0"
+        sys.path.insert(0, BACKEND_DIR)
+
+    def migrate(self) -> None:
+        from alembic import command
+        from alembic.config import Config
+        config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+        command.downgrade(config, "base")
+        command.upgrade(config, "head")
+
+    async def fake_llm(self, input_type: str, content: str) -> list[dict]:
+        await asyncio.sleep(self.llm_latency)
+        return [{"front": f"{content} ({i})", "back": f"Resposta gerada {i}"} for i in range(5)]
+
+    async def seed(self, users: int, collections: int, cards: int) -> list[SeedUser]:
+        from sqlalchemy import insert
+        from app.database import AsyncSessionLocal
+        from app.models import Collection, Flashcard, User, UserPlan
+        from app.security import create_access_token, hash_password
+        
+        # Mesmo hash para todos: a senha é igual e o bcrypt domina o tempo de seed
+        password_hash = hash_password(PASSWORD)
+        seeded, user_rows, collection_rows, card_rows = [], [], [], []
+        for u in range(users):
+            user_id = uuid.uuid4()
+            email = f"loadtest{u}@example.com"
+            user_rows.append({"id": user_id, "email": email, "password_hash": password_hash, "plan": UserPlan.PRO})
+            seed_user = SeedUser(email, create_access_token(str(user_id), email, UserPlan.PRO))
+            for c in range(collections):
+                collection_id = uuid.uuid4()
+                collection_rows.append({
+                    "id": collection_id, "user_id": user_id, "name": f"Coleção {c}", "max_cards": 1_000_000
+                })
+                seed_user.collection_ids.append(str(collection_id))
+                card_rows.extend(
+                    {"id": uuid.uuid4(), "collection_id": collection_id, "front": f"Termo {i}",
+                     "back": f"Definição do termo {i}", "created_by_ia": False}
+                    for i in range(cards)
+                )
+            seeded.append(seed_user)
+        
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(User), user_rows)
+            await db.execute(insert(Collection), collection_rows)
+            for start in range(0, len(card_rows), INSERT_BATCH_SIZE):
+                await db.execute(insert(Flashcard), card_rows[start:start + INSERT_BATCH_SIZE])
+            await db.commit()
+        return seeded
+
+    async def setup(self, users: int, collections: int, cards: int) -> list[SeedUser]:
+        # O env.py do Alembic usa asyncio.run: roda fora deste event loop
+        await asyncio.to_thread(self.migrate)
+        
+        import httpx
+        import app.services.ai_service as ai_service
+        from main import app
+        
+        ai_service.request_flashcards_from_openai = self.fake_llm
+        seeded = await self.seed(users, collections, cards)
+        self.lifespan = app.router.lifespan_context(app)
+        await self.lifespan.__aenter__()
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest")
+        return seeded
+
+    async def request(self, method: str, path: str, body: dict | None, token: str | None) -> int:
+        headers = {"Authorization": f"Bearer {token}"} if token else None
+        response = await self.client.request(method, path, json=body, headers=headers)
+        return response.status_code
+
+    async def close(self) -> None:
+        await self.client.aclose()
+        await self.lifespan.__aexit__(None, None, None)
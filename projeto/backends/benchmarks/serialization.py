@@ -0,0 +1,100 @@
+"""Compara a serialização de listagens da API FastAPI: ORM + Pydantic vs. colunas + orjson
+
+Uso (a partir de projeto/backends):
+    python benchmarks/serialization.py --cards 10000 --repeat 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fastapi-backend")
+sys.path.insert(0, BACKEND_DIR)
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}")
+os.environ.setdefault("JWT_SECRET", "benchmark-secret-with-at-least-32-bytes")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("DEBUG", "false")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import insert, select
+from app.database import AsyncSessionLocal, Base, engine
+from app.models import Collection, Flashcard, User
+from app.schemas import ApiResponse, FlashcardResponse
+from app.utils.responses import api_response, response_columns
+
+async def seed(cards: int) -> uuid.UUID:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        user = User(email="bench@example.com", password_hash="x")
+        collection = Collection(user=user, name="bench", max_cards=cards)
+        db.add(collection)
+        await db.flush()
+        await db.execute(insert(Flashcard), [
+            {
+                "id": uuid.uuid4(),
+                "collection_id": collection.id,
+                "front": f"Termo {i}",
+                "back": f"Definição do termo {i}, com algum texto para ocupar espaço.",
+                "created_by_ia": i % 2 == 0,
+            }
+            for i in range(cards)
+        ])
+        await db.commit()
+        return collection.id
+
+async def orm_pydantic(collection_id: uuid.UUID) -> bytes:
+    async with AsyncSessionLocal() as db:
+        flashcards = (await db.scalars(
+            select(Flashcard).where(Flashcard.collection_id == collection_id)
+        )).all()
+        response = ApiResponse(
+            success=True,
+            message="Flashcards recuperados",
+            data={"flashcards": [FlashcardResponse.from_orm(f).dict() for f in flashcards]}
+        )
+        return JSONResponse(jsonable_encoder(response)).body
+
+async def columns_orjson(collection_id: uuid.UUID) -> bytes:
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(*response_columns(Flashcard, FlashcardResponse)).where(Flashcard.collection_id == collection_id)
+        )).all()
+        return api_response(
+            message="Flashcards recuperados",
+            data={"flashcards": [row._asdict() for row in rows]}
+        ).body
+
+async def measure(fn, collection_id: uuid.UUID, repeat: int) -> list[float]:
+    await fn(collection_id)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn(collection_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    collection_id = await seed(args.cards)
+    results = {}
+    for name, fn in (("orm_pydantic", orm_pydantic), ("columns_orjson", columns_orjson)):
+        timings = await measure(fn, collection_id, args.repeat)
+        results[name] = statistics.median(timings)
+        print(f"{name:>16}: mediana {results[name]:8.1f} ms  (min {min(timings):.1f} ms)")
+    print(f"{'speedup':>16}: {results['orm_pydantic'] / results['columns_orjson']:.1f}x ({args.cards} cartões)")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""Tempo de boot do worker FastAPI: import de main e início do lifespan
+
+Cada medição roda em um processo novo (import frio); sai em JSON o melhor e a
+mediana de --repeat execuções. Com --import-budget/--startup-budget o processo
+termina com código 1 se o melhor tempo passar do orçamento.
+
+Uso (a partir de projeto/backends):
+    python benchmarks/startup.py --repeat 5
+    python benchmarks/startup.py --import-budget 0.5 --startup-budget 0.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fastapi-backend")
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret-with-at-least-32-bytes")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ["SQL_ECHO"] = "false"
+
+# Tempo de import do código da aplicação, descontados FastAPI/SQLAlchemy/Pydantic
+MEASURE = """
+import asyncio, json, time
+import fastapi, pydantic_settings, sqlalchemy.ext.asyncio, sqlalchemy.orm
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def boot():
+    start = time.perf_counter()
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter() - start
+
+print(json.dumps({"import_s": imported - start, "startup_s": asyncio.run(boot())}))
+"""
+
+def measure(database_url: str) -> dict:
+    env = {**os.environ, "DATABASE_URL": database_url}
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, help="segundos aceitos para o import de main")
+    parser.add_argument("--startup-budget", type=float, help="segundos aceitos para o início do lifespan")
+    args = parser.parse_args()
+
+    database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="startup-"), "bench.db")
+    runs = [measure(database_url) for _ in range(args.repeat)]
+    results = {
+        name: {
+            "best": round(min(run[name] for run in runs), 4),
+            "median": round(statistics.median(run[name] for run in runs), 4),
+        }
+        for name in ("import_s", "startup_s")
+    }
+    print(json.dumps(results, indent=2))
+
+    failures = [
+        f"{name}: {results[name]['best']:.3f}s > {budget:.3f}s"
+        for name, budget in (("import_s", args.import_budget), ("startup_s", args.startup_budget))
+        if budget is not None and results[name]["best"] > budget
+    ]
+    for failure in failures:
+        print(f"ACIMA DO ORÇAMENTO {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', '').split(',')
 
 
 CORS_ALLOWED_ORIGINS = os.getenv('CORS_ALLOWED_ORIGINS', 'http://localhost:3000').split(',')
+CORS_EXPOSE_HEADERS = ['Server-Timing']
 
 AUTH_USER_MODEL = 'flashcards.User'
 
@@ -40,6 +41,12 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Cabeçalho Server-Timing e log JSON por requisição (banco, serialização, chamadas externas);
+# desligado, o middleware nem é instalado
+SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'False') == 'True'
+if SERVER_TIMING_ENABLED:
+    MIDDLEWARE.insert(0, 'flashcards.timing.ServerTimingMiddleware')
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -76,6 +83,20 @@ DATABASES = {
     }
 }
 
+# Réplica de leitura opcional (mesmo ENGINE e credenciais; no SQLite, outro arquivo).
+# Com ela, leituras da API vão para a réplica e o restante segue no primário
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
+if os.getenv('DB_REPLICA_NAME') or os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME') or DATABASES['default']['NAME'],
+        'HOST': os.getenv('DB_REPLICA_HOST') or DATABASES['default']['HOST'],
+        'PORT': os.getenv('DB_REPLICA_PORT') or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['flashcards.db_router.PrimaryReplicaRouter']
+    MIDDLEWARE.append('flashcards.db_router.ReplicaRoutingMiddleware')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -111,4 +132,46 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 JWT_SECRET = os.getenv('JWT_SECRET')
 JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
-JWT_EXPIRATION_HOURS = int(os.getenv('JWT_EXPIRATION_HOURS', 1))
\ No newline at end of file
+JWT_EXPIRATION_HOURS = int(os.getenv('JWT_EXPIRATION_HOURS', 1))
+# Cache do usuário completo para tokens sem todas as claims (segundos)
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 60))
+OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Resultados da IA: LRU em memória (por processo) + tabela no banco (criada pela migração 0004)
+AI_CACHE_TTL_SECONDS = int(os.getenv('AI_CACHE_TTL_SECONDS', 30 * 24 * 3600))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'ai_memory': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ai-generation',
+        'TIMEOUT': AI_CACHE_TTL_SECONDS,
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('AI_CACHE_MEMORY_SIZE', 1000))},
+    },
+    'ai_persistent': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'ai_generation_cache',
+        'TIMEOUT': AI_CACHE_TTL_SECONDS,
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('AI_CACHE_MAX_ROWS', 100000)), 'CULL_FREQUENCY': 10},
+    },
+    # Leituras de coleções públicas; com REDIS_URL o cache é compartilhado entre processos
+    'public': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL'),
+    } if os.getenv('REDIS_URL') else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'public-collections',
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('PUBLIC_CACHE_MAX_ENTRIES', 10000))},
+    },
+}
+# Sem REDIS_URL a invalidação só alcança o processo que fez a escrita; os demais
+# workers servem a página antiga até expirar, então o padrão é curto (como no FastAPI)
+PUBLIC_CACHE_TIMEOUT = int(os.getenv('PUBLIC_CACHE_TIMEOUT', 300 if os.getenv('REDIS_URL') else 30))
+
+# Limite de rajada de gerações por IA em memória (por processo); 0 desativa
+GENERATION_RATE_LIMIT = int(os.getenv('GENERATION_RATE_LIMIT', 10))
+GENERATION_RATE_WINDOW_SECONDS = int(os.getenv('GENERATION_RATE_WINDOW_SECONDS', 60))
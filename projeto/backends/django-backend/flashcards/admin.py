@@ -1,5 +1,6 @@
 from django.contrib import admin
 from flashcards.models import Collection, Flashcard, Share, GenerationLog, Payment, User
+from flashcards.services import SearchService
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
@@ -10,26 +11,49 @@ class UserAdmin(admin.ModelAdmin):
 @admin.register(Collection)
 class CollectionAdmin(admin.ModelAdmin):
     list_display = ['name', 'user', 'is_public', 'created_at']
+    list_select_related = ['user']
     list_filter = ['is_public', 'created_at']
     search_fields = ['name', 'user__email']
 
 @admin.register(Flashcard)
 class FlashcardAdmin(admin.ModelAdmin):
     list_display = ['front', 'collection', 'created_by_ia', 'created_at']
+    # Collection.__str__ mostra o dono
+    list_select_related = ['collection__user']
     list_filter = ['created_by_ia', 'created_at']
-    search_fields = ['front', 'back', 'collection__name']
+    search_fields = ['front', 'back']
+    search_help_text = 'Busca por trecho do front ou do back (mínimo de 3 caracteres)'
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if len(term) < SearchService.MIN_QUERY_LENGTH:
+            return super().get_search_results(request, queryset, search_term)
+        return SearchService.search(queryset, term), False
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'collection':
+            kwargs['queryset'] = Collection.objects.select_related('user')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 @admin.register(Share)
 class ShareAdmin(admin.ModelAdmin):
     list_display = ['collection', 'shared_with', 'permissions', 'created_at']
+    list_select_related = ['collection__user', 'shared_with']
     list_filter = ['permissions', 'created_at']
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'collection':
+            kwargs['queryset'] = Collection.objects.select_related('user')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
 @admin.register(GenerationLog)
 class GenerationLogAdmin(admin.ModelAdmin):
     list_display = ['user', 'date', 'count']
+    list_select_related = ['user']
     list_filter = ['date']
 
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
     list_display = ['user', 'status', 'created_at']
+    list_select_related = ['user']
     list_filter = ['status', 'created_at']
\ No newline at end of file
@@ -1,14 +1,32 @@
+from asgiref.sync import sync_to_async
 from ninja import NinjaAPI
 from ninja.errors import HttpError
-from flashcards.models import User, Collection, Flashcard, GenerationLog
+from django.db.models import Q
+from django.http import HttpResponse, StreamingHttpResponse
+from flashcards.models import User, Collection, Flashcard
 from django.contrib.auth.hashers import make_password, check_password
 from flashcards.schemas import *
-from flashcards.authentication import JWTAuth, create_access_token
-from flashcards.services import CollectionService, FlashcardService, AIService, RateLimitService
-from datetime import date
+from flashcards.authentication import AsyncJWTAuth, JWTAuth, create_access_token
+from flashcards.services import CollectionService, FlashcardService, AIService, RateLimitService, ImportService, ImportFormatError, QuotaExceededError, SearchService, ReviewService, BatchLimitError
+from flashcards.conditional import list_validators, not_modified, set_validators
+from flashcards.public_cache import PublicCollectionCache
+from flashcards.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate_keyset
+from flashcards.timing import TimedJSONRenderer, track_external
+from typing import Optional
 
-api = NinjaAPI(title="Flashcards API", version="1.0.0")
+api = NinjaAPI(title="Flashcards API", version="1.0.0", renderer=TimedJSONRenderer())
 auth = JWTAuth()
+async_auth = AsyncJWTAuth()
+
+# ============ HEALTH ============
+
+@api.get("/health")
+def health_check(request):
+    """Status da API e métricas do cache de IA"""
+    return {
+        "status": "ok",
+        "ai_cache": AIService.cache_stats()
+    }
 
 # ============ AUTH ENDPOINTS ============
 
@@ -18,12 +36,13 @@ def register(request, data: RegisterSchema):
     if User.objects.filter(email=data.email).exists():
         raise HttpError(409, "Email já registrado")
     
-    user = User.objects.create_user(
-        email=data.email,
-        username=data.email.split('@')[0],
-        password=data.password,
-        plan='free'
-    )
+    with track_external("password"):
+        user = User.objects.create_user(
+            email=data.email,
+            username=data.email.split('@')[0],
+            password=data.password,
+            plan='free'
+        )
     
     return {
         "success": True,
@@ -46,10 +65,12 @@ def login(request, data: LoginSchema):
     except User.DoesNotExist:
         raise HttpError(401, "Credenciais inválidas")
     
-    if not check_password(data.password, user.password):
+    with track_external("password"):
+        valid_password = check_password(data.password, user.password)
+    if not valid_password:
         raise HttpError(401, "Credenciais inválidas")
     
-    token = create_access_token(user.id, user.email, user.plan)
+    token = create_access_token(user.id, user.email, user.plan, user.username)
     
     return {
         "success": True,
@@ -87,11 +108,22 @@ def get_me(request):
 # ============ COLLECTION ENDPOINTS ============
 
 @api.get("/collections", response=ApiResponseSchema, auth=auth)
-def list_collections(request):
+def list_collections(request, response: HttpResponse, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None):
     if not request.user:
         raise HttpError(401, "Não autorizado")
     
-    collections = CollectionService.get_user_collections(request.user)
+    etag = list_validators(
+        CollectionService.get_user_collections(request.user), "collections", request.user.id, limit, cursor
+    )
+    if cached := not_modified(request, etag):
+        return cached
+    set_validators(response, etag)
+    
+    collections, next_cursor = paginate_keyset(
+        CollectionService.get_user_collections(request.user),
+        cursor,
+        limit
+    )
     
     return {
         "success": True,
@@ -106,7 +138,8 @@ def list_collections(request):
                     "created_at": c.created_at.isoformat()
                 }
                 for c in collections
-            ]
+            ],
+            "next_cursor": next_cursor
         }
     }
 
@@ -137,12 +170,16 @@ def create_collection(request, data: CreateCollectionSchema):
 
 @api.get("/collections/{collection_id}", response=ApiResponseSchema)
 def get_collection(request, collection_id: str):
+    cache_key = PublicCollectionCache.key(collection_id, "meta")
+    if cached := PublicCollectionCache.get(cache_key):
+        return cached
+    
     try:
         collection = Collection.objects.get(id=collection_id)
     except Collection.DoesNotExist:
         raise HttpError(404, "Coleção não encontrada")
     
-    return {
+    payload = {
         "success": True,
         "message": "Coleção encontrada",
         "data": {
@@ -155,6 +192,9 @@ def get_collection(request, collection_id: str):
             }
         }
     }
+    if collection.is_public:
+        PublicCollectionCache.set(cache_key, payload)
+    return payload
 
 @api.put("/collections/{collection_id}", response=ApiResponseSchema, auth=auth)
 def update_collection(request, collection_id: str, data: UpdateCollectionSchema):
@@ -206,15 +246,35 @@ def delete_collection(request, collection_id: str):
 # ============ FLASHCARD ENDPOINTS ============
 
 @api.get("/collections/{collection_id}/flashcards", response=ApiResponseSchema)
-def list_flashcards(request, collection_id: str):
+def list_flashcards(request, response: HttpResponse, collection_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None):
+    # Coleções públicas: página (com ETag) servida do cache, sem consultar o banco
+    cache_key = PublicCollectionCache.key(collection_id, f"cards:{limit}:{cursor}")
+    if cached := PublicCollectionCache.get(cache_key):
+        etag, payload = cached
+        if conditional := not_modified(request, etag):
+            return conditional
+        set_validators(response, etag)
+        return payload
+    
     try:
         collection = Collection.objects.get(id=collection_id)
     except Collection.DoesNotExist:
         raise HttpError(404, "Coleção não encontrada")
     
-    flashcards = FlashcardService.get_collection_flashcards(collection)
+    etag = list_validators(
+        FlashcardService.get_collection_flashcards(collection), "flashcards", collection.id, limit, cursor
+    )
+    if cached := not_modified(request, etag):
+        return cached
+    set_validators(response, etag)
+    
+    flashcards, next_cursor = paginate_keyset(
+        FlashcardService.get_collection_flashcards(collection),
+        cursor,
+        limit
+    )
     
-    return {
+    payload = {
         "success": True,
         "message": "Flashcards recuperados",
         "data": {
@@ -227,9 +287,34 @@ def list_flashcards(request, collection_id: str):
                     "created_at": f.created_at.isoformat()
                 }
                 for f in flashcards
-            ]
+            ],
+            "next_cursor": next_cursor
         }
     }
+    if collection.is_public:
+        PublicCollectionCache.set(cache_key, (etag, payload))
+    return payload
+
+@api.get("/collections/{collection_id}/export", auth=auth)
+def export_flashcards(request, collection_id: str):
+    """Exportar os flashcards da coleção em NDJSON (streaming)"""
+    if not request.user:
+        raise HttpError(401, "Não autorizado")
+    
+    try:
+        collection = Collection.objects.get(
+            Q(user=request.user) | Q(is_public=True),
+            id=collection_id
+        )
+    except Collection.DoesNotExist:
+        raise HttpError(404, "Coleção não encontrada")
+    
+    response = StreamingHttpResponse(
+        FlashcardService.export_flashcards_ndjson(collection),
+        content_type="application/x-ndjson"
+    )
+    response["Content-Disposition"] = f'attachment; filename="collection-{collection.id}.ndjson"'
+    return response
 
 @api.post("/collections/{collection_id}/flashcards", response=ApiResponseSchema, auth=auth)
 def create_flashcard(request, collection_id: str, data: CreateFlashcardSchema):
@@ -264,7 +349,105 @@ def create_flashcard(request, collection_id: str, data: CreateFlashcardSchema):
         }
     }
 
-@api.delete("/flashcards/{flashcard_id}", response=ApiResponseSchema, auth=auth)
+@api.post("/collections/{collection_id}/flashcards/import", response=ApiResponseSchema, auth=auth)
+def import_flashcards(request, collection_id: str):
+    """Importar flashcards em lote a partir de CSV, NDJSON ou JSON"""
+    if not request.user:
+        raise HttpError(401, "Não autorizado")
+    
+    try:
+        collection = Collection.objects.get(id=collection_id, user=request.user)
+    except Collection.DoesNotExist:
+        raise HttpError(404, "Coleção não encontrada")
+    
+    content_type = request.content_type
+    if content_type == "text/csv":
+        records = ImportService.iter_csv_records(request)
+    elif content_type in ("application/x-ndjson", "application/jsonl"):
+        records = ImportService.iter_ndjson_records(request)
+    elif content_type == "application/json":
+        records = ImportService.iter_json_records(request.body)
+    else:
+        raise HttpError(415, "Formato não suportado (use text/csv, application/x-ndjson ou application/json)")
+    
+    try:
+        result = ImportService.import_flashcards(collection, records)
+    except ImportFormatError as e:
+        raise HttpError(400, str(e))
+    
+    return {
+        "success": True,
+        "message": "Importação concluída",
+        "data": result
+    }
+
+@api.get("/flashcards/search", response=ApiResponseSchema, auth=auth)
+def search_flashcards(request, q: str, limit: int = DEFAULT_PAGE_SIZE, offset: int = 0):
+    """Buscar flashcards nas coleções do usuário e nas compartilhadas com ele"""
+    if not request.user:
+        raise HttpError(401, "Não autorizado")
+    
+    q = q.strip()
+    if len(q) < SearchService.MIN_QUERY_LENGTH:
+        raise HttpError(400, f"A busca deve ter no mínimo {SearchService.MIN_QUERY_LENGTH} caracteres")
+    
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    offset = max(offset, 0)
+    flashcards = SearchService.search_flashcards(request.user, q, limit + 1, offset)
+    
+    return {
+        "success": True,
+        "message": "Resultados da busca",
+        "data": {
+            "flashcards": [
+                {
+                    "id": str(f.id),
+                    "collection_id": str(f.collection_id),
+                    "front": f.front,
+                    "back": f.back,
+                    "created_by_ia": f.created_by_ia,
+                    "created_at": f.created_at.isoformat(),
+                    "rank": getattr(f, 'rank', None)
+                }
+                for f in flashcards[:limit]
+            ],
+            "next_offset": offset + limit if len(flashcards) > limit else None
+        }
+    }
+
+@api.post("/flashcards/batch", response=ApiResponseSchema, auth=auth)
+def batch_flashcards(request, data: BatchFlashcardsSchema):
+    """Excluir, editar ou mover vários flashcards em uma transação
+
+    Ids inexistentes ou de coleções de outros usuários são ignorados e
+    contados em `skipped`.
+    """
+    if not request.user:
+        raise HttpError(401, "Não autorizado")
+    
+    ids = list(set(data.ids))
+    
+    if data.operation == "delete":
+        affected = FlashcardService.delete_flashcards(request.user, ids)
+    elif data.operation == "update":
+        affected = FlashcardService.update_flashcards(
+            request.user, ids, data.fields.model_dump(exclude_unset=True)
+        )
+    else:
+        try:
+            affected = FlashcardService.move_flashcards(request.user, ids, data.target_collection_id)
+        except Collection.DoesNotExist:
+            raise HttpError(404, "Coleção não encontrada")
+        except BatchLimitError as e:
+            raise HttpError(400, str(e))
+    
+    return {
+        "success": True,
+        "message": "Operação em lote concluída",
+        "data": {"affected": affected, "skipped": len(ids) - affected}
+    }
+
+@api.delete("/flashcards/{uuid:flashcard_id}", response=ApiResponseSchema, auth=auth)
 def delete_flashcard(request, flashcard_id: str):
     if not request.user:
         raise HttpError(401, "Não autorizado")
@@ -283,12 +466,20 @@ def delete_flashcard(request, flashcard_id: str):
 
 # ============ GENERATION ENDPOINTS ============
 
-@api.post("/flashcards/generate", response=ApiResponseSchema, auth=auth)
+@api.post("/flashcards/generate", response=ApiResponseSchema, auth=async_auth)
 async def generate_flashcards(request, data: GenerateFlashcardsSchema):
     if not request.user:
         raise HttpError(401, "Não autorizado")
     
-    exceeded, current, limit = RateLimitService.check_daily_limit(request.user)
+    if not RateLimitService.allow_burst(request.user):
+        raise HttpError(429, "Muitas gerações em pouco tempo, tente novamente em instantes")
+    
+    try:
+        collection = await Collection.objects.aget(id=data.collection_id, user=request.user)
+    except Collection.DoesNotExist:
+        raise HttpError(404, "Coleção não encontrada")
+    
+    exceeded, current, limit = await sync_to_async(RateLimitService.check_daily_limit)(request.user)
     if exceeded:
         raise HttpError(429, "Limite diário de gerações atingido")
     
@@ -298,21 +489,11 @@ async def generate_flashcards(request, data: GenerateFlashcardsSchema):
         raise HttpError(500, str(e))
     
     try:
-        collection = Collection.objects.get(id=data.collection_id, user=request.user)
-    except Collection.DoesNotExist:
-        raise HttpError(404, "Coleção não encontrada")
-    
-    created_flashcards = []
-    for card in flashcards:
-        flashcard = FlashcardService.create_flashcard(
-            collection,
-            card['front'],
-            card['back'],
-            created_by_ia=True
+        created_flashcards = await sync_to_async(FlashcardService.create_generated_flashcards)(
+            collection, request.user, flashcards, limit
         )
-        created_flashcards.append(flashcard)
-    
-    RateLimitService.increment_generation_count(request.user)
+    except QuotaExceededError:
+        raise HttpError(429, "Limite diário de gerações atingido")
     
     return {
         "success": True,
@@ -338,14 +519,7 @@ def get_generation_logs(request):
     if not request.user:
         raise HttpError(401, "Não autorizado")
     
-    today = date.today()
-    log = GenerationLog.objects.filter(
-        user=request.user,
-        date=today
-    ).first()
-    
-    daily_limit = 999 if request.user.plan == 'pro' else 6
-    count = log.count if log else 0
+    exceeded, count, daily_limit = RateLimitService.check_daily_limit(request.user)
     
     return {
         "success": True,
@@ -353,6 +527,94 @@ def get_generation_logs(request):
         "data": {
             "generated_today": count,
             "daily_limit": daily_limit,
-            "remaining": daily_limit - count
+            "remaining": max(daily_limit - count, 0)
         }
-    }
\ No newline at end of file
+    }
+
+# ============ REVIEW ENDPOINTS ============
+
+def serialize_review(review):
+    return {
+        "flashcard_id": str(review.flashcard_id),
+        "ease_factor": review.ease_factor,
+        "interval_days": review.interval_days,
+        "repetitions": review.repetitions,
+        "lapses": review.lapses,
+        "due_at": review.due_at.isoformat(),
+        "last_reviewed_at": review.last_reviewed_at.isoformat()
+    }
+
+@api.get("/reviews/due", response=ApiResponseSchema, auth=auth)
+def list_due_cards(request, limit: int = DEFAULT_PAGE_SIZE, include_new: bool = True):
+    """Próximos cartões a revisar"""
+    if not request.user:
+        raise HttpError(401, "Não autorizado")
+    
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    cards = ReviewService.get_due_cards(request.user, limit, include_new)
+    
+    return {
+        "success": True,
+        "message": "Cartões para revisão",
+        "data": {
+            "cards": [
+                {
+                    "flashcard": {
+                        "id": str(f.id),
+                        "collection_id": str(f.collection_id),
+                        "front": f.front,
+                        "back": f.back,
+                        "video_url": f.video_url,
+                        "created_by_ia": f.created_by_ia,
+                        "created_at": f.created_at.isoformat()
+                    },
+                    "review": serialize_review(review) if review else None
+                }
+                for f, review in cards
+            ]
+        }
+    }
+
+@api.put("/reviews/settings", response=ApiResponseSchema, auth=auth)
+def update_review_settings(request, data: UpdateReviewSettingsSchema):
+    """Atualizar os parâmetros do agendador e reagendar os cartões já revisados"""
+    if not request.user:
+        raise HttpError(401, "Não autorizado")
+    
+    settings, rescheduled = ReviewService.update_settings(
+        request.user,
+        data.interval_modifier,
+        data.maximum_interval_days
+    )
+    
+    return {
+        "success": True,
+        "message": "Configurações de revisão atualizadas",
+        "data": {
+            "interval_modifier": settings.interval_modifier,
+            "maximum_interval_days": settings.maximum_interval_days,
+            "rescheduled": rescheduled
+        }
+    }
+
+@api.post("/reviews/{flashcard_id}", response=ApiResponseSchema, auth=auth)
+def submit_review(request, flashcard_id: str, data: SubmitReviewSchema):
+    """Registrar a revisão de um cartão"""
+    if not request.user:
+        raise HttpError(401, "Não autorizado")
+    
+    try:
+        flashcard = Flashcard.objects.get(
+            id=flashcard_id,
+            collection_id__in=SearchService.accessible_collections(request.user)
+        )
+    except Flashcard.DoesNotExist:
+        raise HttpError(404, "Flashcard não encontrado")
+    
+    review = ReviewService.submit_review(request.user, flashcard, data.quality)
+    
+    return {
+        "success": True,
+        "message": "Revisão registrada",
+        "data": {"review": serialize_review(review)}
+    }
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FlashcardsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'flashcards'
+
+    def ready(self):
+        from flashcards import signals  # noqa: F401
@@ -1,29 +1,88 @@
 import jwt
+import uuid
 from datetime import datetime, timedelta
 from django.conf import settings
+from django.core.cache import cache
 from flashcards.models import User
 from ninja.security import HttpBearer
 from typing import Optional
 
+def principal_from_claims(payload: dict) -> Optional[User]:
+    """Montar o usuário a partir das claims verificadas, sem consultar o banco
+
+    Campos fora das claims são adiados (deferred) e carregados do banco só se
+    o handler acessá-los. Tokens sem todas as claims retornam None.
+    """
+    try:
+        claims = {
+            'id': uuid.UUID(payload['sub']),
+            'email': payload['email'],
+            'username': payload['username'],
+            'plan': payload['plan'],
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+    # from_db espera os valores na ordem dos campos concretos do modelo
+    field_names = [f.attname for f in User._meta.concrete_fields if f.attname in claims]
+    return User.from_db('default', field_names, [claims[name] for name in field_names])
+
+def user_cache_key(user_id) -> str:
+    return f"auth-user:{user_id}"
+
+def get_cached_user(user_id) -> Optional[User]:
+    """Usuário completo com cache de TTL curto (AUTH_USER_CACHE_TTL)"""
+    user = cache.get(user_cache_key(user_id))
+    if user is None:
+        user = User.objects.filter(id=user_id).first()
+        if user is not None:
+            cache.set(user_cache_key(user_id), user, settings.AUTH_USER_CACHE_TTL)
+    return user
+
+async def aget_cached_user(user_id) -> Optional[User]:
+    user = await cache.aget(user_cache_key(user_id))
+    if user is None:
+        user = await User.objects.filter(id=user_id).afirst()
+        if user is not None:
+            await cache.aset(user_cache_key(user_id), user, settings.AUTH_USER_CACHE_TTL)
+    return user
+
 class JWTAuth(HttpBearer):
     def authenticate(self, request, token):
-        try:
-            payload = jwt.decode(
-                token,
-                settings.JWT_SECRET,
-                algorithms=[settings.JWT_ALGORITHM]
-            )
-            user_id = payload.get('sub')
-            user = User.objects.get(id=user_id)
-            request.user = user
-            return user
-        except (jwt.InvalidTokenError, User.DoesNotExist):
+        payload = decode_access_token(token)
+        if payload is None:
             return None
+        user = principal_from_claims(payload)
+        if user is None:
+            # Tokens antigos, sem todas as claims; `sub` inválido não chega à consulta
+            try:
+                user = get_cached_user(uuid.UUID(payload.get('sub')))
+            except (TypeError, ValueError):
+                return None
+        request.user = user
+        return user
+
+class AsyncJWTAuth(JWTAuth):
+    """Mesma autenticação para views async, sem passar por sync_to_async"""
+    is_async = True
 
-def create_access_token(user_id: int, email: str, plan: str) -> str:
+    async def authenticate(self, request, token):
+        payload = decode_access_token(token)
+        if payload is None:
+            return None
+        user = principal_from_claims(payload)
+        if user is None:
+            try:
+                user = await aget_cached_user(uuid.UUID(payload.get('sub')))
+            except (TypeError, ValueError):
+                return None
+        request.user = user
+        return user
+
+def create_access_token(user_id: int, email: str, plan: str, username: str = '') -> str:
     payload = {
-        'sub': user_id,
+        'sub': str(user_id),
         'email': email,
+        'username': username,
         'plan': plan,
         'exp': datetime.utcnow() + timedelta(hours=settings.JWT_EXPIRATION_HOURS),
         'iat': datetime.utcnow()
@@ -48,4 +107,4 @@ def decode_access_token(token: str) -> Optional[dict]:
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,32 @@
+import hashlib
+from typing import Optional
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+def list_validators(queryset, *key_parts) -> str:
+    """ETag forte de uma listagem a partir de count e max(updated_at)
+
+    `key_parts` identifica a página (filtros, limit, cursor) para que páginas
+    diferentes da mesma listagem não compartilhem a ETag. Sem Last-Modified:
+    max(updated_at) não avança quando uma linha é excluída, só o count muda.
+    """
+    stats = queryset.order_by().aggregate(count=Count('pk'), last_modified=Max('updated_at'))
+    last_modified = stats['last_modified']
+    digest = hashlib.sha256(
+        repr((stats['count'], last_modified.isoformat() if last_modified else None, *key_parts)).encode()
+    ).hexdigest()[:32]
+    return quote_etag(digest)
+
+def set_validators(response: HttpResponse, etag: str) -> HttpResponse:
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+def not_modified(request, etag: str) -> Optional[HttpResponse]:
+    """Resposta 304 se If-None-Match casar com a ETag"""
+    # get_conditional_response devolve o próprio `response` quando não há 304/412
+    response = set_validators(HttpResponse(), etag)
+    conditional = get_conditional_response(request, etag=etag, response=response)
+    return None if conditional is response else conditional
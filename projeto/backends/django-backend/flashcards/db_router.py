@@ -0,0 +1,59 @@
+import hashlib
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA = 'replica'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Só a API lê da réplica; admin e sessões por cookie ficam sempre no primário
+REPLICA_PATH_PREFIX = '/api/'
+
+# Fora do ReplicaRoutingMiddleware (shell, comandos, testes) tudo vai para o primário
+read_from_replica: ContextVar[bool] = ContextVar('read_from_replica', default=False)
+
+class PrimaryReplicaRouter:
+    """Leituras na réplica quando o middleware permite; escritas e migrações no primário"""
+
+    def db_for_read(self, model, **hints):
+        return REPLICA if read_from_replica.get() else 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplica e primário têm os mesmos dados
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+def sticky_key(request):
+    authorization = request.headers.get('Authorization')
+    if not authorization:
+        return None
+    return 'replica-sticky:' + hashlib.sha256(authorization.encode()).hexdigest()
+
+class ReplicaRoutingMiddleware:
+    """Libera a réplica para leituras da API, exceto logo após uma escrita do mesmo cliente
+
+    O cliente é identificado pelo cabeçalho Authorization; a marca fica no cache
+    padrão por REPLICA_STICKY_SECONDS (read-your-writes enquanto a réplica alcança).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        key = sticky_key(request)
+        safe = request.method in SAFE_METHODS
+        replica = safe and request.path.startswith(REPLICA_PATH_PREFIX) and not (key and cache.get(key))
+
+        token = read_from_replica.set(replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_from_replica.reset(token)
+
+        if key and not safe:
+            cache.set(key, True, settings.REPLICA_STICKY_SECONDS)
+        return response
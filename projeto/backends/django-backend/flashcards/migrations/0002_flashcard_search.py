@@ -0,0 +1,57 @@
+from django.db import migrations
+
+POSTGRES_SEARCH_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    # UPPER(...) casa com o SQL gerado por icontains (busca da API e do admin)
+    "CREATE INDEX IF NOT EXISTS flashcards_front_trgm_idx ON flashcards USING gin (UPPER(front) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS flashcards_back_trgm_idx ON flashcards USING gin (UPPER(back) gin_trgm_ops)",
+]
+
+POSTGRES_SEARCH_REVERSE_SQL = [
+    "DROP INDEX IF EXISTS flashcards_front_trgm_idx",
+    "DROP INDEX IF EXISTS flashcards_back_trgm_idx",
+]
+
+SQLITE_SEARCH_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS flashcards_fts USING fts5("
+    "front, back, content='flashcards', content_rowid='rowid', tokenize='trigram')",
+    "INSERT INTO flashcards_fts(flashcards_fts) VALUES ('rebuild')",
+    "CREATE TRIGGER IF NOT EXISTS flashcards_fts_ai AFTER INSERT ON flashcards BEGIN "
+    "INSERT INTO flashcards_fts(rowid, front, back) VALUES (new.rowid, new.front, new.back); END",
+    "CREATE TRIGGER IF NOT EXISTS flashcards_fts_ad AFTER DELETE ON flashcards BEGIN "
+    "INSERT INTO flashcards_fts(flashcards_fts, rowid, front, back) VALUES ('delete', old.rowid, old.front, old.back); END",
+    "CREATE TRIGGER IF NOT EXISTS flashcards_fts_au AFTER UPDATE ON flashcards BEGIN "
+    "INSERT INTO flashcards_fts(flashcards_fts, rowid, front, back) VALUES ('delete', old.rowid, old.front, old.back); "
+    "INSERT INTO flashcards_fts(rowid, front, back) VALUES (new.rowid, new.front, new.back); END",
+]
+
+SQLITE_SEARCH_REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS flashcards_fts_ai",
+    "DROP TRIGGER IF EXISTS flashcards_fts_ad",
+    "DROP TRIGGER IF EXISTS flashcards_fts_au",
+    "DROP TABLE IF EXISTS flashcards_fts",
+]
+
+
+def _run(schema_editor, statements_by_vendor):
+    for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_search_indexes(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRES_SEARCH_SQL, 'sqlite': SQLITE_SEARCH_SQL})
+
+
+def drop_search_indexes(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRES_SEARCH_REVERSE_SQL, 'sqlite': SQLITE_SEARCH_REVERSE_SQL})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flashcards', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:32
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flashcards', '0002_flashcard_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewSettings',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='review_settings', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('interval_modifier', models.FloatField(default=1.0)),
+                ('maximum_interval_days', models.IntegerField(default=365)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'review_settings',
+            },
+        ),
+        migrations.CreateModel(
+            name='CardReview',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('ease_factor', models.FloatField(default=2.5)),
+                ('interval_days', models.FloatField(default=0)),
+                ('repetitions', models.IntegerField(default=0)),
+                ('lapses', models.IntegerField(default=0)),
+                ('due_at', models.DateTimeField()),
+                ('last_reviewed_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('flashcard', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='flashcards.flashcard')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='card_reviews', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'card_reviews',
+                'indexes': [models.Index(fields=['user', 'due_at'], name='card_reviews_user_due_idx')],
+                'unique_together': {('user', 'flashcard')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flashcards', '0004_ai_generation_cache'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flashcard',
+            index=models.Index(fields=['collection', 'updated_at'], name='flashcards_coll_updated_idx'),
+        ),
+    ]
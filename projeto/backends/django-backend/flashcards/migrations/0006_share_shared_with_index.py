@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flashcards', '0005_flashcard_updated_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='share',
+            index=models.Index(fields=['shared_with', 'collection'], name='shares_with_coll_idx'),
+        ),
+    ]
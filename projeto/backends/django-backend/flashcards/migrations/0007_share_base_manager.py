@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:11
+
+import django.db.models.manager
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flashcards', '0006_share_shared_with_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='share',
+            options={'base_manager_name': 'with_related'},
+        ),
+        migrations.AlterModelManagers(
+            name='share',
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('with_related', django.db.models.manager.Manager()),
+            ],
+        ),
+    ]
@@ -55,6 +55,10 @@ class Collection(models.Model):
     class Meta:
         db_table = 'collections'
         ordering = ['-created_at']
+        indexes = [
+            # Listagem paginada por usuário (keyset em created_at, id)
+            models.Index(fields=['user', '-created_at', '-id'], name='collections_user_created_idx'),
+        ]
 
 class Flashcard(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -78,6 +82,19 @@ class Flashcard(models.Model):
     class Meta:
         db_table = 'flashcards'
         ordering = ['-created_at']
+        indexes = [
+            # Listagem paginada por coleção (keyset em created_at, id)
+            models.Index(fields=['collection', '-created_at', '-id'], name='flashcards_coll_created_idx'),
+            # ETag da listagem: count e max(updated_at) por coleção
+            models.Index(fields=['collection', 'updated_at'], name='flashcards_coll_updated_idx'),
+        ]
+
+class ShareBaseManager(models.Manager):
+    """Manager base do Share: a exclusão em cascata (e a confirmação no admin, que
+    chama __str__ em cada linha) já carrega coleção e usuário juntos"""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('collection', 'shared_with')
 
 class Share(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -91,12 +108,20 @@ class Share(models.Model):
     share_id = models.CharField(max_length=50, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = models.Manager()
+    with_related = ShareBaseManager()
+
     def __str__(self):
         return f"{self.collection.name} - {self.shared_with.username}"
 
     class Meta:
         db_table = 'shares'
+        base_manager_name = 'with_related'
         unique_together = ['collection', 'shared_with']
+        indexes = [
+            # Coleções compartilhadas com o usuário (busca e listagens), só pelo índice
+            models.Index(fields=['shared_with', 'collection'], name='shares_with_coll_idx'),
+        ]
 
 class GenerationLog(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -112,6 +137,42 @@ class GenerationLog(models.Model):
         db_table = 'generation_logs'
         unique_together = ['user', 'date']
 
+class CardReview(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='card_reviews')
+    flashcard = models.ForeignKey(Flashcard, on_delete=models.CASCADE, related_name='reviews')
+    ease_factor = models.FloatField(default=2.5)
+    interval_days = models.FloatField(default=0)
+    repetitions = models.IntegerField(default=0)
+    lapses = models.IntegerField(default=0)
+    due_at = models.DateTimeField()
+    last_reviewed_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.flashcard_id} ({self.due_at})"
+
+    class Meta:
+        db_table = 'card_reviews'
+        unique_together = ['user', 'flashcard']
+        indexes = [
+            # Fila de revisões vencidas por usuário
+            models.Index(fields=['user', 'due_at'], name='card_reviews_user_due_idx'),
+        ]
+
+class ReviewSettings(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='review_settings')
+    interval_modifier = models.FloatField(default=1.0)
+    maximum_interval_days = models.IntegerField(default=365)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} ({self.interval_modifier}x, {self.maximum_interval_days}d)"
+
+    class Meta:
+        db_table = 'review_settings'
+
 class Payment(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -0,0 +1,42 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Optional
+from ninja.errors import HttpError
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(created_at: datetime, id: uuid.UUID) -> str:
+    payload = json.dumps([created_at.isoformat(), str(id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), uuid.UUID(id)
+    except (ValueError, TypeError):
+        raise HttpError(400, "Cursor inválido")
+
+def paginate_keyset(queryset, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE):
+    """Paginação keyset em (created_at, id), do mais recente para o mais antigo"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        # created_at <= x delimita o range do índice; o exclude só descarta o empate
+        queryset = queryset.filter(created_at__lte=created_at).exclude(
+            created_at=created_at,
+            id__gte=id
+        )
+
+    rows = list(queryset.order_by('-created_at', '-id')[:limit + 1])
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return rows, next_cursor
@@ -0,0 +1,62 @@
+import uuid
+from typing import Any, Optional
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+class PublicCollectionCache:
+    """Cache compartilhado das leituras de coleções públicas (cache 'public')
+
+    As chaves incluem uma versão por coleção; invalidar apaga a versão, então
+    entradas antigas deixam de ser lidas e expiram sozinhas. Com REDIS_URL o
+    cache é compartilhado entre processos; sem ele, é um LRU por processo.
+    """
+
+    @staticmethod
+    def _cache():
+        return caches['public']
+
+    @staticmethod
+    def _collection_key(collection_id) -> Optional[str]:
+        try:
+            return str(uuid.UUID(str(collection_id)))
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _version_key(collection_key: str) -> str:
+        return f"public-collection:{collection_key}:version"
+
+    @staticmethod
+    def key(collection_id, name: str) -> Optional[str]:
+        """Chave na versão atual; obter antes de consultar o banco e usar no set(),
+        para que uma escrita concluída no meio grave o dado antigo na versão antiga"""
+        collection_key = PublicCollectionCache._collection_key(collection_id)
+        if collection_key is None:
+            return None
+        cache = PublicCollectionCache._cache()
+        version_key = PublicCollectionCache._version_key(collection_key)
+        version = cache.get(version_key)
+        if version is None:
+            # add() não sobrescreve a versão criada por outro processo
+            cache.add(version_key, uuid.uuid4().hex, settings.PUBLIC_CACHE_TIMEOUT)
+            version = cache.get(version_key)
+        return f"public-collection:{collection_key}:{version}:{name}"
+
+    @staticmethod
+    def get(key: Optional[str]) -> Optional[Any]:
+        return PublicCollectionCache._cache().get(key) if key else None
+
+    @staticmethod
+    def set(key: Optional[str], value: Any) -> None:
+        if key:
+            PublicCollectionCache._cache().set(key, value, settings.PUBLIC_CACHE_TIMEOUT)
+
+    @staticmethod
+    def invalidate(collection_id) -> None:
+        """Invalidar após o commit da transação atual (imediato fora de transação)"""
+        collection_key = PublicCollectionCache._collection_key(collection_id)
+        if collection_key is None:
+            return
+        version_key = PublicCollectionCache._version_key(collection_key)
+        transaction.on_commit(lambda: PublicCollectionCache._cache().delete(version_key))
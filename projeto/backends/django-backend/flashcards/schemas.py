@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, EmailStr, Field, model_validator, validator
 from typing import Optional
 from datetime import datetime
 import uuid
@@ -39,6 +39,13 @@ class CollectionSchema(BaseModel):
     created_at: datetime
 
 
+def check_video_url(v):
+    if not v:
+        return v
+    if not ("youtube.com" in v or "vimeo.com" in v or "youtu.be" in v):
+        raise ValueError('video_url must be a valid YouTube or Vimeo URL')
+    return v
+
 class CreateFlashcardSchema(BaseModel):
     front: str = Field(..., min_length=1)
     back: str = Field(..., min_length=1)
@@ -46,11 +53,38 @@ class CreateFlashcardSchema(BaseModel):
 
     @validator('video_url')
     def validate_video_url(cls, v):
-        if not v:
-            return v
-        if not ("youtube.com" in v or "vimeo.com" in v or "youtu.be" in v):
-            raise ValueError('video_url must be a valid YouTube or Vimeo URL')
-        return v
+        return check_video_url(v)
+
+class UpdateFlashcardFieldsSchema(BaseModel):
+    front: Optional[str] = Field(None, min_length=1)
+    back: Optional[str] = Field(None, min_length=1)
+    video_url: Optional[str] = Field(None, max_length=1000)
+
+    @validator('video_url')
+    def validate_video_url(cls, v):
+        return check_video_url(v)
+
+    @model_validator(mode='after')
+    def validate_required_fields(self):
+        # front/back podem ser omitidos, mas não apagados; video_url: null remove o vídeo
+        for name in ('front', 'back'):
+            if name in self.model_fields_set and getattr(self, name) is None:
+                raise ValueError(f'{name} cannot be null')
+        return self
+
+class BatchFlashcardsSchema(BaseModel):
+    ids: list[uuid.UUID] = Field(..., min_length=1, max_length=1000)
+    operation: str = Field(..., pattern="^(delete|update|move)$")
+    fields: Optional[UpdateFlashcardFieldsSchema] = None
+    target_collection_id: Optional[uuid.UUID] = None
+
+    @model_validator(mode='after')
+    def validate_operation(self):
+        if self.operation == 'update' and not (self.fields and self.fields.model_fields_set):
+            raise ValueError('update requires fields')
+        if self.operation == 'move' and not self.target_collection_id:
+            raise ValueError('move requires target_collection_id')
+        return self
 
 class FlashcardSchema(BaseModel):
     id: uuid.UUID
@@ -67,6 +101,14 @@ class GenerateFlashcardsSchema(BaseModel):
     collection_id: uuid.UUID
 
 
+class SubmitReviewSchema(BaseModel):
+    quality: int = Field(..., ge=0, le=5)
+
+class UpdateReviewSettingsSchema(BaseModel):
+    interval_modifier: float = Field(..., gt=0, le=5)
+    maximum_interval_days: int = Field(..., ge=1, le=36500)
+
+
 class ApiResponseSchema(BaseModel):
     success: bool
     message: str
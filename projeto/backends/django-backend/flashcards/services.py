@@ -1,7 +1,55 @@
-from flashcards.models import Collection, Flashcard, GenerationLog, User
-from datetime import date
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+from pydantic import ValidationError
+from flashcards.models import CardReview, Collection, Flashcard, GenerationLog, ReviewSettings, Share, User
+from flashcards.scheduler import (
+    RESCHEDULE_BATCH_SIZE,
+    ReviewState,
+    next_due_at,
+    reschedule_intervals,
+    sm2_review,
+)
+from flashcards.public_cache import PublicCollectionCache
+from flashcards.ratelimit import SlidingWindowLimiter
+from flashcards.schemas import CreateFlashcardSchema
+from flashcards.timing import track_external
+from datetime import date, timezone as dt_timezone
+import codecs
+import csv
+import hashlib
 import json
 import os
+import unicodedata
+import uuid
+
+EXPORT_CHUNK_SIZE = 1000
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+
+class ImportFormatError(ValueError):
+    pass
+
+class ImportErrors:
+    """Erros por linha: todos contados, só os primeiros MAX_REPORTED_ERRORS guardados"""
+    
+    def __init__(self):
+        self.rows = []
+        self.count = 0
+    
+    def append(self, error):
+        self.count += 1
+        if len(self.rows) < MAX_REPORTED_ERRORS:
+            self.rows.append(error)
+
+class QuotaExceededError(Exception):
+    pass
+
+class BatchLimitError(ValueError):
+    pass
 
 class CollectionService:
     @staticmethod
@@ -45,13 +93,394 @@ class FlashcardService:
         )
         return flashcard
     
+    @staticmethod
+    def create_generated_flashcards(collection, user, cards, daily_limit):
+        """Inserir os cartões gerados e contabilizar a cota em uma única transação"""
+        flashcards = [
+            Flashcard(collection=collection, front=card['front'], back=card['back'], created_by_ia=True)
+            for card in cards
+            if isinstance(card, dict) and card.get('front') and card.get('back')
+        ]
+        with transaction.atomic():
+            Flashcard.objects.bulk_create(flashcards)
+            # bulk_create não dispara post_save
+            PublicCollectionCache.invalidate(collection.pk)
+            if RateLimitService.increment_generation_count(user, limit=daily_limit) is None:
+                raise QuotaExceededError()
+        return flashcards
+    
     @staticmethod
     def delete_flashcard(flashcard):
         flashcard.delete()
+    
+    @staticmethod
+    def owned_flashcards(user, ids):
+        """Cartões da lista que pertencem a coleções do usuário (na mesma consulta da operação)"""
+        return Flashcard.objects.filter(id__in=ids, collection__in=Collection.objects.filter(user=user))
+    
+    @staticmethod
+    @transaction.atomic
+    def delete_flashcards(user, ids):
+        # O delete() do Django emula o CASCADE das revisões e dispara o post_delete
+        # que invalida o cache público: número fixo de consultas, não uma por cartão
+        deleted = FlashcardService.owned_flashcards(user, ids).delete()[1]
+        return deleted.get(Flashcard._meta.label, 0)
+    
+    @staticmethod
+    @transaction.atomic
+    def update_flashcards(user, ids, fields):
+        flashcards = FlashcardService.owned_flashcards(user, ids)
+        # update() não dispara post_save nem preenche auto_now
+        for collection_id in flashcards.values_list('collection_id', flat=True).distinct():
+            PublicCollectionCache.invalidate(collection_id)
+        return flashcards.update(**fields, updated_at=timezone.now())
+    
+    @staticmethod
+    @transaction.atomic
+    def move_flashcards(user, ids, target_collection_id):
+        """Mover cartões para outra coleção do usuário, respeitando max_cards"""
+        target = Collection.objects.select_for_update().get(id=target_collection_id, user=user)
+        flashcards = FlashcardService.owned_flashcards(user, ids).exclude(collection=target)
+        sources = dict(
+            flashcards.order_by().values_list('collection_id').annotate(count=Count('id'))
+        )
+        moving = sum(sources.values())
+        if not moving:
+            return 0
+        
+        if Flashcard.objects.filter(collection=target).count() + moving > target.max_cards:
+            raise BatchLimitError("Limite de cartões da coleção atingido")
+        
+        for collection_id in (*sources, target.pk):
+            PublicCollectionCache.invalidate(collection_id)
+        return flashcards.update(collection=target, updated_at=timezone.now())
+    
+    @staticmethod
+    def export_flashcards_ndjson(collection):
+        """Gerar linhas NDJSON da coleção sem carregar todos os flashcards na memória"""
+        rows = Flashcard.objects.filter(collection=collection).order_by(
+            'created_at', 'id'
+        ).values(
+            'id', 'front', 'back', 'video_url', 'extra',
+            'created_by_ia', 'created_at', 'updated_at'
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        
+        for row in rows:
+            yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+class SearchService:
+    MIN_QUERY_LENGTH = 3
+    
+    @staticmethod
+    def accessible_collections(user):
+        """Coleções do usuário e coleções compartilhadas com ele"""
+        return Collection.objects.filter(
+            Q(user=user) | Q(id__in=Share.objects.filter(shared_with=user).values('collection_id'))
+        ).values('id')
+    
+    @staticmethod
+    def search(queryset, query):
+        """Filtrar e ordenar por relevância em front/back (pg_trgm no Postgres, FTS5 no SQLite)"""
+        if connection.vendor == 'postgresql':
+            from django.contrib.postgres.search import TrigramSimilarity
+            from django.db.models.functions import Greatest, Upper
+            
+            # icontains gera UPPER(col) LIKE UPPER(%s), coberto pelos índices GIN de UPPER(col)
+            return queryset.filter(
+                Q(front__icontains=query) | Q(back__icontains=query)
+            ).annotate(
+                rank=Greatest(
+                    TrigramSimilarity(Upper('front'), query.upper()),
+                    TrigramSimilarity(Upper('back'), query.upper())
+                )
+            ).order_by('-rank', 'id')
+        
+        if connection.vendor == 'sqlite':
+            # Frase FTS5: com o tokenizer trigram equivale a uma busca por substring
+            phrase = '"' + query.replace('"', '""') + '"'
+            return queryset.extra(
+                select={'rank': '-bm25(flashcards_fts)'},
+                tables=['flashcards_fts'],
+                where=['flashcards_fts.rowid = flashcards.rowid', 'flashcards_fts MATCH %s'],
+                params=[phrase]
+            ).order_by('-rank', 'id')
+        
+        return queryset.filter(
+            Q(front__icontains=query) | Q(back__icontains=query)
+        ).order_by('-created_at', 'id')
+    
+    @staticmethod
+    def search_flashcards(user, query, limit, offset):
+        queryset = Flashcard.objects.filter(
+            collection_id__in=SearchService.accessible_collections(user)
+        )
+        return list(SearchService.search(queryset, query)[offset:offset + limit])
+
+class ReviewService:
+    @staticmethod
+    def get_due_cards(user, limit, include_new=True):
+        """Próximos cartões a revisar: vencidos primeiro, completados com cartões novos"""
+        due = list(
+            CardReview.objects.filter(user=user, due_at__lte=timezone.now())
+            .select_related('flashcard')
+            .order_by('due_at')[:limit]
+        )
+        cards = [(review.flashcard, review) for review in due]
+        
+        if include_new and len(cards) < limit:
+            reviewed = CardReview.objects.filter(user=user, flashcard=OuterRef('pk'))
+            # Mesmas coleções aceitas em submit_review: próprias e compartilhadas
+            new_cards = Flashcard.objects.filter(
+                collection_id__in=SearchService.accessible_collections(user)
+            ).exclude(
+                Exists(reviewed)
+            ).order_by('created_at', 'id')[:limit - len(cards)]
+            cards += [(flashcard, None) for flashcard in new_cards]
+        
+        return cards
+    
+    @staticmethod
+    @transaction.atomic
+    def submit_review(user, flashcard, quality):
+        settings, _ = ReviewSettings.objects.get_or_create(user=user)
+        review = CardReview.objects.select_for_update().filter(user=user, flashcard=flashcard).first()
+        if review:
+            state = ReviewState(review.ease_factor, review.interval_days, review.repetitions, review.lapses)
+        else:
+            review = CardReview(user=user, flashcard=flashcard)
+            state = ReviewState()
+        
+        state = sm2_review(state, quality, settings.interval_modifier, settings.maximum_interval_days)
+        
+        now = timezone.now()
+        review.ease_factor = state.ease_factor
+        review.interval_days = state.interval_days
+        review.repetitions = state.repetitions
+        review.lapses = state.lapses
+        review.last_reviewed_at = now
+        review.due_at = next_due_at(now, state.interval_days)
+        review.save()
+        return review
+    
+    @staticmethod
+    @transaction.atomic
+    def update_settings(user, interval_modifier, maximum_interval_days):
+        """Atualizar os parâmetros do agendador e reagendar em lote os cartões já revisados"""
+        settings, _ = ReviewSettings.objects.select_for_update().get_or_create(user=user)
+        scale = interval_modifier / settings.interval_modifier
+        settings.interval_modifier = interval_modifier
+        settings.maximum_interval_days = maximum_interval_days
+        settings.save()
+        
+        rescheduled = 0
+        last_id = None
+        while True:
+            queryset = CardReview.objects.filter(user=user).order_by('id').only(
+                'id', 'last_reviewed_at', 'interval_days', 'repetitions'
+            )
+            if last_id is not None:
+                queryset = queryset.filter(id__gt=last_id)
+            reviews = list(queryset[:RESCHEDULE_BATCH_SIZE])
+            if not reviews:
+                break
+            
+            # NumPy trabalha com datetimes sem timezone (os valores estão em UTC)
+            intervals, due_at = reschedule_intervals(
+                [review.last_reviewed_at.replace(tzinfo=None) for review in reviews],
+                [review.interval_days for review in reviews],
+                [review.repetitions for review in reviews],
+                scale,
+                maximum_interval_days
+            )
+            for review, interval, due in zip(reviews, intervals, due_at):
+                review.interval_days = float(interval)
+                review.due_at = due.replace(tzinfo=dt_timezone.utc)
+            CardReview.objects.bulk_update(reviews, ['interval_days', 'due_at'], batch_size=1000)
+            
+            rescheduled += len(reviews)
+            last_id = reviews[-1].id
+        
+        return settings, rescheduled
+
+class ImportService:
+    @staticmethod
+    def iter_csv_records(stream):
+        """Ler registros CSV (com cabeçalho) linha a linha do corpo da requisição"""
+        reader = csv.reader(codecs.iterdecode(stream, 'utf-8', errors='replace'))
+        header = None
+        for values in reader:
+            if not values:
+                continue
+            if header is None:
+                header = [value.strip().lower() for value in values]
+                if 'front' not in header or 'back' not in header:
+                    raise ImportFormatError("O CSV deve ter as colunas front e back")
+                continue
+            yield dict(zip(header, values))
+    
+    @staticmethod
+    def iter_ndjson_records(stream):
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            yield record if isinstance(record, dict) else None
+    
+    @staticmethod
+    def iter_json_records(body):
+        try:
+            records = json.loads(body)
+        except json.JSONDecodeError:
+            raise ImportFormatError("JSON inválido")
+        if not isinstance(records, list):
+            raise ImportFormatError("O JSON deve ser uma lista de flashcards")
+        for record in records:
+            yield record if isinstance(record, dict) else None
+    
+    @staticmethod
+    def validate_batch(batch, errors):
+        valid = []
+        for row_number, record in batch:
+            if record is None:
+                errors.append({"row": row_number, "error": "Registro inválido"})
+                continue
+            try:
+                data = CreateFlashcardSchema(**{
+                    key: value for key, value in record.items()
+                    if value not in (None, "")
+                })
+            except ValidationError as e:
+                errors.append({
+                    "row": row_number,
+                    "error": "; ".join(
+                        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                        for error in e.errors()
+                    )
+                })
+                continue
+            valid.append((row_number, data))
+        return valid
+    
+    @staticmethod
+    def import_flashcards(collection, records):
+        """Validar e inserir flashcards em lotes, coletando os erros por linha
+        
+        Cada lote é validado fora da transação e gravado numa transação curta, com
+        a coleção bloqueada e max_cards conferido de novo; um upload lento não
+        segura o bloqueio, e os lotes já gravados ficam mesmo se o envio parar.
+        """
+        imported = 0
+        errors = ImportErrors()
+        
+        def flush(batch):
+            nonlocal imported
+            valid = ImportService.validate_batch(batch, errors)
+            if not valid:
+                return
+            with transaction.atomic():
+                max_cards = Collection.objects.select_for_update().values_list(
+                    'max_cards', flat=True
+                ).get(pk=collection.pk)
+                card_count = Flashcard.objects.filter(collection=collection).count()
+                available = max(max_cards - card_count, 0)
+                for row_number, _ in valid[available:]:
+                    errors.append({"row": row_number, "error": "Limite de cartões da coleção atingido"})
+                valid = valid[:available]
+                if not valid:
+                    return
+                Flashcard.objects.bulk_create([
+                    Flashcard(
+                        collection=collection,
+                        front=data.front,
+                        back=data.back,
+                        video_url=data.video_url,
+                        created_by_ia=False
+                    )
+                    for _, data in valid
+                ])
+                # bulk_create não dispara post_save
+                PublicCollectionCache.invalidate(collection.pk)
+            imported += len(valid)
+        
+        batch = []
+        for row_number, record in enumerate(records, start=1):
+            batch.append((row_number, record))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+        
+        return {
+            "imported": imported,
+            "failed": errors.count,
+            "errors": sorted(errors.rows, key=lambda error: error["row"])
+        }
 
 class AIService:
+    # Incrementar sempre que os prompts mudarem, para não servir resultados antigos
+    PROMPT_VERSION = "1"
+    cache_counters = {'memory_hits': 0, 'db_hits': 0, 'misses': 0}
+
+    @staticmethod
+    def cache_key(input_type: str, content: str, model: str):
+        content = " ".join(unicodedata.normalize("NFKC", content).split())
+        # Tópicos não dependem de maiúsculas; textos são mantidos como enviados
+        if input_type == "topic":
+            content = content.casefold()
+        payload = json.dumps([input_type, content, model, AIService.PROMPT_VERSION], ensure_ascii=False)
+        return "ai:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def cache_stats():
+        counters = AIService.cache_counters
+        total = sum(counters.values())
+        hits = counters['memory_hits'] + counters['db_hits']
+        return {**counters, 'hit_ratio': hits / total if total else 0.0}
+
+    @staticmethod
+    def normalize_flashcards(data):
+        """Só os cartões com front/back preenchidos; qualquer outra resposta vira lista vazia"""
+        if not isinstance(data, list):
+            return []
+        return [
+            {'front': card['front'], 'back': card['back']}
+            for card in data
+            if isinstance(card, dict)
+            and isinstance(card.get('front'), str) and card['front'].strip()
+            and isinstance(card.get('back'), str) and card['back'].strip()
+        ]
+
     @staticmethod
     async def generate_flashcards(input_type: str, content: str):
+        """Gerar flashcards via OpenAI, reaproveitando resultados em cache"""
+        key = AIService.cache_key(input_type, content, settings.OPENAI_MODEL)
+        memory, persistent = caches['ai_memory'], caches['ai_persistent']
+
+        # Entradas gravadas antes da validação também passam pela normalização
+        flashcards = AIService.normalize_flashcards(await memory.aget(key))
+        if flashcards:
+            AIService.cache_counters['memory_hits'] += 1
+            return flashcards
+
+        flashcards = AIService.normalize_flashcards(await persistent.aget(key))
+        if flashcards:
+            AIService.cache_counters['db_hits'] += 1
+            await memory.aset(key, flashcards)
+            return flashcards
+
+        AIService.cache_counters['misses'] += 1
+        flashcards = await AIService.request_flashcards(input_type, content)
+        if flashcards:
+            await memory.aset(key, flashcards)
+            await persistent.aset(key, flashcards)
+        return flashcards
+
+    @staticmethod
+    async def request_flashcards(input_type: str, content: str):
         from openai import AsyncOpenAI
         
         client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
@@ -77,44 +506,84 @@ Respond ONLY with JSON:
 """
         
         try:
-            response = await client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a flashcard generation expert."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=2000
-            )
+            with track_external('openai'):
+                response = await client.chat.completions.create(
+                    model=settings.OPENAI_MODEL,
+                    messages=[
+                        {"role": "system", "content": "You are a flashcard generation expert."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=2000
+                )
             
             content = response.choices[0].message.content
-            flashcards = json.loads(content)
-            return flashcards
+            return AIService.normalize_flashcards(json.loads(content))
         except Exception as e:
             raise ValueError(f"Erro ao gerar flashcards: {str(e)}")
 
 class RateLimitService:
+    FREE_DAILY_LIMIT = 6
+    DAILY_LIMITS = {'pro': 999, 'admin': 999}
+    generation_limiter = SlidingWindowLimiter(settings.GENERATION_RATE_LIMIT, settings.GENERATION_RATE_WINDOW_SECONDS)
+
+    @staticmethod
+    def daily_limit(user):
+        return RateLimitService.DAILY_LIMITS.get(user.plan, RateLimitService.FREE_DAILY_LIMIT)
+
+    @staticmethod
+    def exhausted_key(user, today):
+        return f"generation-quota-exhausted:{user.id}:{today.isoformat()}"
+
+    @staticmethod
+    def allow_burst(user):
+        """Limite de rajada em memória, verificado antes de consultar o banco"""
+        return RateLimitService.generation_limiter.allow(user.id)
+
     @staticmethod
     def check_daily_limit(user):
         today = date.today()
-        log = GenerationLog.objects.filter(
+        daily_limit = RateLimitService.daily_limit(user)
+        # Usuários que já esgotaram a cota do dia são recusados sem consultar o banco
+        if cache.get(RateLimitService.exhausted_key(user, today)) == user.plan:
+            return True, daily_limit, daily_limit
+
+        current_count = GenerationLog.objects.filter(
             user=user,
             date=today
-        ).first()
-        
-        plan = user.profile.plan
-        daily_limit = 999 if plan == 'pro' else 6
-        current_count = log.count if log else 0
+        ).values_list('count', flat=True).first() or 0
         
         return current_count >= daily_limit, current_count, daily_limit
     
     @staticmethod
-    def increment_generation_count(user):
+    def increment_generation_count(user, n=1, limit=None):
+        """Somar n ao contador do dia com um único UPSERT; None se passar do limite"""
+        if limit is not None and n > limit:
+            return None
+
         today = date.today()
-        log, created = GenerationLog.objects.get_or_create(
-            user=user,
-            date=today
+        values = [
+            GenerationLog._meta.get_field(name).get_db_prep_value(value, connection)
+            for name, value in (
+                ('id', uuid.uuid4()), ('user', user.pk), ('date', today),
+                ('count', n), ('created_at', timezone.now()),
+            )
+        ]
+        sql = (
+            "INSERT INTO generation_logs (id, user_id, date, count, created_at) "
+            "VALUES (%s, %s, %s, %s, %s) "
+            "ON CONFLICT (user_id, date) DO UPDATE SET count = generation_logs.count + EXCLUDED.count"
         )
-        log.count += 1
-        log.save()
-        return log
\ No newline at end of file
+        if limit is not None:
+            sql += " WHERE generation_logs.count + EXCLUDED.count <= %s"
+            values.append(limit)
+        sql += " RETURNING count"
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, values)
+            row = cursor.fetchone()
+
+        if row is None:
+            cache.set(RateLimitService.exhausted_key(user, today), user.plan, 24 * 3600)
+            return None
+        return row[0]
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from flashcards.models import Collection, Flashcard
+from flashcards.public_cache import PublicCollectionCache
+
+@receiver([post_save, post_delete], sender=Collection)
+def invalidate_collection(sender, instance, **kwargs):
+    PublicCollectionCache.invalidate(instance.pk)
+
+@receiver([post_save, post_delete], sender=Flashcard)
+def invalidate_collection_flashcards(sender, instance, **kwargs):
+    PublicCollectionCache.invalidate(instance.collection_id)
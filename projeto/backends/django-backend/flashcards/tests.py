@@ -1,3 +1,914 @@
-from django.test import TestCase
+import base64
+import json
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import connection
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from flashcards import api
+import jwt
+from flashcards.authentication import AsyncJWTAuth, JWTAuth, create_access_token
+from flashcards.db_router import PrimaryReplicaRouter, ReplicaRoutingMiddleware
+from flashcards.models import CardReview, Collection, Flashcard, GenerationLog, Payment, Share, User
+from flashcards.pagination import decode_cursor, encode_cursor
+from flashcards.scheduler import MIN_EASE_FACTOR, ReviewState, reschedule_intervals, sm2_review
+from flashcards.services import AIService, FlashcardService, MAX_REPORTED_ERRORS, QuotaExceededError, RateLimitService
+from flashcards.public_cache import PublicCollectionCache
+from flashcards.timing import track_external
 
-# Create your tests here.
+try:
+    import fakeredis
+except ImportError:  # grupo de dependências dev
+    fakeredis = None
+
+def query_plan(sql: str) -> list[str]:
+    """Plano de execução da consulta; no Postgres com seq scan desabilitado,
+    para que só apareça quando não existe índice utilizável"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + sql)
+            return [row[0] for row in cursor.fetchall()]
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+def full_scans(plan: list[str]) -> list[str]:
+    if connection.vendor == 'postgresql':
+        return [line for line in plan if 'Seq Scan' in line]
+    # SQLite: "SCAN tabela" sem "USING ... INDEX" é leitura da tabela inteira
+    return [line for line in plan if re.fullmatch(r'SCAN \w+', line.strip())]
+
+class QueryPlanTests(TestCase):
+    """As consultas dos endpoints mais usados devem ser resolvidas por índices"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='plan', email='plan@test.com', password='password123')
+        other = User.objects.create_user(username='other', email='other@test.com', password='password123')
+        cls.collection = Collection.objects.create(user=cls.user, name='c1', is_public=True)
+        shared = Collection.objects.create(user=other, name='c2')
+        Share.objects.create(collection=shared, shared_with=cls.user, share_id='plan-share')
+        cards = Flashcard.objects.bulk_create([
+            Flashcard(collection=collection, front=f'pergunta {i}', back=f'resposta {i}')
+            for collection in (cls.collection, shared)
+            for i in range(20)
+        ])
+        now = timezone.now()
+        CardReview.objects.bulk_create([
+            CardReview(user=cls.user, flashcard=card, due_at=now - timedelta(days=1), last_reviewed_at=now)
+            for card in cards[:5]
+        ])
+        cls.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + create_access_token(
+            cls.user.id, cls.user.email, cls.user.plan, cls.user.username
+        )}
+
+    def assertIndexedQueries(self, path, ordered=False):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path, **self.headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        selects = [q['sql'] for q in queries if q['sql'].lstrip().upper().startswith('SELECT')]
+        self.assertTrue(selects, f'{path} não executou consultas')
+        for sql in selects:
+            plan = query_plan(sql)
+            self.assertEqual(full_scans(plan), [], f'{path}: {sql}\n' + '\n'.join(plan))
+            if ordered and connection.vendor == 'sqlite':
+                # A ordenação da paginação keyset deve vir do índice, sem sort em memória
+                self.assertFalse(
+                    any('TEMP B-TREE' in line for line in plan),
+                    f'{path}: {sql}\n' + '\n'.join(plan)
+                )
+        return response
+
+    def test_list_collections(self):
+        self.assertIndexedQueries('/api/collections?limit=5', ordered=True)
+
+    def test_list_flashcards(self):
+        response = self.assertIndexedQueries(f'/api/collections/{self.collection.id}/flashcards?limit=5', ordered=True)
+        cursor = response.json()['data']['next_cursor']
+        self.assertIndexedQueries(f'/api/collections/{self.collection.id}/flashcards?limit=5&cursor={cursor}', ordered=True)
+
+    def test_search_flashcards(self):
+        self.assertIndexedQueries('/api/flashcards/search?q=pergunta')
+
+    def test_generation_logs(self):
+        self.assertIndexedQueries('/api/flashcards/generation-logs')
+
+    def test_due_reviews(self):
+        self.assertIndexedQueries('/api/reviews/due?limit=10')
+
+def parse_server_timing(header: str) -> dict:
+    metrics = {}
+    for entry in header.split(','):
+        name, *params = [part.strip() for part in entry.split(';')]
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+def openai_response(content):
+    """Cliente falso da OpenAI que responde sempre `content`"""
+    response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+    client = mock.MagicMock()
+    client.chat.completions.create = mock.AsyncMock(return_value=response)
+    return mock.patch('openai.AsyncOpenAI', return_value=client)
+
+class QuotaTests(TransactionTestCase):
+    """Cota diária: um UPSERT por reserva, sem passar do limite mesmo com reservas simultâneas"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='quota', email='quota@test.com', password='x')
+
+    def stored_count(self):
+        return GenerationLog.objects.get(user=self.user, date=date.today()).count
+
+    def test_insert_increment_and_refusal(self):
+        self.assertEqual(RateLimitService.increment_generation_count(self.user, 1, limit=3), 1)
+        self.assertEqual(RateLimitService.increment_generation_count(self.user, 2, limit=3), 3)
+        # O WHERE do UPSERT não casa: nenhuma linha retornada, contador intacto
+        self.assertIsNone(RateLimitService.increment_generation_count(self.user, 1, limit=3))
+        self.assertIsNone(RateLimitService.increment_generation_count(self.user, 4, limit=3))
+        self.assertEqual(self.stored_count(), 3)
+        # A recusa marca a cota como esgotada para as próximas verificações
+        self.assertTrue(RateLimitService.check_daily_limit(self.user)[0])
+        self.assertEqual(RateLimitService.increment_generation_count(self.user, 5), 8)
+
+    def test_concurrent_reservations_respect_limit(self):
+        def reserve(_):
+            try:
+                return RateLimitService.increment_generation_count(self.user, 1, limit=5)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(reserve, range(12)))
+        self.assertEqual(sorted(result for result in results if result is not None), [1, 2, 3, 4, 5])
+        self.assertEqual(results.count(None), 7)
+        self.assertEqual(self.stored_count(), 5)
+
+class GenerateTests(TestCase):
+    """Geração por IA: cartões e cota na mesma transação, view assíncrona sem ORM síncrono"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='generate', email='generate@test.com', password='x')
+        cls.collection = Collection.objects.create(user=cls.user, name='gerada')
+        cls.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + create_access_token(
+            cls.user.id, cls.user.email, cls.user.plan, cls.user.username
+        )}
+
+    def setUp(self):
+        cache.clear()
+        caches['ai_memory'].clear()
+        self.addCleanup(caches['ai_memory'].clear)
+
+    def test_quota_exceeded_rolls_back_cards(self):
+        limit = RateLimitService.daily_limit(self.user)
+        GenerationLog.objects.create(user=self.user, date=date.today(), count=limit)
+        cards = [{'front': 'a', 'back': 'b'}, {'front': 'c', 'back': 'd'}]
+
+        with self.assertRaises(QuotaExceededError):
+            FlashcardService.create_generated_flashcards(self.collection, self.user, cards, limit)
+        self.assertFalse(Flashcard.objects.filter(collection=self.collection).exists())
+        self.assertEqual(GenerationLog.objects.get(user=self.user).count, limit)
+
+    def test_quota_race_returns_429_without_cards(self):
+        # Outra requisição esgotou a cota entre a verificação e o UPSERT
+        limit = RateLimitService.daily_limit(self.user)
+        GenerationLog.objects.create(user=self.user, date=date.today(), count=limit)
+
+        async def request_flashcards(input_type, content):
+            return [{'front': 'a', 'back': 'b'}]
+
+        with mock.patch.object(RateLimitService, 'check_daily_limit', return_value=(False, 0, limit)), \
+                mock.patch.object(AIService, 'request_flashcards', request_flashcards):
+            response = self.client.post('/api/flashcards/generate', {
+                'input_type': 'topic', 'content': 'tema da corrida', 'collection_id': str(self.collection.id)
+            }, content_type='application/json', **self.headers)
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(Flashcard.objects.filter(collection=self.collection).exists())
+
+    async def test_async_view_without_sync_orm(self):
+        # No AsyncClient a view roda no event loop: qualquer acesso síncrono ao ORM
+        # levantaria SynchronousOnlyOperation
+        async def request_flashcards(input_type, content):
+            return [{'front': 'pergunta', 'back': 'resposta'}, {'front': 'outra', 'back': 'resposta'}]
+
+        with mock.patch.object(AIService, 'request_flashcards', request_flashcards):
+            response = await self.async_client.post('/api/flashcards/generate', {
+                'input_type': 'topic', 'content': 'tema assíncrono', 'collection_id': str(self.collection.id)
+            }, content_type='application/json', headers={'Authorization': self.headers['HTTP_AUTHORIZATION']})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['data']['count'], 2)
+        self.assertEqual(await Flashcard.objects.filter(collection=self.collection, created_by_ia=True).acount(), 2)
+        self.assertEqual((await GenerationLog.objects.aget(user=self.user)).count, 1)
+
+class AuthenticationTests(TestCase):
+    """Autenticação pelas claims do JWT: nenhuma consulta, campos adiados sob demanda"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth', email='auth@test.com', password='x', plan='pro')
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get('/api/collections')
+
+    def token(self, **claims):
+        return jwt.encode(
+            {'exp': timezone.now() + timedelta(hours=1), **claims}, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM
+        )
+
+    def full_token(self):
+        return create_access_token(self.user.id, self.user.email, self.user.plan, self.user.username)
+
+    def test_claims_need_no_query(self):
+        with self.assertNumQueries(0):
+            user = JWTAuth().authenticate(self.request, self.full_token())
+        self.assertEqual((user.pk, user.email, user.username, user.plan), (self.user.pk, 'auth@test.com', 'auth', 'pro'))
+        self.assertIs(self.request.user, user)
+
+        with self.assertNumQueries(0):
+            user = async_to_sync(AsyncJWTAuth().authenticate)(self.request, self.full_token())
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_deferred_fields_load_on_access(self):
+        with self.assertNumQueries(0):
+            user = JWTAuth().authenticate(self.request, self.full_token())
+        self.assertIn('created_at', user.get_deferred_fields())
+        with self.assertNumQueries(1):
+            self.assertEqual(user.created_at, self.user.created_at)
+        self.assertEqual(user.is_active, True)
+
+    def test_token_with_missing_claims(self):
+        auth = JWTAuth()
+        for claims in ({}, {'sub': 'não-é-uuid'}, {'sub': str(uuid.uuid4())}, {'email': 'auth@test.com', 'plan': 'pro'}):
+            with self.subTest(claims=claims):
+                self.assertIsNone(auth.authenticate(self.request, self.token(**claims)))
+                self.assertIsNone(async_to_sync(AsyncJWTAuth().authenticate)(self.request, self.token(**claims)))
+        response = self.client.get('/api/collections', HTTP_AUTHORIZATION='Bearer ' + self.token(sub='não-é-uuid'))
+        self.assertEqual(response.status_code, 401)
+
+        # Tokens antigos só com `sub` de um usuário existente: usuário do banco, com cache curto
+        legacy = self.token(sub=str(self.user.pk))
+        with self.assertNumQueries(1):
+            self.assertEqual(auth.authenticate(self.request, legacy).plan, 'pro')
+        with self.assertNumQueries(0):
+            self.assertEqual(auth.authenticate(self.request, legacy).pk, self.user.pk)
+
+    def test_invalid_or_expired_token(self):
+        expired = jwt.encode(
+            {'sub': str(self.user.pk), 'exp': timezone.now() - timedelta(seconds=1)},
+            settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM
+        )
+        forged = jwt.encode({'sub': str(self.user.pk)}, 'outra-chave-com-pelo-menos-32-bytes!!', algorithm='HS256')
+        for token in (expired, forged, 'lixo'):
+            self.assertIsNone(JWTAuth().authenticate(self.request, token))
+
+class PaginationTests(TestCase):
+    """Paginação keyset: desempate por id, sem repetições nem lacunas, e cursor inválido como 400"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='pages', email='pages@test.com', password='x')
+        cls.collection = Collection.objects.create(user=cls.user, name='paginação')
+        cls.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + create_access_token(
+            cls.user.id, cls.user.email, cls.user.plan, cls.user.username
+        )}
+
+    def test_pages_through_equal_timestamps(self):
+        now = timezone.now().replace(microsecond=0)
+        cards = Flashcard.objects.bulk_create([
+            Flashcard(collection=self.collection, front=f'f{n}', back='b') for n in range(12)
+        ])
+        # Dez cartões no mesmo instante entre dois outros: as páginas cortam no meio do empate
+        Flashcard.objects.filter(pk__in=[card.pk for card in cards]).update(created_at=now)
+        Flashcard.objects.filter(pk=cards[0].pk).update(created_at=now + timedelta(seconds=1))
+        Flashcard.objects.filter(pk=cards[-1].pk).update(created_at=now - timedelta(seconds=1))
+
+        ids, cursor, pages = [], None, 0
+        while True:
+            params = {'limit': 5, **({'cursor': cursor} if cursor else {})}
+            data = self.client.get(f'/api/collections/{self.collection.id}/flashcards', params).json()['data']
+            ids += [card['id'] for card in data['flashcards']]
+            cursor, pages = data['next_cursor'], pages + 1
+            if not cursor:
+                break
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(ids), 12)
+        self.assertEqual(set(ids), {str(card.pk) for card in cards})
+        self.assertEqual((ids[0], ids[-1]), (str(cards[0].pk), str(cards[-1].pk)))
+        self.assertEqual(ids[1:11], sorted(ids[1:11], key=uuid.UUID, reverse=True))
+
+    def test_cursor_round_trip(self):
+        created_at, id = timezone.now(), uuid.uuid4()
+        self.assertEqual(decode_cursor(encode_cursor(created_at, id)), (created_at, id))
+
+    def test_malformed_cursor_is_400(self):
+        def b64(text):
+            return base64.urlsafe_b64encode(text.encode()).decode()
+
+        cursors = [
+            'lixo!', 'é', b64('"x"'), b64('{}'), b64('[1, 2]'),
+            b64('["ontem", "00000000-0000-0000-0000-000000000000"]'),
+            b64('["2026-01-01T00:00:00", "não-é-uuid"]'),
+            b64('["2026-01-01T00:00:00", "00000000-0000-0000-0000-000000000000", 3]'),
+        ]
+        for cursor in cursors:
+            for path in ('/api/collections', f'/api/collections/{self.collection.id}/flashcards'):
+                with self.subTest(cursor=cursor, path=path):
+                    response = self.client.get(path, {'cursor': cursor}, **self.headers)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertEqual(response.json()['detail'], 'Cursor inválido')
+
+class ExportTests(TestCase):
+    """Exportação NDJSON: um objeto JSON por linha, datas e UUIDs como texto, só coleções acessíveis"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='export', email='export@test.com', password='x')
+        cls.other = User.objects.create_user(username='export-other', email='export-other@test.com', password='x')
+        cls.collection = Collection.objects.create(user=cls.owner, name='exportação')
+        cls.cards = [
+            Flashcard.objects.create(
+                collection=cls.collection, front=f'pergunta {n} "com aspas"\ne quebra', back='ação ☃',
+                extra={'tags': ['a']} if n == 0 else None
+            )
+            for n in range(5)
+        ]
+
+    def export(self, collection, user):
+        headers = {'HTTP_AUTHORIZATION': 'Bearer ' + create_access_token(user.id, user.email, user.plan, user.username)}
+        return self.client.get(f'/api/collections/{collection.id}/export', **headers)
+
+    @mock.patch('flashcards.services.EXPORT_CHUNK_SIZE', 2)
+    def test_one_object_per_line(self):
+        response = self.export(self.collection, self.owner)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.endswith('\n'))
+        self.assertIn('ação ☃', body)
+
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['id'] for row in rows], [str(card.id) for card in self.cards])
+        self.assertEqual(rows[0]['extra'], {'tags': ['a']})
+        for row in rows:
+            self.assertEqual(set(row), {'id', 'front', 'back', 'video_url', 'extra', 'created_by_ia', 'created_at', 'updated_at'})
+            self.assertEqual(str(uuid.UUID(row['id'])), row['id'])
+            datetime.fromisoformat(row['created_at'])
+            datetime.fromisoformat(row['updated_at'])
+
+    def test_inaccessible_collection(self):
+        self.assertEqual(self.export(self.collection, self.other).status_code, 404)
+        self.assertEqual(self.export(SimpleNamespace(id=uuid.uuid4()), self.owner).status_code, 404)
+        self.assertEqual(self.client.get(f'/api/collections/{self.collection.id}/export').status_code, 401)
+        Collection.objects.filter(pk=self.collection.pk).update(is_public=True)
+        self.assertEqual(self.export(self.collection, self.other).status_code, 200)
+
+class AIServiceTests(TestCase):
+    """Resposta da OpenAI normalizada antes de ir para o cache"""
+
+    def setUp(self):
+        caches['ai_memory'].clear()
+        self.addCleanup(caches['ai_memory'].clear)
+
+    def generate(self):
+        return async_to_sync(AIService.generate_flashcards)('topic', 'tema da normalização')
+
+    def cached(self):
+        key = AIService.cache_key('topic', 'tema da normalização', settings.OPENAI_MODEL)
+        return caches['ai_memory'].get(key), caches['ai_persistent'].get(key)
+
+    def test_invalid_results_are_not_cached(self):
+        for content in ('{"front": "a", "back": "b"}', '[{"front": "a"}, {"front": "", "back": "b"}, "x"]'):
+            with self.subTest(content=content), openai_response(content):
+                self.assertEqual(self.generate(), [])
+                self.assertEqual(self.cached(), (None, None))
+
+    def test_valid_cards_are_normalized(self):
+        with openai_response('[{"front": "a", "back": "b", "extra": 1}, {"back": "c"}]'):
+            self.assertEqual(self.generate(), [{'front': 'a', 'back': 'b'}])
+        self.assertEqual(self.cached(), ([{'front': 'a', 'back': 'b'}],) * 2)
+
+    def test_invalid_cached_entry_is_regenerated(self):
+        key = AIService.cache_key('topic', 'tema da normalização', settings.OPENAI_MODEL)
+        caches['ai_persistent'].set(key, {'front': 'a', 'back': 'b'})
+        with openai_response('[{"front": "a", "back": "b"}]'):
+            self.assertEqual(self.generate(), [{'front': 'a', 'back': 'b'}])
+
+@override_settings(MIDDLEWARE=['flashcards.timing.ServerTimingMiddleware', *settings.MIDDLEWARE])
+class ServerTimingTests(TestCase):
+    """Consultas, tempo de banco, serialização e chamadas externas no cabeçalho Server-Timing"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='timing', email='timing@test.com', password='password123', plan='pro')
+        cls.collection = Collection.objects.create(user=cls.user, name='c1')
+        cls.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + create_access_token(
+            cls.user.id, cls.user.email, cls.user.plan, cls.user.username
+        )}
+
+    def test_database_and_serialization(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/collections', **self.headers)
+        self.assertEqual(response.status_code, 200)
+        metrics = parse_server_timing(response['Server-Timing'])
+        self.assertEqual(metrics['db']['desc'], f'"{len(queries)} queries"')
+        self.assertGreater(float(metrics['db']['dur']), 0)
+        self.assertIn('dur', metrics['serialize'])
+        self.assertGreaterEqual(float(metrics['total']['dur']), float(metrics['db']['dur']))
+
+    def test_password_hashing(self):
+        response = self.client.post(
+            '/api/auth/login', {'email': 'timing@test.com', 'password': 'password123'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(float(parse_server_timing(response['Server-Timing'])['password']['dur']), 0)
+
+    def test_async_view(self):
+        async def request_flashcards(input_type, content):
+            with track_external('openai'):
+                return [{'front': 'pergunta', 'back': 'resposta'}]
+
+        with mock.patch.object(AIService, 'request_flashcards', request_flashcards):
+            response = self.client.post(
+                '/api/flashcards/generate',
+                {'input_type': 'topic', 'content': 'tema de teste', 'collection_id': str(self.collection.id)},
+                content_type='application/json', **self.headers
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        metrics = parse_server_timing(response['Server-Timing'])
+        self.assertNotEqual(metrics['db']['desc'], '"0 queries"')
+        self.assertIn('openai', metrics)
+
+    @override_settings(MIDDLEWARE=settings.MIDDLEWARE)
+    def test_disabled_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/health'))
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class QueryBudgetTests(TestCase):
+    """Número de consultas por endpoint e por página do admin: dentro do orçamento
+    e sem crescer com o número de linhas (N+1)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(username='budget', email='budget@test.com', password='password123', plan='pro')
+        cls.other = User.objects.create_user(username='budget-other', email='budget-other@test.com', password='password123')
+        cls.collection = Collection.objects.create(user=cls.user, name='principal')
+        cls.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + create_access_token(
+            cls.user.id, cls.user.email, cls.user.plan, cls.user.username
+        )}
+
+    def setUp(self):
+        self.rows = 0
+        self.add_rows(2)
+
+    def add_rows(self, count):
+        """Mais linhas em todas as tabelas listadas, cada uma com relacionamentos distintos"""
+        now = timezone.now()
+        for i in range(self.rows, self.rows + count):
+            owner = User.objects.create_user(username=f'owner{i}', email=f'owner{i}@test.com', password='x', plan='pro')
+            collection = Collection.objects.create(user=owner, name=f'coleção {i}')
+            Collection.objects.create(user=self.user, name=f'minha {i}')
+            Share.objects.create(collection=collection, shared_with=self.user, share_id=f'budget-share-{i}')
+            GenerationLog.objects.create(user=owner, count=i)
+            Payment.objects.create(user=owner, status='active')
+            for card_collection in (self.collection, collection):
+                card = Flashcard.objects.create(collection=card_collection, front=f'pergunta {i}', back=f'resposta {i}')
+                CardReview.objects.create(user=self.user, flashcard=card, due_at=now - timedelta(days=1), last_reviewed_at=now)
+        self.rows += count
+
+    def count_queries(self, path, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path, **headers)
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        return len(queries)
+
+    def assertQueryBudget(self, path, budget, **headers):
+        # A primeira requisição preenche caches do processo (sessão, content types)
+        self.count_queries(path, **headers)
+        small = self.count_queries(path, **headers)
+        self.add_rows(5)
+        large = self.count_queries(path, **headers)
+        self.assertEqual(small, large, f'{path}: {small} consultas com {self.rows - 5} linhas, {large} com {self.rows}')
+        self.assertLessEqual(large, budget, path)
+
+    def test_api_endpoints(self):
+        budgets = {
+            '/api/collections?limit=50': 2,
+            f'/api/collections/{self.collection.id}': 1,
+            f'/api/collections/{self.collection.id}/flashcards?limit=50': 3,
+            '/api/flashcards/search?q=pergunta&limit=50': 2,
+            '/api/flashcards/generation-logs': 2,
+            '/api/reviews/due?limit=50': 2,
+        }
+        for path, budget in budgets.items():
+            with self.subTest(path=path):
+                self.assertQueryBudget(path, budget, **self.headers)
+
+    def test_admin_changelists(self):
+        self.client.force_login(self.user)
+        for model in (User, Collection, Flashcard, Share, GenerationLog, Payment):
+            with self.subTest(model=model.__name__):
+                self.assertQueryBudget(f'/admin/flashcards/{model._meta.model_name}/', 8)
+
+    def test_admin_change_and_delete_pages(self):
+        """Selects de chave estrangeira e a confirmação de exclusão chamam __str__ em cada linha"""
+        self.client.force_login(self.user)
+        card = Flashcard.objects.filter(collection=self.collection).first()
+        share = Share.objects.first()
+        paths = {
+            f'/admin/flashcards/flashcard/{card.pk}/change/': 10,
+            f'/admin/flashcards/share/{share.pk}/change/': 10,
+            f'/admin/flashcards/collection/{self.collection.pk}/delete/': 12,
+            f'/admin/flashcards/user/{self.user.pk}/delete/': 20,
+        }
+        for path, budget in paths.items():
+            with self.subTest(path=path):
+                self.assertQueryBudget(path, budget)
+
+    def test_str_is_readable(self):
+        """Selects e listas do admin mostram nomes, não UUIDs"""
+        share = Share.objects.select_related('collection', 'shared_with').first()
+        self.assertEqual(str(share.collection), f'{share.collection.name} - {share.collection.user.username}')
+        self.assertEqual(str(share), f'{share.collection.name} - {self.user.username}')
+        card = Flashcard.objects.filter(collection=self.collection).first()
+        self.assertEqual(str(card), f'{card.front}... - principal')
+
+class SchedulerTests(SimpleTestCase):
+    """Agendador SM-2: lapsos, progressão dos intervalos e limites"""
+
+    def test_lapse_resets_repetitions(self):
+        state = sm2_review(ReviewState(ease_factor=2.5, interval_days=40.0, repetitions=5, lapses=1), quality=2)
+        self.assertEqual((state.interval_days, state.repetitions, state.lapses), (1.0, 0, 2))
+        self.assertAlmostEqual(state.ease_factor, 2.18)
+        # Depois do lapso o cartão volta aos passos fixos
+        self.assertEqual(sm2_review(state, quality=4).interval_days, 1.0)
+
+    def test_interval_progression(self):
+        state = ReviewState()
+        intervals = []
+        for _ in range(4):
+            state = sm2_review(state, quality=5)
+            intervals.append(state.interval_days)
+        # 1 → 6 → intervalo anterior × fator anterior (2.7, depois 2.8)
+        for interval, expected in zip(intervals, [1.0, 6.0, 16.2, 45.36]):
+            self.assertAlmostEqual(interval, expected)
+        self.assertAlmostEqual(state.ease_factor, 2.9)
+
+    def test_ease_factor_floor(self):
+        state = sm2_review(ReviewState(ease_factor=1.35, interval_days=10.0, repetitions=3), quality=3)
+        self.assertEqual(state.ease_factor, MIN_EASE_FACTOR)
+        self.assertAlmostEqual(state.interval_days, 13.5)
+        self.assertEqual(sm2_review(ReviewState(ease_factor=MIN_EASE_FACTOR), quality=0).ease_factor, MIN_EASE_FACTOR)
+
+    def test_interval_is_clamped_to_maximum(self):
+        state = ReviewState(ease_factor=2.5, interval_days=300.0, repetitions=6)
+        self.assertEqual(sm2_review(state, quality=5, maximum_interval_days=365).interval_days, 365.0)
+        self.assertAlmostEqual(sm2_review(state, quality=5, interval_modifier=0.1).interval_days, 75.0)
+        self.assertEqual(sm2_review(ReviewState(repetitions=1), quality=5, maximum_interval_days=3).interval_days, 3.0)
+
+    def test_reschedule_skips_learning_steps(self):
+        reviewed = timezone.now().replace(tzinfo=None)
+        intervals, due = reschedule_intervals([reviewed] * 4, [1.0, 6.0, 10.0, 200.0], [1, 2, 3, 8], 2.0, 365)
+        self.assertEqual(list(intervals), [1.0, 6.0, 20.0, 365.0])
+        self.assertEqual(list(due), [reviewed + timedelta(days=days) for days in (1, 6, 20, 365)])
+
+        intervals, _ = reschedule_intervals([reviewed] * 2, [6.0, 10.0], [2, 3], 0.5, 4)
+        self.assertEqual(list(intervals), [4.0, 4.0])
+
+class ReviewQueueTests(TestCase):
+    """Fila de revisão e configurações do agendador"""
+
+    def test_shared_cards_are_due_as_new(self):
+        owner = User.objects.create_user(username='reviews-owner', email='reviews-owner@test.com', password='x')
+        reader = User.objects.create_user(username='reviews-reader', email='reviews-reader@test.com', password='x')
+        headers = {'HTTP_AUTHORIZATION': 'Bearer ' + create_access_token(reader.id, reader.email, reader.plan, reader.username)}
+        collection = Collection.objects.create(user=owner, name='compartilhada')
+        card = Flashcard.objects.create(collection=collection, front='f', back='b')
+
+        def due():
+            cards = self.client.get('/api/reviews/due', **headers).json()['data']['cards']
+            return [c['flashcard']['id'] for c in cards]
+
+        self.assertNotIn(str(card.id), due())
+        Share.objects.create(collection=collection, shared_with=reader, share_id='reviews-share')
+        self.assertIn(str(card.id), due())
+
+        response = self.client.post(f'/api/reviews/{card.id}', {'quality': 4}, content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(str(card.id), due())
+
+    def test_settings_rescale_graduated_cards_only(self):
+        user = User.objects.create_user(username='reviews-settings', email='reviews-settings@test.com', password='x')
+        headers = {'HTTP_AUTHORIZATION': 'Bearer ' + create_access_token(user.id, user.email, user.plan, user.username)}
+        collection = Collection.objects.create(user=user, name='agendador')
+        learning, graduated = [Flashcard.objects.create(collection=collection, front=f'f{n}', back='b') for n in range(2)]
+        for card, reviews in ((learning, 2), (graduated, 3)):
+            for _ in range(reviews):
+                self.client.post(f'/api/reviews/{card.id}', {'quality': 5}, content_type='application/json', **headers)
+
+        def intervals():
+            return dict(CardReview.objects.filter(user=user).values_list('flashcard_id', 'interval_days'))
+
+        def update(interval_modifier, maximum_interval_days):
+            return self.client.put('/api/reviews/settings', {
+                'interval_modifier': interval_modifier, 'maximum_interval_days': maximum_interval_days
+            }, content_type='application/json', **headers)
+
+        self.assertAlmostEqual(intervals()[graduated.id], 16.2)
+        response = update(2.0, 365)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'], {'interval_modifier': 2.0, 'maximum_interval_days': 365, 'rescheduled': 2})
+        # O passo fixo de 6 dias fica como está; só o intervalo calculado é reescalado
+        self.assertEqual(intervals()[learning.id], 6.0)
+        self.assertAlmostEqual(intervals()[graduated.id], 32.4)
+
+        update(1.0, 5)
+        self.assertEqual(intervals(), {learning.id: 5.0, graduated.id: 5.0})
+        self.assertEqual(update(0, 5).status_code, 422)
+
+class ConditionalListTests(TestCase):
+    """ETag das listagens: exclusões também invalidam a versão que o cliente tem"""
+
+    def test_delete_then_conditional_get(self):
+        user = User.objects.create_user(username='conditional', email='conditional@test.com', password='x')
+        headers = {'HTTP_AUTHORIZATION': 'Bearer ' + create_access_token(user.id, user.email, user.plan, user.username)}
+        collection = Collection.objects.create(user=user, name='condicional')
+        cards = [Flashcard.objects.create(collection=collection, front=f'f{i}', back='b') for i in range(2)]
+        path = f'/api/collections/{collection.id}/flashcards'
+
+        first = self.client.get(path, **headers)
+        self.assertNotIn('Last-Modified', first)
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=first['ETag'], **headers).status_code, 304)
+
+        self.client.delete(f'/api/flashcards/{cards[-1].id}', **headers)
+
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=first['ETag'], **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        # If-Modified-Since sozinho não gera 304: a data não acompanha exclusões
+        since = http_date(timezone.now().timestamp() + 60)
+        self.assertEqual(self.client.get(path, HTTP_IF_MODIFIED_SINCE=since, **headers).status_code, 200)
+
+class PublicCacheTests(TestCase):
+    """Entradas invalidadas do cache de coleções públicas nunca voltam a ser lidas"""
+
+    def setUp(self):
+        caches['public'].clear()
+        self.user = User.objects.create_user(username='public', email='public@test.com', password='x')
+        self.collection = Collection.objects.create(user=self.user, name='pública', is_public=True)
+        Flashcard.objects.create(collection=self.collection, front='a', back='b')
+
+    def test_write_between_query_and_set(self):
+        paginate_keyset = api.paginate_keyset
+
+        def paginate_then_write(*args, **kwargs):
+            page = paginate_keyset(*args, **kwargs)
+            # Escrita concluída depois da consulta e antes do PublicCollectionCache.set
+            with self.captureOnCommitCallbacks(execute=True):
+                Flashcard.objects.create(collection=self.collection, front='nova', back='b')
+            return page
+
+        path = f'/api/collections/{self.collection.id}/flashcards'
+        with mock.patch.object(api, 'paginate_keyset', paginate_then_write):
+            self.assertEqual(len(self.client.get(path).json()['data']['flashcards']), 1)
+        self.assertEqual(len(self.client.get(path).json()['data']['flashcards']), 2)
+
+# Servidor Redis falso no mesmo processo, falando o protocolo pelo cliente redis-py
+REDIS_STAND_IN = {
+    'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+    'LOCATION': 'redis://public-cache-stand-in:6379/0',
+    'OPTIONS': {'connection_class': fakeredis.FakeConnection} if fakeredis else {},
+}
+
+@skipUnless(fakeredis, "fakeredis não instalado (uv sync --group dev)")
+@override_settings(CACHES={**settings.CACHES, 'public': REDIS_STAND_IN}, PUBLIC_CACHE_TIMEOUT=300)
+class RedisPublicCacheTests(TestCase):
+    """Cache público no backend Redis: versão por coleção compartilhada entre processos"""
+
+    def setUp(self):
+        caches['public'].clear()
+        self.user = User.objects.create_user(username='redis-public', email='redis-public@test.com', password='x')
+        self.collection = Collection.objects.create(user=self.user, name='pública', is_public=True)
+        Flashcard.objects.create(collection=self.collection, front='a', back='b')
+        # Outro worker: cliente e pool de conexões próprios, mesmo servidor
+        self.other_worker = RedisCache(REDIS_STAND_IN['LOCATION'], {'OPTIONS': REDIS_STAND_IN['OPTIONS']})
+
+    def test_entries_are_shared(self):
+        self.assertIsInstance(caches['public'], RedisCache)
+        key = PublicCollectionCache.key(self.collection.id, 'page')
+        PublicCollectionCache.set(key, ('etag', {'data': 1}))
+        self.assertEqual(self.other_worker.get(key), ('etag', {'data': 1}))
+
+    def test_invalidation_after_commit_reaches_other_workers(self):
+        key = PublicCollectionCache.key(self.collection.id, 'page')
+        PublicCollectionCache.set(key, 'antigo')
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            PublicCollectionCache.invalidate(self.collection.id)
+            # Antes do commit a versão continua valendo
+            self.assertEqual(PublicCollectionCache.key(self.collection.id, 'page'), key)
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+
+        version_key = f'public-collection:{self.collection.id}:version'
+        self.assertIsNone(self.other_worker.get(version_key))
+        new_key = PublicCollectionCache.key(self.collection.id, 'page')
+        self.assertNotEqual(new_key, key)
+        self.assertEqual(self.other_worker.get(version_key), new_key.split(':')[2])
+        self.assertIsNone(PublicCollectionCache.get(new_key))
+
+    def test_listing_is_invalidated_by_writes(self):
+        path = f'/api/collections/{self.collection.id}/flashcards'
+        self.assertEqual(len(self.client.get(path).json()['data']['flashcards']), 1)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(self.client.get(path).json()['data']['flashcards']), 1)
+        self.assertEqual(len(queries), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Flashcard.objects.create(collection=self.collection, front='nova', back='b')
+        self.assertEqual(len(self.client.get(path).json()['data']['flashcards']), 2)
+
+class ImportTests(TestCase):
+    """Importação em lotes: limite de cartões conferido por lote e erros reportados com teto"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='import', email='import@test.com', password='x')
+        self.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + create_access_token(
+            self.user.id, self.user.email, self.user.plan, self.user.username
+        )}
+        self.collection = Collection.objects.create(user=self.user, name='importação')
+
+    def import_ndjson(self, lines):
+        response = self.client.post(
+            f'/api/collections/{self.collection.id}/flashcards/import', '\n'.join(lines),
+            content_type='application/x-ndjson', **self.headers
+        )
+        return response.json()['data']
+
+    def test_reported_errors_are_capped(self):
+        lines = ['{"front": "a"}'] * (MAX_REPORTED_ERRORS + 150) + ['{"front": "a", "back": "b"}']
+        data = self.import_ndjson(lines)
+        self.assertEqual(data['imported'], 1)
+        self.assertEqual(data['failed'], MAX_REPORTED_ERRORS + 150)
+        self.assertEqual([error['row'] for error in data['errors']], list(range(1, MAX_REPORTED_ERRORS + 1)))
+
+    @mock.patch('flashcards.services.IMPORT_BATCH_SIZE', 40)
+    def test_max_cards_across_batches(self):
+        Collection.objects.filter(pk=self.collection.pk).update(max_cards=100)
+        self.collection.refresh_from_db()
+        data = self.import_ndjson([f'{{"front": "f{n}", "back": "b"}}' for n in range(130)])
+        self.assertEqual(data['imported'], self.collection.max_cards)
+        self.assertEqual(data['failed'], 130 - self.collection.max_cards)
+        self.assertEqual(Flashcard.objects.filter(collection=self.collection).count(), self.collection.max_cards)
+
+class BatchFlashcardsTests(TestCase):
+    """Exclusão, edição e movimentação em lote, só sobre cartões do usuário"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='batch', email='batch@test.com', password='x')
+        cls.other = User.objects.create_user(username='batch-other', email='batch-other@test.com', password='x')
+        cls.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + create_access_token(
+            cls.user.id, cls.user.email, cls.user.plan, cls.user.username
+        )}
+
+    def setUp(self):
+        caches['public'].clear()
+        self.source = Collection.objects.create(user=self.user, name='origem', is_public=True)
+        self.target = Collection.objects.create(user=self.user, name='destino', is_public=True)
+        self.cards = [
+            Flashcard.objects.create(collection=self.source, front=f'pergunta {i}', back=f'resposta {i}')
+            for i in range(3)
+        ]
+        self.foreign = Flashcard.objects.create(
+            collection=Collection.objects.create(user=self.other, name='alheia'), front='f', back='b'
+        )
+
+    def batch(self, cards, operation, **data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/flashcards/batch', {
+                'ids': [str(card.id) for card in cards], 'operation': operation, **data
+            }, content_type='application/json', **self.headers)
+
+    def card_ids(self, collection):
+        response = self.client.get(f'/api/collections/{collection.id}/flashcards?limit=50')
+        return {card['id'] for card in response.json()['data']['flashcards']}
+
+    def test_delete_checks_ownership(self):
+        CardReview.objects.create(
+            user=self.user, flashcard=self.cards[0], due_at=timezone.now(), last_reviewed_at=timezone.now()
+        )
+        response = self.batch([*self.cards[:2], self.foreign], 'delete')
+        self.assertEqual(response.json()['data'], {'affected': 2, 'skipped': 1})
+        self.assertEqual(set(Flashcard.objects.filter(collection=self.source)), {self.cards[2]})
+        self.assertTrue(Flashcard.objects.filter(pk=self.foreign.pk).exists())
+        self.assertFalse(CardReview.objects.exists())
+
+    def test_update_fields(self):
+        before = Flashcard.objects.get(pk=self.cards[0].pk).updated_at
+        response = self.batch([*self.cards[:2], self.foreign], 'update', fields={'back': 'revisado'})
+        self.assertEqual(response.json()['data'], {'affected': 2, 'skipped': 1})
+        backs = dict(Flashcard.objects.values_list('id', 'back'))
+        self.assertEqual(
+            [backs[card.id] for card in (*self.cards, self.foreign)], ['revisado', 'revisado', 'resposta 2', 'b']
+        )
+        self.assertGreater(Flashcard.objects.get(pk=self.cards[0].pk).updated_at, before)
+
+        for fields in ({'front': None}, {'video_url': 'https://example.com'}, {}):
+            with self.subTest(fields=fields):
+                self.assertEqual(self.batch(self.cards, 'update', fields=fields).status_code, 422)
+
+    def test_move(self):
+        response = self.batch([*self.cards[:2], self.foreign], 'move', target_collection_id=str(self.target.id))
+        self.assertEqual(response.json()['data'], {'affected': 2, 'skipped': 1})
+        self.assertEqual(set(Flashcard.objects.filter(collection=self.target)), set(self.cards[:2]))
+
+        other_collection = self.foreign.collection
+        response = self.batch(self.cards, 'move', target_collection_id=str(other_collection.id))
+        self.assertEqual(response.status_code, 404)
+
+    def test_move_respects_max_cards(self):
+        Flashcard.objects.bulk_create([
+            Flashcard(collection=self.target, front=f'f{i}', back='b') for i in range(self.target.max_cards - 2)
+        ])
+        response = self.batch(self.cards, 'move', target_collection_id=str(self.target.id))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Flashcard.objects.filter(collection=self.source).count(), 3)
+
+    def test_invalidates_public_cache(self):
+        all_ids = {str(card.id) for card in self.cards}
+        self.assertEqual(self.card_ids(self.source), all_ids)
+        self.assertEqual(self.card_ids(self.target), set())
+
+        self.batch(self.cards[:1], 'delete')
+        self.batch(self.cards[1:2], 'update', fields={'front': 'nova'})
+        self.batch(self.cards[2:], 'move', target_collection_id=str(self.target.id))
+
+        self.assertEqual(self.card_ids(self.source), {str(self.cards[1].id)})
+        self.assertEqual(self.card_ids(self.target), {str(self.cards[2].id)})
+
+    def test_queries_do_not_grow_with_ids(self):
+        Collection.objects.filter(pk=self.target.pk).update(max_cards=100)
+        cards = [
+            Flashcard.objects.create(collection=self.source, front=f'extra {i}', back='b') for i in range(20)
+        ]
+        # Orçamentos incluem o SAVEPOINT e o RELEASE do transaction.atomic
+        for operation, data, budget in (
+            ('update', {'fields': {'front': 'nova'}}, 4),
+            ('move', {'target_collection_id': str(self.target.id)}, 6),
+            ('delete', {}, 5),
+        ):
+            with self.subTest(operation=operation):
+                self.batch(self.cards, operation, **data)  # usuário autenticado entra no cache
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.batch(cards, operation, **data)
+                self.assertEqual(response.json()['data']['affected'], 20)
+                self.assertLessEqual(len(queries), budget, [q['sql'] for q in queries])
+
+class ReplicaRoutingTests(SimpleTestCase):
+    """Banco escolhido pelo roteador para as leituras de cada requisição"""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.router = PrimaryReplicaRouter()
+        self.middleware = ReplicaRoutingMiddleware(
+            lambda request: self.router.db_for_read(Collection)
+        )
+
+    def read_db(self, method, path, token=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        return self.middleware(self.factory.generic(method, path, headers=headers))
+
+    def test_outside_request_uses_primary(self):
+        self.assertEqual(self.router.db_for_read(Collection), 'default')
+        self.assertEqual(self.router.db_for_write(Collection), 'default')
+        self.assertFalse(self.router.allow_migrate('replica', 'flashcards'))
+
+    def test_api_reads_use_replica(self):
+        self.assertEqual(self.read_db('GET', '/api/collections', 'a'), 'replica')
+        self.assertEqual(self.read_db('GET', '/admin/flashcards/collection/', 'a'), 'default')
+        self.assertEqual(self.read_db('POST', '/api/collections', 'a'), 'default')
+
+    def test_read_your_writes(self):
+        self.read_db('POST', '/api/collections', 'a')
+        self.assertEqual(self.read_db('GET', '/api/collections', 'a'), 'default')
+        # Outros clientes continuam na réplica
+        self.assertEqual(self.read_db('GET', '/api/collections', 'b'), 'replica')
+
+    @override_settings(REPLICA_STICKY_SECONDS=0)
+    def test_sticky_window_expires(self):
+        self.read_db('POST', '/api/collections', 'a')
+        self.assertEqual(self.read_db('GET', '/api/collections', 'a'), 'replica')
@@ -0,0 +1,114 @@
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+from django.db import connections
+from ninja.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RequestTimings:
+    """Tempos acumulados durante uma requisição, em milissegundos"""
+    db_queries: int = 0
+    db_ms: float = 0.0
+    serialize_ms: float = 0.0
+    external_ms: dict = field(default_factory=dict)
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_ms += (time.perf_counter() - start) * 1000
+
+    def server_timing(self, total_ms: float) -> str:
+        metrics = [
+            f'db;dur={self.db_ms:.2f};desc="{self.db_queries} queries"',
+            f'serialize;dur={self.serialize_ms:.2f}',
+        ]
+        metrics += [f'{name};dur={ms:.2f}' for name, ms in self.external_ms.items()]
+        metrics.append(f'total;dur={total_ms:.2f}')
+        return ', '.join(metrics)
+
+    def as_log(self, total_ms: float) -> dict:
+        return {
+            'total_ms': round(total_ms, 2),
+            'db_queries': self.db_queries,
+            'db_ms': round(self.db_ms, 2),
+            'serialize_ms': round(self.serialize_ms, 2),
+            **{f'{name}_ms': round(ms, 2) for name, ms in self.external_ms.items()},
+        }
+
+# Só existe dentro do ServerTimingMiddleware; com a medição desligada os
+# pontos instrumentados fazem apenas esta leitura
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar('current_timings', default=None)
+
+@contextmanager
+def track_serialization() -> Iterator[None]:
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.serialize_ms += (time.perf_counter() - start) * 1000
+
+@contextmanager
+def track_external(name: str) -> Iterator[None]:
+    """Tempo de espera por um serviço externo (OpenAI, hash de senha...)"""
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        timings.external_ms[name] = timings.external_ms.get(name, 0.0) + elapsed
+
+class TimedJSONRenderer(JSONRenderer):
+    """Renderer padrão do Ninja com a serialização contada no Server-Timing"""
+
+    def render(self, request, data, *, response_status):
+        with track_serialization():
+            return super().render(request, data, response_status=response_status)
+
+class ServerTimingMiddleware:
+    """Cabeçalho Server-Timing e uma linha de log JSON por requisição
+
+    Ativado com SERVER_TIMING_ENABLED. Em respostas em streaming o corpo é
+    gerado depois e fica fora dos tempos.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(timings.execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+
+        total_ms = (time.perf_counter() - start) * 1000
+        response['Server-Timing'] = timings.server_timing(total_ms)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **timings.as_log(total_ms),
+        }))
+        return response
@@ -3,12 +3,47 @@ from typing import Optional
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Réplica de leitura opcional (endpoints de listagem/consulta); sem ela tudo vai para o primário
+    DATABASE_REPLICA_URL: Optional[str] = None
+    # Após uma escrita, o mesmo cliente lê do primário por esta janela (read-your-writes, por worker)
+    REPLICA_STICKY_SECONDS: int = 5
+    REPLICA_STICKY_MAX_SIZE: int = 10000
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_HOURS: int = 1
+    # Custo do bcrypt; hashes com outro custo são refeitos no login
+    BCRYPT_ROUNDS: int = 12
+    # Pool de processos para o bcrypt, fora do event loop (por worker)
+    PASSWORD_HASHER_WORKERS: int = 2
+    PASSWORD_HASHER_MAX_PENDING: int = 64
     OPENAI_API_KEY: str
+    OPENAI_MODEL: str = "gpt-3.5-turbo"
     ENV: str = "development"
-    DEBUG: bool = True
+    DEBUG: bool = False
+    # Loga todo SQL executado; só para depuração local
+    SQL_ECHO: bool = False
+    # Verificar no startup se o banco está na última migração (em segundo plano)
+    SCHEMA_CHECK_ON_STARTUP: bool = True
+    # Cabeçalho Server-Timing e log JSON por requisição (banco, serialização, chamadas externas)
+    SERVER_TIMING_ENABLED: bool = False
+    # Cache de usuários autenticados (por worker); o TTL limita quanto tempo
+    # outro worker pode servir um plano desatualizado após uma alteração
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    # Fila de geração de flashcards por IA (por worker)
+    GENERATION_WORKERS: int = 4
+    GENERATION_QUEUE_SIZE: int = 100
+    GENERATION_JOB_TTL_SECONDS: int = 3600
+    # Limite de rajada em memória (por worker), antes da cota diária no banco; 0 desativa
+    GENERATION_RATE_LIMIT: int = 10
+    GENERATION_RATE_WINDOW_SECONDS: int = 60
+    # Cache de resultados da IA: LRU em memória (por worker) + tabela no banco
+    AI_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    AI_CACHE_MEMORY_SIZE: int = 1000
+    AI_CACHE_MAX_ROWS: int = 100000
+    # Cache de leituras de coleções públicas (por worker; o TTL limita a defasagem entre workers)
+    PUBLIC_CACHE_TTL_SECONDS: int = 30
+    PUBLIC_CACHE_MAX_SIZE: int = 10000
 
     class Config:
         env_file = ".env"
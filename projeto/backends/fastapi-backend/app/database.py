@@ -1,24 +1,112 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session, declarative_base
+import hashlib
+from fastapi import Request
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base
 from app.config import settings
-from typing import Generator
+from app.utils.cache import TTLCache
+from typing import AsyncGenerator, Optional
 
 # Base para ORM models
 Base = declarative_base()
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True
+# Drivers assíncronos equivalentes aos drivers síncronos da DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(url: str):
+    database_url = make_url(url)
+    drivername = ASYNC_DRIVERS.get(database_url.drivername, database_url.drivername)
+    return database_url.set(drivername=drivername)
+
+database_url = get_async_database_url(settings.DATABASE_URL)
+
+engine_options = {"echo": settings.SQL_ECHO, "pool_pre_ping": True}
+if database_url.get_backend_name() != "sqlite":
+    engine_options.update(pool_size=10, max_overflow=20)
+
+engine = create_async_engine(database_url, **engine_options)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Réplica de leitura: sem DATABASE_REPLICA_URL, as sessões de leitura usam o primário
+replica_enabled = bool(settings.DATABASE_REPLICA_URL)
+read_engine = (
+    create_async_engine(get_async_database_url(settings.DATABASE_REPLICA_URL), **engine_options)
+    if replica_enabled else engine
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Clientes (hash do cabeçalho Authorization) que escreveram há pouco; a réplica pode
+# ainda não ter a escrita. Por worker: outro worker pode servir a leitura da réplica
+recent_writers = TTLCache(maxsize=settings.REPLICA_STICKY_MAX_SIZE, ttl=settings.REPLICA_STICKY_SECONDS)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+def writer_key(authorization: Optional[str]) -> Optional[str]:
+    # O token não fica em memória, só o hash
+    return hashlib.sha256(authorization.encode()).hexdigest() if authorization else None
 
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
+
+def read_session_factory(request: Request) -> async_sessionmaker:
+    """Réplica, exceto para quem escreveu dentro da janela de REPLICA_STICKY_SECONDS"""
+    key = writer_key(request.headers.get("authorization"))
+    if not replica_enabled or (key and recent_writers.get(key)):
+        return AsyncSessionLocal
+    return AsyncReadSessionLocal
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Sessão para endpoints que só leem; escritas nela falham na réplica"""
+    async with read_session_factory(request)() as db:
+        yield db
+
+class ReadYourWritesMiddleware:
+    """Marca o cliente em recent_writers ao fim de requisições que escrevem
+
+    A marca é gravada antes de o início da resposta sair, para que a próxima
+    leitura do cliente já vá para o primário (o teardown das dependências pode
+    rodar depois do envio), e de novo ao final, para respostas em streaming.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not replica_enabled or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        key = writer_key(Headers(scope=scope).get("authorization"))
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_mark(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                recent_writers.set(key, True)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_mark)
+        finally:
+            recent_writers.set(key, True)
@@ -1,11 +1,18 @@
-from sqlalchemy import Column, String, Boolean, Integer, DateTime, ForeignKey, Text, JSON, Enum
+from sqlalchemy import Column, String, Boolean, Integer, Float, Date, DateTime, ForeignKey, Text, JSON, Enum, Index, UniqueConstraint, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.database import Base
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from enum import Enum as PyEnum
 
+def utcnow() -> datetime:
+    # Colunas DateTime sem timezone: o asyncpg não aceita datetimes com tzinfo
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def utctoday() -> date:
+    return utcnow().date()
+
 class UserPlan(str, PyEnum):
     FREE = "free"
     PRO = "pro"
@@ -18,56 +25,87 @@ class User(Base):
     email = Column(String(255), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
     plan = Column(String(20), default=UserPlan.FREE)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
     collections = relationship("Collection", back_populates="user", cascade="all, delete")
 
 class Collection(Base):
     __tablename__ = "collections"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     is_public = Column(Boolean, default=False)
     max_cards = Column(Integer, default=100)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
     user = relationship("User", back_populates="collections")
     flashcards = relationship("Flashcard", back_populates="collection", cascade="all, delete")
 
+    # Listagem paginada por usuário (keyset em created_at, id)
+    __table_args__ = (
+        Index("ix_collections_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
 class Flashcard(Base):
     __tablename__ = "flashcards"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    collection_id = Column(UUID(as_uuid=True), ForeignKey("collections.id", ondelete="CASCADE"), nullable=False, index=True)
+    collection_id = Column(UUID(as_uuid=True), ForeignKey("collections.id", ondelete="CASCADE"), nullable=False)
     front = Column(Text, nullable=False)
     back = Column(Text, nullable=False)
     video_url = Column(String(1000), nullable=True)
     extra = Column(JSON)
     created_by_ia = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
     collection = relationship("Collection", back_populates="flashcards")
 
+    __table_args__ = (
+        # Listagem paginada por coleção (keyset em created_at, id)
+        Index("ix_flashcards_collection_id_created_at_id", "collection_id", "created_at", "id"),
+        # ETag da listagem: count e max(updated_at) por coleção
+        Index("ix_flashcards_collection_id_updated_at", "collection_id", "updated_at"),
+        # Busca por trigramas (pg_trgm) em front/back; no SQLite a busca usa FTS5
+        Index(
+            "ix_flashcards_front_trgm", "front",
+            postgresql_using="gin", postgresql_ops={"front": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_flashcards_back_trgm", "back",
+            postgresql_using="gin", postgresql_ops={"back": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+
 class Share(Base):
     __tablename__ = "shares"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     collection_id = Column(UUID(as_uuid=True), ForeignKey("collections.id", ondelete="CASCADE"), nullable=False, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     permissions = Column(String(20), default="read")
     share_id = Column(String(50), unique=True, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+
+    __table_args__ = (
+        # Coleções compartilhadas com o usuário (busca e listagens), só pelo índice
+        Index("ix_shares_user_id_collection_id", "user_id", "collection_id"),
+    )
 
 class GenerationLog(Base):
     __tablename__ = "generation_logs"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    date = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    date = Column(Date, default=utctoday, nullable=False)
     count = Column(Integer, default=0)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+
+    __table_args__ = (
+        # Um registro por usuário e dia; alvo do UPSERT que contabiliza a cota
+        UniqueConstraint("user_id", "date", name="uq_generation_logs_user_id_date"),
+    )
 
 class Payment(Base):
     __tablename__ = "payments"
@@ -78,5 +116,73 @@ class Payment(Base):
     status = Column(String(20), default="pending")
     start_date = Column(DateTime)
     end_date = Column(DateTime)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
\ No newline at end of file
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
+
+class CardReview(Base):
+    __tablename__ = "card_reviews"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    flashcard_id = Column(UUID(as_uuid=True), ForeignKey("flashcards.id", ondelete="CASCADE"), nullable=False)
+    ease_factor = Column(Float, default=2.5, nullable=False)
+    interval_days = Column(Float, default=0, nullable=False)
+    repetitions = Column(Integer, default=0, nullable=False)
+    lapses = Column(Integer, default=0, nullable=False)
+    due_at = Column(DateTime, nullable=False)
+    last_reviewed_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "flashcard_id", name="uq_card_reviews_user_id_flashcard_id"),
+        # Fila de revisões vencidas por usuário
+        Index("ix_card_reviews_user_id_due_at", "user_id", "due_at"),
+    )
+
+class ReviewSettings(Base):
+    __tablename__ = "review_settings"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    interval_modifier = Column(Float, default=1.0, nullable=False)
+    maximum_interval_days = Column(Integer, default=365, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
+
+class AIGenerationCache(Base):
+    __tablename__ = "ai_generation_cache"
+    
+    key = Column(String(64), primary_key=True)
+    input_type = Column(String(20), nullable=False)
+    model = Column(String(100), nullable=False)
+    prompt_version = Column(String(20), nullable=False)
+    flashcards = Column(JSON, nullable=False)
+    hits = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=utcnow, nullable=False, index=True)
+    last_accessed_at = Column(DateTime, default=utcnow, nullable=False, index=True)
+
+
+# Índice de busca textual para desenvolvimento local com SQLite (FTS5 com tokenizer de trigramas)
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS flashcards_fts USING fts5("
+    "front, back, content='flashcards', content_rowid='rowid', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS flashcards_fts_ai AFTER INSERT ON flashcards BEGIN "
+    "INSERT INTO flashcards_fts(rowid, front, back) VALUES (new.rowid, new.front, new.back); END",
+    "CREATE TRIGGER IF NOT EXISTS flashcards_fts_ad AFTER DELETE ON flashcards BEGIN "
+    "INSERT INTO flashcards_fts(flashcards_fts, rowid, front, back) VALUES ('delete', old.rowid, old.front, old.back); END",
+    "CREATE TRIGGER IF NOT EXISTS flashcards_fts_au AFTER UPDATE ON flashcards BEGIN "
+    "INSERT INTO flashcards_fts(flashcards_fts, rowid, front, back) VALUES ('delete', old.rowid, old.front, old.back); "
+    "INSERT INTO flashcards_fts(rowid, front, back) VALUES (new.rowid, new.front, new.back); END",
+]
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+for statement in SQLITE_FTS_DDL:
+    event.listen(Flashcard.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    Flashcard.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS flashcards_fts").execute_if(dialect="sqlite")
+)
@@ -1,3 +1,3 @@
-from . import auth, collections, flashcards, shares, subscriptions
+from . import auth, collections, flashcards, reviews, shares, subscriptions
 
-__all__ = ["auth", "collections", "flashcards", "shares", "subscriptions"]
\ No newline at end of file
+__all__ = ["auth", "collections", "flashcards", "reviews", "shares", "subscriptions"]
\ No newline at end of file
@@ -1,14 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
 from app.database import get_db
 from app.models import User, UserPlan
-from app.schemas import RegisterRequest, LoginRequest, UserResponse, ApiResponse
-from app.security import hash_password, verify_password, create_access_token, decode_access_token, get_current_user_from_token
+from app.schemas import RegisterRequest, LoginRequest, UserPrincipal, UserResponse, ApiResponse
+from app.security import password_needs_rehash, create_access_token, decode_access_token, get_current_user_from_token
+from app.services.password_hasher import password_hasher
+from app.utils.cache import TTLCache
 from typing import Optional
+import uuid
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-def get_current_user_dependency(authorization: Optional[str] = Header(None), db: Session = Depends(get_db)):
+# Usuários autenticados por `sub` do token; invalidar ao alterar o usuário
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+async def get_current_user_dependency(authorization: Optional[str] = Header(None), db: AsyncSession = Depends(get_db)) -> UserPrincipal:
     if not authorization:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -27,24 +38,32 @@ def get_current_user_dependency(authorization: Optional[str] = Header(None), db:
     
     user_id = get_current_user_from_token(token)
     
-    if not user_id:
+    try:
+        user_id = uuid.UUID(user_id)
+    except (TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido ou expirado"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    principal = principal_cache.get(user_id)
+    if principal:
+        return principal
+    
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuário não encontrado"
         )
     
-    return user
+    principal = UserPrincipal.from_orm(user)
+    principal_cache.set(user_id, principal)
+    return principal
 
 @router.post("/register", response_model=ApiResponse)
-async def register(request: RegisterRequest, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == request.email).first()
+async def register(request: RegisterRequest, db: AsyncSession = Depends(get_db)):
+    existing_user = await db.scalar(select(User).where(User.email == request.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -54,13 +73,13 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     # Criar novo usuário
     user = User(
         email=request.email,
-        password_hash=hash_password(request.password),
+        password_hash=await password_hasher.hash(request.password),
         plan=UserPlan.FREE
     )
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     return ApiResponse(
         success=True,
@@ -71,14 +90,19 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     )
 
 @router.post("/login", response_model=ApiResponse)
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == request.email).first()
-    if not user or not verify_password(request.password, user.password_hash):
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == request.email))
+    if not user or not await password_hasher.verify(request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciais inválidas"
         )
     
+    # Refazer o hash quando o custo do bcrypt mudou
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = await password_hasher.hash(request.password)
+        await db.commit()
+    
     # Gerar token
     token = create_access_token(
         str(user.id),
@@ -97,7 +121,7 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
 
 @router.get("/me", response_model=ApiResponse)
 async def get_current_user(
-    current_user: User = Depends(get_current_user_dependency),
+    current_user: UserPrincipal = Depends(get_current_user_dependency),
 ):
     return ApiResponse(
         success=True,
@@ -1,35 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import User, Collection
-from app.schemas import CreateCollectionRequest, UpdateCollectionRequest, CollectionResponse, ApiResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_read_db
+from app.models import Collection
+from app.schemas import CreateCollectionRequest, UpdateCollectionRequest, CollectionResponse, ApiResponse, UserPrincipal
 from app.routers.auth import get_current_user_dependency
+from app.utils.conditional import list_validators, not_modified
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate
+from app.utils.responses import api_response, response_columns
+from typing import Optional
 import uuid
 
 router = APIRouter(prefix="/collections", tags=["collections"])
 
 @router.get("/", response_model=ApiResponse)
 async def list_collections(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_dependency)
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
 ):
-    collections = db.query(Collection).filter(
-        Collection.user_id == current_user.id
-    ).all()
+    validators = await list_validators(
+        db, Collection, [Collection.user_id == current_user.id], "collections", current_user.id, limit, cursor
+    )
+    if response := not_modified(request, validators):
+        return response
     
-    return ApiResponse(
-        success=True,
+    collections, next_cursor = await paginate(
+        db,
+        select(*response_columns(Collection, CollectionResponse)).where(Collection.user_id == current_user.id),
+        Collection,
+        cursor,
+        limit,
+        scalars=False
+    )
+    
+    return api_response(
         message="Coleções recuperadas",
         data={
-            "collections": [CollectionResponse.from_orm(c).dict() for c in collections]
-        }
+            "collections": [c._asdict() for c in collections],
+            "next_cursor": next_cursor
+        },
+        headers=validators
     )
 
 @router.post("/", response_model=ApiResponse)
 async def create_collection(
     request: CreateCollectionRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_dependency)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
 ):    
     collection = Collection(
         user_id=current_user.id,
@@ -38,8 +58,8 @@ async def create_collection(
     )
     
     db.add(collection)
-    db.commit()
-    db.refresh(collection)
+    await db.commit()
+    await db.refresh(collection)
     
     return ApiResponse(
         success=True,
@@ -49,14 +69,14 @@ async def create_collection(
 
 @router.get("/{collection_id}", response_model=ApiResponse)
 async def get_collection(
-    collection_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_dependency)
+    collection_id: uuid.UUID,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
 ):    
-    collection = db.query(Collection).filter(
+    collection = await db.scalar(select(Collection).where(
         Collection.id == collection_id,
         Collection.user_id == current_user.id
-    ).first()
+    ))
     
     if not collection:
         raise HTTPException(
@@ -72,15 +92,15 @@ async def get_collection(
 
 @router.put("/{collection_id}", response_model=ApiResponse)
 async def update_collection(
-    collection_id: str,
+    collection_id: uuid.UUID,
     request: UpdateCollectionRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_dependency)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
 ):    
-    collection = db.query(Collection).filter(
+    collection = await db.scalar(select(Collection).where(
         Collection.id == collection_id,
         Collection.user_id == current_user.id
-    ).first()
+    ))
     
     if not collection:
         raise HTTPException(
@@ -93,8 +113,8 @@ async def update_collection(
     if request.is_public is not None:
         collection.is_public = request.is_public
     
-    db.commit()
-    db.refresh(collection)
+    await db.commit()
+    await db.refresh(collection)
     
     return ApiResponse(
         success=True,
@@ -104,14 +124,14 @@ async def update_collection(
 
 @router.delete("/{collection_id}", response_model=ApiResponse)
 async def delete_collection(
-    collection_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_dependency)
+    collection_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
 ):
-    collection = db.query(Collection).filter(
+    collection = await db.scalar(select(Collection).where(
         Collection.id == collection_id,
         Collection.user_id == current_user.id
-    ).first()
+    ))
     
     if not collection:
         raise HTTPException(
@@ -119,8 +139,8 @@ async def delete_collection(
             detail="Coleção não encontrada"
         )
     
-    db.delete(collection)
-    db.commit()
+    await db.delete(collection)
+    await db.commit()
     
     return ApiResponse(
         success=True,
@@ -1,25 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import User, Collection, Flashcard, GenerationLog
-from app.schemas import CreateFlashcardRequest, FlashcardResponse, GenerateFlashcardsRequest, ApiResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal, get_db, get_read_db, read_session_factory
+from app.models import Collection, Flashcard
+from app.schemas import BatchFlashcardsRequest, CreateFlashcardRequest, FlashcardResponse, GenerateFlashcardsRequest, ApiResponse, UserPrincipal
 from app.routers.auth import get_current_user_dependency
-from app.services.ai_service import generate_flashcards_with_ai
-from datetime import date
+from app.services.batch_service import BatchLimitError, delete_flashcards, move_flashcards, update_flashcards
+from app.services.export_service import export_flashcards_ndjson
+from app.services.ai_service import stream_flashcards_with_ai
+from app.services.generation_jobs import GenerationJob, GenerationQueueFull, generation_queue, save_generated_flashcards
+from app.services.quota import daily_limit, generated_today, release_generation, reserve_generation
+from app.services.search_service import MIN_QUERY_LENGTH, search_flashcards as search_flashcard_rows
+from app.services.public_cache import public_cache
+from app.services.import_service import (
+    ImportFormatError,
+    import_flashcards as import_flashcard_records,
+    iter_csv_records,
+    iter_json_records,
+    iter_ndjson_records,
+)
+from app.utils.conditional import list_validators, not_modified
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate
+from app.utils.responses import api_response, response_columns
+from typing import Optional
+import json
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/flashcards", tags=["flashcards"])
 
-@router.post("/generate", response_model=ApiResponse)
+@router.post("/generate", response_model=ApiResponse, status_code=status.HTTP_202_ACCEPTED)
 async def generate_flashcards(
-    collection_id: str,
+    collection_id: uuid.UUID,
     request: GenerateFlashcardsRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_dependency)
-):    
-    collection = db.query(Collection).filter(
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
+):
+    """Enfileirar a geração por IA; o resultado é consultado pelo id do job"""
+    collection = await db.scalar(select(Collection.id).where(
         Collection.id == collection_id,
         Collection.user_id == current_user.id
-    ).first()
+    ))
     
     if not collection:
         raise HTTPException(
@@ -27,56 +52,139 @@ async def generate_flashcards(
             detail="Coleção não encontrada"
         )
     
-    flashcards = await generate_flashcards_with_ai(request.input_type, request.content)
+    await reserve_generation(db, current_user)
     
-    cards_to_insert = [
-        Flashcard(
-            collection_id=collection.id,
-            front=card["front"],
-            back=card["back"],
-            created_by_ia=True
+    try:
+        job = generation_queue.enqueue(GenerationJob(
+            user_id=current_user.id,
+            collection_id=collection_id,
+            input_type=request.input_type,
+            content=request.content
+        ))
+    except GenerationQueueFull:
+        await release_generation(db, current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Fila de geração cheia, tente novamente mais tarde"
         )
-        for card in flashcards
-    ]
     
-    db.add_all(cards_to_insert)
+    return ApiResponse(
+        success=True,
+        message="Geração de flashcards enfileirada",
+        data=job.to_dict()
+    )
 
-    today = date.today()
-    log = db.query(GenerationLog).filter(
-        GenerationLog.user_id == current_user.id,
-        GenerationLog.date == today
-    ).first()
-    
-    if log:
-        log.count += len(flashcards)
-    else:
-        log = GenerationLog(
-            user_id=current_user.id,
-            date=today,
-            count=len(flashcards)
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+@router.post("/generate/stream")
+async def generate_flashcards_stream(
+    collection_id: uuid.UUID,
+    request: GenerateFlashcardsRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
+):
+    """Gerar flashcards por IA emitindo cada cartão via Server-Sent Events"""
+    collection = await db.scalar(select(Collection.id).where(
+        Collection.id == collection_id,
+        Collection.user_id == current_user.id
+    ))
+    
+    if not collection:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Coleção não encontrada"
+        )
+    
+    await reserve_generation(db, current_user)
+    
+    async def events():
+        count = 0
+        try:
+            async for card in stream_flashcards_with_ai(request.input_type, request.content):
+                # Cada cartão é gravado assim que chega; uma desconexão mantém os já emitidos
+                saved = await save_generated_flashcards(collection_id, [card])
+                count += 1
+                yield sse_event("card", saved[0])
+        except Exception:
+            logger.exception("Falha na geração por streaming")
+            yield sse_event("error", {"detail": "Erro ao gerar flashcards"})
+        finally:
+            if not count:
+                async with AsyncSessionLocal() as release_db:
+                    await release_generation(release_db, current_user.id)
+        yield sse_event("done", {"count": count})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/generate/jobs/{job_id}", response_model=ApiResponse)
+async def get_generation_job(
+    job_id: uuid.UUID,
+    wait: float = Query(0, ge=0, le=30),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
+):
+    """Consultar um job de geração; `wait` aguarda a conclusão por até N segundos"""
+    job = generation_queue.get(job_id)
+    
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job não encontrado"
         )
-        db.add(log)
     
-    db.commit()
+    if wait:
+        job = await generation_queue.wait(job, wait)
     
     return ApiResponse(
         success=True,
-        message="Flashcards gerados com sucesso",
+        message="Status do job de geração",
+        data=job.to_dict()
+    )
+
+@router.get("/search", response_model=ApiResponse)
+async def search_flashcards(
+    q: str = Query(..., min_length=MIN_QUERY_LENGTH, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
+):
+    """Buscar flashcards nas coleções do usuário e nas compartilhadas com ele"""
+    rows = await search_flashcard_rows(db, current_user.id, q, limit + 1, offset)
+    
+    return api_response(
+        message="Resultados da busca",
         data={
-            "flashcards": [card for card in flashcards],
-            "count": len(flashcards)
+            "flashcards": [row._asdict() for row in rows[:limit]],
+            "next_offset": offset + limit if len(rows) > limit else None
         }
     )
 
 @router.get("/collections/{collection_id}", response_model=ApiResponse)
 async def list_flashcards(
-    collection_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_dependency)
+    collection_id: uuid.UUID,
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
 ):
-    collection = db.query(Collection).filter(
+    # Coleções públicas: página (com ETag) servida do cache, sem consultar o banco
+    cache_key = public_cache.key(collection_id, ("flashcards", limit, cursor))
+    cached = public_cache.get(cache_key)
+    if cached:
+        validators, data = cached
+        return not_modified(request, validators) or api_response(
+            message="Flashcards recuperados", data=data, headers=validators
+        )
+    
+    collection = (await db.execute(select(Collection.id, Collection.is_public).where(
         Collection.id == collection_id
-    ).first()
+    ))).first()
     
     if not collection:
         raise HTTPException(
@@ -84,29 +192,69 @@ async def list_flashcards(
             detail="Coleção não encontrada"
         )
     
-    flashcards = db.query(Flashcard).filter(
-        Flashcard.collection_id == collection_id
-    ).all()
+    validators = await list_validators(
+        db, Flashcard, [Flashcard.collection_id == collection_id], "flashcards", collection_id, limit, cursor
+    )
+    if response := not_modified(request, validators):
+        return response
     
-    return ApiResponse(
-        success=True,
+    flashcards, next_cursor = await paginate(
+        db,
+        select(*response_columns(Flashcard, FlashcardResponse)).where(Flashcard.collection_id == collection_id),
+        Flashcard,
+        cursor,
+        limit,
+        scalars=False
+    )
+    
+    data = {
+        "flashcards": [f._asdict() for f in flashcards],
+        "next_cursor": next_cursor
+    }
+    if collection.is_public:
+        public_cache.set(cache_key, (validators, data))
+    
+    return api_response(
         message="Flashcards recuperados",
-        data={
-            "flashcards": [FlashcardResponse.from_orm(f).dict() for f in flashcards]
-        }
+        data=data,
+        headers=validators
+    )
+
+@router.get("/collections/{collection_id}/export")
+async def export_flashcards(
+    collection_id: uuid.UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
+):
+    collection = await db.scalar(select(Collection).where(
+        Collection.id == collection_id,
+        or_(Collection.user_id == current_user.id, Collection.is_public.is_(True))
+    ))
+    
+    if not collection:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Coleção não encontrada"
+        )
+    
+    return StreamingResponse(
+        export_flashcards_ndjson(collection.id, read_session_factory(request)),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="collection-{collection.id}.ndjson"'}
     )
 
 @router.post("/collections/{collection_id}", response_model=ApiResponse)
 async def create_flashcard(
-    collection_id: str,
+    collection_id: uuid.UUID,
     request: CreateFlashcardRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_dependency)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
 ):  
-    collection = db.query(Collection).filter(
+    collection = await db.scalar(select(Collection).where(
         Collection.id == collection_id,
         Collection.user_id == current_user.id
-    ).first()
+    ))
     
     if not collection:
         raise HTTPException(
@@ -122,8 +270,8 @@ async def create_flashcard(
     )
     
     db.add(flashcard)
-    db.commit()
-    db.refresh(flashcard)
+    await db.commit()
+    await db.refresh(flashcard)
     
     return ApiResponse(
         success=True,
@@ -131,15 +279,114 @@ async def create_flashcard(
         data={"flashcard": FlashcardResponse.from_orm(flashcard).dict()}
     )
 
+@router.post("/collections/{collection_id}/import", response_model=ApiResponse)
+async def import_flashcards(
+    collection_id: uuid.UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
+):
+    """Importar flashcards em lote a partir de CSV, NDJSON ou JSON"""
+    collection = await db.scalar(select(Collection).where(
+        Collection.id == collection_id,
+        Collection.user_id == current_user.id
+    ))
+    
+    if not collection:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Coleção não encontrada"
+        )
+    # Nenhuma transação aberta enquanto o corpo chega; cada lote usa a sua
+    await db.commit()
+    
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == "text/csv":
+        records = iter_csv_records(request.stream())
+    elif content_type in ("application/x-ndjson", "application/jsonl"):
+        records = iter_ndjson_records(request.stream())
+    elif content_type == "application/json":
+        records = iter_json_records(await request.body())
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Formato não suportado (use text/csv, application/x-ndjson ou application/json)"
+        )
+    
+    try:
+        result = await import_flashcard_records(db, collection, records)
+    except ImportFormatError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    await db.commit()
+    
+    return ApiResponse(
+        success=True,
+        message="Importação concluída",
+        data=result
+    )
+
+@router.post("/batch", response_model=ApiResponse)
+async def batch_flashcards(
+    request: BatchFlashcardsRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
+):
+    """Excluir, editar ou mover vários flashcards em uma transação
+
+    Ids inexistentes ou de coleções de outros usuários são ignorados e
+    contados em `skipped`.
+    """
+    ids = list(set(request.ids))
+    
+    if request.operation == "delete":
+        affected = await delete_flashcards(db, current_user.id, ids)
+    elif request.operation == "update":
+        affected = await update_flashcards(
+            db, current_user.id, ids, request.fields.model_dump(exclude_unset=True)
+        )
+    else:
+        target = await db.scalar(select(Collection).where(
+            Collection.id == request.target_collection_id,
+            Collection.user_id == current_user.id
+        ).with_for_update())
+        
+        if not target:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Coleção não encontrada"
+            )
+        
+        try:
+            affected = await move_flashcards(db, current_user.id, ids, target)
+        except BatchLimitError as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    
+    await db.commit()
+    
+    return ApiResponse(
+        success=True,
+        message="Operação em lote concluída",
+        data={"affected": affected, "skipped": len(ids) - affected}
+    )
+
 @router.delete("/{flashcard_id}", response_model=ApiResponse)
 async def delete_flashcard(
-    flashcard_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_dependency)
+    flashcard_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
 ):  
-    flashcard = db.query(Flashcard).filter(
+    flashcard = await db.scalar(select(Flashcard).where(
         Flashcard.id == flashcard_id
-    ).first()
+    ))
     
     if not flashcard:
         raise HTTPException(
@@ -147,8 +394,8 @@ async def delete_flashcard(
             detail="Flashcard não encontrado"
         )
     
-    db.delete(flashcard)
-    db.commit()
+    await db.delete(flashcard)
+    await db.commit()
     
     return ApiResponse(
         success=True,
@@ -157,24 +404,18 @@ async def delete_flashcard(
 
 @router.get("/generation-logs", response_model=ApiResponse)
 async def get_generation_logs(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_dependency)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
 ):
-    today = date.today()
-    log = db.query(GenerationLog).filter(
-        GenerationLog.user_id == current_user.id,
-        GenerationLog.date == today
-    ).first()
-    
-    count = log.count if log else 0
-    daily_limit = 999 if current_user.plan == "pro" else 6
+    count = await generated_today(db, current_user.id)
+    limit = daily_limit(current_user.plan)
     
     return ApiResponse(
         success=True,
         message="Logs recuperados",
         data={
             "generated_today": count,
-            "daily_limit": daily_limit,
-            "remaining": daily_limit - count
+            "daily_limit": limit,
+            "remaining": max(limit - count, 0)
         }
     )
\ No newline at end of file
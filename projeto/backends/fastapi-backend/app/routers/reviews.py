@@ -0,0 +1,199 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import exists, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_read_db
+from app.models import CardReview, Flashcard, ReviewSettings, utcnow
+from app.schemas import (
+    ApiResponse,
+    CardReviewResponse,
+    FlashcardResponse,
+    SubmitReviewRequest,
+    UpdateReviewSettingsRequest,
+    UserPrincipal,
+)
+from app.routers.auth import get_current_user_dependency
+from app.services.scheduler import (
+    DEFAULT_INTERVAL_MODIFIER,
+    DEFAULT_MAXIMUM_INTERVAL_DAYS,
+    RESCHEDULE_BATCH_SIZE,
+    ReviewState,
+    next_due_at,
+    reschedule_intervals,
+    sm2_review,
+)
+from app.services.search_service import accessible_collection_ids
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+import uuid
+
+router = APIRouter(prefix="/reviews", tags=["reviews"])
+
+async def get_review_settings(db: AsyncSession, user_id: uuid.UUID) -> ReviewSettings:
+    settings = await db.get(ReviewSettings, user_id)
+    if settings:
+        return settings
+    return ReviewSettings(
+        user_id=user_id,
+        interval_modifier=DEFAULT_INTERVAL_MODIFIER,
+        maximum_interval_days=DEFAULT_MAXIMUM_INTERVAL_DAYS
+    )
+
+@router.get("/due", response_model=ApiResponse)
+async def list_due_cards(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_new: bool = True,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
+):
+    """Próximos cartões a revisar: vencidos primeiro, completados com cartões novos"""
+    due = (await db.execute(
+        select(Flashcard, CardReview)
+        .join(CardReview, CardReview.flashcard_id == Flashcard.id)
+        .where(CardReview.user_id == current_user.id, CardReview.due_at <= utcnow())
+        .order_by(CardReview.due_at)
+        .limit(limit)
+    )).all()
+    
+    cards = [
+        {
+            "flashcard": FlashcardResponse.from_orm(f).dict(),
+            "review": CardReviewResponse.from_orm(r).dict()
+        }
+        for f, r in due
+    ]
+    
+    if include_new and len(cards) < limit:
+        new_cards = (await db.scalars(
+            select(Flashcard)
+            .where(
+                # Mesmas coleções aceitas em submit_review: próprias e compartilhadas
+                Flashcard.collection_id.in_(accessible_collection_ids(current_user.id)),
+                ~exists().where(
+                    CardReview.user_id == current_user.id,
+                    CardReview.flashcard_id == Flashcard.id
+                )
+            )
+            .order_by(Flashcard.created_at, Flashcard.id)
+            .limit(limit - len(cards))
+        )).all()
+        cards += [
+            {"flashcard": FlashcardResponse.from_orm(f).dict(), "review": None}
+            for f in new_cards
+        ]
+    
+    return ApiResponse(
+        success=True,
+        message="Cartões para revisão",
+        data={"cards": cards}
+    )
+
+@router.post("/{flashcard_id}", response_model=ApiResponse)
+async def submit_review(
+    flashcard_id: uuid.UUID,
+    request: SubmitReviewRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
+):
+    flashcard = await db.scalar(select(Flashcard.id).where(
+        Flashcard.id == flashcard_id,
+        Flashcard.collection_id.in_(accessible_collection_ids(current_user.id))
+    ))
+    
+    if not flashcard:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Flashcard não encontrado"
+        )
+    
+    review = await db.scalar(select(CardReview).where(
+        CardReview.user_id == current_user.id,
+        CardReview.flashcard_id == flashcard_id
+    ))
+    if not review:
+        review = CardReview(user_id=current_user.id, flashcard_id=flashcard_id)
+        db.add(review)
+        state = ReviewState()
+    else:
+        state = ReviewState(review.ease_factor, review.interval_days, review.repetitions, review.lapses)
+    
+    settings = await get_review_settings(db, current_user.id)
+    state = sm2_review(
+        state,
+        request.quality,
+        settings.interval_modifier,
+        settings.maximum_interval_days
+    )
+    
+    now = utcnow()
+    review.ease_factor = state.ease_factor
+    review.interval_days = state.interval_days
+    review.repetitions = state.repetitions
+    review.lapses = state.lapses
+    review.last_reviewed_at = now
+    review.due_at = next_due_at(now, state.interval_days)
+    
+    await db.commit()
+    await db.refresh(review)
+    
+    return ApiResponse(
+        success=True,
+        message="Revisão registrada",
+        data={"review": CardReviewResponse.from_orm(review).dict()}
+    )
+
+@router.put("/settings", response_model=ApiResponse)
+async def update_review_settings(
+    request: UpdateReviewSettingsRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
+):
+    """Atualizar os parâmetros do agendador e reagendar os cartões já revisados"""
+    settings = await db.get(ReviewSettings, current_user.id)
+    if not settings:
+        settings = await get_review_settings(db, current_user.id)
+        db.add(settings)
+    
+    scale = request.interval_modifier / settings.interval_modifier
+    settings.interval_modifier = request.interval_modifier
+    settings.maximum_interval_days = request.maximum_interval_days
+    
+    rescheduled = 0
+    last_id = None
+    while True:
+        query = (
+            select(CardReview.id, CardReview.last_reviewed_at, CardReview.interval_days, CardReview.repetitions)
+            .where(CardReview.user_id == current_user.id)
+            .order_by(CardReview.id)
+            .limit(RESCHEDULE_BATCH_SIZE)
+        )
+        if last_id is not None:
+            query = query.where(CardReview.id > last_id)
+        rows = (await db.execute(query)).all()
+        if not rows:
+            break
+        
+        ids, last_reviewed_at, interval_days, repetitions = zip(*rows)
+        intervals, due_at = reschedule_intervals(
+            last_reviewed_at,
+            interval_days,
+            repetitions,
+            scale,
+            request.maximum_interval_days
+        )
+        await db.execute(update(CardReview), [
+            {"id": id, "interval_days": float(interval), "due_at": due}
+            for id, interval, due in zip(ids, intervals, due_at)
+        ])
+        rescheduled += len(rows)
+        last_id = ids[-1]
+    
+    await db.commit()
+    
+    return ApiResponse(
+        success=True,
+        message="Configurações de revisão atualizadas",
+        data={
+            "interval_modifier": settings.interval_modifier,
+            "maximum_interval_days": settings.maximum_interval_days,
+            "rescheduled": rescheduled
+        }
+    )
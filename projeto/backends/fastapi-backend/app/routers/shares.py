@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models import User, Collection, Share
-from app.schemas import ApiResponse
+from app.schemas import ApiResponse, UserPrincipal
 from app.routers.auth import get_current_user_dependency
 import uuid
 
@@ -10,16 +11,16 @@ router = APIRouter(prefix="/shares", tags=["shares"])
 
 @router.post("/", response_model=ApiResponse)
 async def share_collection(
-    collection_id: str,
+    collection_id: uuid.UUID,
     user_email: str,
     permissions: str = "read",
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_dependency)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
 ):  
-    collection = db.query(Collection).filter(
+    collection = await db.scalar(select(Collection).where(
         Collection.id == collection_id,
         Collection.user_id == current_user.id
-    ).first()
+    ))
     
     if not collection:
         raise HTTPException(
@@ -27,7 +28,7 @@ async def share_collection(
             detail="Coleção não encontrada"
         )
         
-    shared_user = db.query(User).filter(User.email == user_email).first()
+    shared_user = await db.scalar(select(User).where(User.email == user_email))
     if not shared_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -43,8 +44,8 @@ async def share_collection(
     )
     
     db.add(share)
-    db.commit()
-    db.refresh(share)
+    await db.commit()
+    await db.refresh(share)
     
     return ApiResponse(
         success=True,
@@ -1,16 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models import User, UserPlan, Payment
-from app.schemas import ApiResponse
-from app.routers.auth import get_current_user_dependency
+from app.schemas import ApiResponse, UserPrincipal
+from app.routers.auth import get_current_user_dependency, principal_cache
 
 router = APIRouter(prefix="/subscriptions", tags=["subscriptions"])
 
 @router.post("/upgrade", response_model=ApiResponse)
 async def upgrade_to_pro(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_dependency)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
 ):  
     if current_user.plan == UserPlan.PRO:
         raise HTTPException(
@@ -18,20 +19,22 @@ async def upgrade_to_pro(
             detail="Usuário já é PRO"
         )
     
-    current_user.plan = UserPlan.PRO
-    db.commit()
-    db.refresh(current_user)
+    await db.execute(
+        update(User).where(User.id == current_user.id).values(plan=UserPlan.PRO)
+    )
+    await db.commit()
+    principal_cache.invalidate(current_user.id)
     
     return ApiResponse(
         success=True,
         message="Plano atualizado para PRO",
-        data={"plan": current_user.plan}
+        data={"plan": UserPlan.PRO}
     )
 
 @router.get("/status", response_model=ApiResponse)
 async def get_subscription_status(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_dependency)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user_dependency)
 ):    
     return ApiResponse(
         success=True,
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
 from typing import Optional
 from datetime import datetime
 import uuid
@@ -11,6 +11,16 @@ class LoginRequest(BaseModel):
     email: EmailStr
     password: str
 
+class UserPrincipal(BaseModel):
+    id: uuid.UUID
+    email: str
+    plan: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+        frozen = True
+
 class UserResponse(BaseModel):
     id: uuid.UUID
     email: str
@@ -40,6 +50,11 @@ class CollectionResponse(BaseModel):
         from_attributes = True
 
 
+def check_video_url(v):
+    if v and not ("youtube.com" in v or "vimeo.com" in v or "youtu.be" in v):
+        raise ValueError("video_url must be a valid URL")
+    return v
+
 class CreateFlashcardRequest(BaseModel):
     front: str = Field(..., min_length=1)
     back: str = Field(..., min_length=1)
@@ -48,9 +63,39 @@ class CreateFlashcardRequest(BaseModel):
     @field_validator('video_url')
     @classmethod
     def validate_video_url(cls, v):
-        if v and not ("youtube.com" in v or "vimeo.com" in v or "youtu.be" in v):
-            raise ValueError("video_url must be a valid URL")
-        return v
+        return check_video_url(v)
+
+class UpdateFlashcardFields(BaseModel):
+    front: Optional[str] = Field(None, min_length=1)
+    back: Optional[str] = Field(None, min_length=1)
+    video_url: Optional[str] = Field(None, max_length=1000)
+
+    @field_validator('video_url')
+    @classmethod
+    def validate_video_url(cls, v):
+        return check_video_url(v)
+
+    @model_validator(mode='after')
+    def validate_required_fields(self):
+        # front/back podem ser omitidos, mas não apagados; video_url: null remove o vídeo
+        for name in ('front', 'back'):
+            if name in self.model_fields_set and getattr(self, name) is None:
+                raise ValueError(f"{name} cannot be null")
+        return self
+
+class BatchFlashcardsRequest(BaseModel):
+    ids: list[uuid.UUID] = Field(..., min_length=1, max_length=1000)
+    operation: str = Field(..., pattern="^(delete|update|move)$")
+    fields: Optional[UpdateFlashcardFields] = None
+    target_collection_id: Optional[uuid.UUID] = None
+
+    @model_validator(mode='after')
+    def validate_operation(self):
+        if self.operation == "update" and not (self.fields and self.fields.model_fields_set):
+            raise ValueError("update requires fields")
+        if self.operation == "move" and not self.target_collection_id:
+            raise ValueError("move requires target_collection_id")
+        return self
 
 class FlashcardResponse(BaseModel):
     id: uuid.UUID
@@ -69,6 +114,26 @@ class GenerateFlashcardsRequest(BaseModel):
     content: str = Field(..., min_length=10)
 
 
+class SubmitReviewRequest(BaseModel):
+    quality: int = Field(..., ge=0, le=5)
+
+class UpdateReviewSettingsRequest(BaseModel):
+    interval_modifier: float = Field(..., gt=0, le=5)
+    maximum_interval_days: int = Field(..., ge=1, le=36500)
+
+class CardReviewResponse(BaseModel):
+    flashcard_id: uuid.UUID
+    ease_factor: float
+    interval_days: float
+    repetitions: int
+    lapses: int
+    due_at: datetime
+    last_reviewed_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 class ApiResponse(BaseModel):
     success: bool
     message: str
@@ -1,16 +1,31 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import bcrypt
 import jwt
-from passlib.context import CryptContext
 from app.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# O bcrypt só considera os primeiros 72 bytes; o bcrypt 5 recusa senhas maiores
+BCRYPT_MAX_PASSWORD_BYTES = 72
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+def _password_bytes(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    salt = bcrypt.gensalt(rounds or settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(_password_bytes(password), salt).decode("ascii")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return bcrypt.checkpw(_password_bytes(plain_password), hashed_password.encode("ascii"))
+    except ValueError:
+        return False
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Hashes gerados com outro custo são refeitos no próximo login"""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
 
 def create_access_token(user_id: str, email: str, plan: str) -> str:
     payload = {
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import logging
+import unicodedata
+from datetime import timedelta
+from typing import List, Optional
+from sqlalchemy import delete, func, select, update
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import AIGenerationCache, utcnow
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Incrementar sempre que os prompts mudarem, para não servir resultados antigos
+PROMPT_VERSION = "1"
+# Limpeza da tabela a cada N gravações (por worker), como o CULL_FREQUENCY do Django
+EVICT_EVERY = 100
+
+def normalize_content(input_type: str, content: str) -> str:
+    content = " ".join(unicodedata.normalize("NFKC", content).split())
+    # Tópicos não dependem de maiúsculas; textos são mantidos como enviados
+    return content.casefold() if input_type == "topic" else content
+
+def cache_key(input_type: str, content: str, model: str) -> str:
+    payload = json.dumps(
+        [input_type, normalize_content(input_type, content), model, PROMPT_VERSION],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class AIResultCache:
+    """Cache de resultados da IA em dois níveis: LRU em memória e tabela no banco"""
+
+    def __init__(self, memory_size: int, ttl_seconds: int, max_rows: int, evict_every: int = EVICT_EVERY):
+        self.memory = TTLCache(maxsize=memory_size, ttl=ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self.evict_every = evict_every
+        self.writes = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    async def get(self, input_type: str, content: str, model: str) -> Optional[List[dict]]:
+        key = cache_key(input_type, content, model)
+        flashcards = self.memory.get(key)
+        if flashcards is not None:
+            return flashcards
+
+        try:
+            async with AsyncSessionLocal() as db:
+                flashcards = await db.scalar(select(AIGenerationCache.flashcards).where(
+                    AIGenerationCache.key == key,
+                    AIGenerationCache.created_at > utcnow() - timedelta(seconds=self.ttl_seconds)
+                ))
+                if flashcards is not None:
+                    await db.execute(update(AIGenerationCache).where(
+                        AIGenerationCache.key == key
+                    ).values(hits=AIGenerationCache.hits + 1, last_accessed_at=utcnow()))
+                    await db.commit()
+        except Exception:
+            logger.exception("Falha ao consultar o cache de IA")
+            flashcards = None
+
+        if flashcards is None:
+            self.misses += 1
+            return None
+
+        self.db_hits += 1
+        self.memory.set(key, flashcards)
+        return flashcards
+
+    async def set(self, input_type: str, content: str, model: str, flashcards: List[dict]) -> None:
+        if not flashcards:
+            return
+        key = cache_key(input_type, content, model)
+        self.memory.set(key, flashcards)
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(delete(AIGenerationCache).where(AIGenerationCache.key == key))
+                db.add(AIGenerationCache(
+                    key=key,
+                    input_type=input_type,
+                    model=model,
+                    prompt_version=PROMPT_VERSION,
+                    flashcards=flashcards
+                ))
+                self.writes += 1
+                if self.writes % self.evict_every == 0:
+                    await db.flush()
+                    await self._evict(db)
+                await db.commit()
+        except Exception:
+            logger.exception("Falha ao gravar no cache de IA")
+
+    async def _evict(self, db) -> None:
+        """Remover entradas expiradas e as menos acessadas acima do limite de linhas"""
+        await db.execute(delete(AIGenerationCache).where(
+            AIGenerationCache.created_at <= utcnow() - timedelta(seconds=self.ttl_seconds)
+        ))
+        # A ordenação por last_accessed_at percorre a tabela; só quando passou do limite
+        if await db.scalar(select(func.count()).select_from(AIGenerationCache)) <= self.max_rows:
+            return
+        overflow = (
+            select(AIGenerationCache.key)
+            .order_by(AIGenerationCache.last_accessed_at.desc())
+            .offset(self.max_rows)
+            .scalar_subquery()
+        )
+        await db.execute(delete(AIGenerationCache).where(AIGenerationCache.key.in_(overflow)))
+
+    def stats(self) -> dict:
+        memory = self.memory.stats()
+        total = memory["hits"] + self.db_hits + self.misses
+        return {
+            "memory": memory,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_ratio": (memory["hits"] + self.db_hits) / total if total else 0.0,
+        }
+
+ai_cache = AIResultCache(
+    memory_size=settings.AI_CACHE_MEMORY_SIZE,
+    ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+    max_rows=settings.AI_CACHE_MAX_ROWS
+)
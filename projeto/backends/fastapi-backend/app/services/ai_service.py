@@ -1,13 +1,95 @@
-from openai import AsyncOpenAI
 from app.config import settings
-from typing import List
+from app.services.ai_cache import ai_cache
+from app.utils.json_stream import JSONArrayStreamParser
+from app.utils.metrics import registry
+from app.utils.timing import track_external
+from functools import lru_cache
+from typing import TYPE_CHECKING, AsyncIterator, List
 import json
+import logging
+import time
 
-client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+ai_generation_duration = registry.histogram(
+    "ai_generation_duration_seconds", "Duração das chamadas de geração à OpenAI", ("mode",),
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+)
+ai_generation_failures = registry.counter(
+    "ai_generation_failures_total", "Chamadas de geração à OpenAI que falharam", ("mode",)
+)
+
+@lru_cache(maxsize=1)
+def get_client() -> "AsyncOpenAI":
+    """Cliente da OpenAI criado na primeira geração; importar o SDK custa ~0.7s no boot"""
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+
+def is_valid_card(card) -> bool:
+    return (
+        isinstance(card, dict)
+        and isinstance(card.get("front"), str) and bool(card["front"].strip())
+        and isinstance(card.get("back"), str) and bool(card["back"].strip())
+    )
+
+def normalize_flashcards(data) -> List[dict]:
+    """Só os cartões com front/back preenchidos; qualquer outra resposta vira lista vazia"""
+    if not isinstance(data, list):
+        return []
+    return [{"front": card["front"], "back": card["back"]} for card in data if is_valid_card(card)]
 
 async def generate_flashcards_with_ai(input_type: str, content: str) -> List[dict]:
-    """Gerar flashcards via OpenAI"""
+    """Gerar flashcards via OpenAI, reaproveitando resultados em cache"""
+    # Entradas gravadas antes da validação também passam pela normalização
+    cached = normalize_flashcards(await ai_cache.get(input_type, content, settings.OPENAI_MODEL))
+    if cached:
+        return cached
+    
+    flashcards = await request_flashcards_from_openai(input_type, content)
+    await ai_cache.set(input_type, content, settings.OPENAI_MODEL, flashcards)
+    return flashcards
+
+async def stream_flashcards_with_ai(input_type: str, content: str) -> AsyncIterator[dict]:
+    """Emitir cada flashcard assim que ele estiver completo na resposta da OpenAI"""
+    cached = normalize_flashcards(await ai_cache.get(input_type, content, settings.OPENAI_MODEL))
+    if cached:
+        for card in cached:
+            yield card
+        return
+    
+    flashcards = []
+    parser = JSONArrayStreamParser()
+    start = time.perf_counter()
+    try:
+        # Só a espera pela resposta inicial; o tempo dos chunks fica no total do streaming
+        with track_external("openai"):
+            stream = await get_client().chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                messages=build_messages(input_type, content),
+                temperature=0.7,
+                max_tokens=1000,
+                stream=True
+            )
+        async for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            for card in parser.feed(chunk.choices[0].delta.content):
+                if is_valid_card(card):
+                    card = {"front": card["front"], "back": card["back"]}
+                    flashcards.append(card)
+                    yield card
+    except Exception:
+        ai_generation_failures.inc("stream")
+        raise
+    finally:
+        ai_generation_duration.observe("stream", value=time.perf_counter() - start)
     
+    await ai_cache.set(input_type, content, settings.OPENAI_MODEL, flashcards)
+
+def build_messages(input_type: str, content: str) -> List[dict]:
     if input_type == "text":
         prompt = f"""You are tasked with extracting flashcard content from text.
 
@@ -41,24 +123,29 @@ Respond ONLY with a valid JSON array:
 ]
 """
     
+    return [
+        {"role": "system", "content": "You are a helpful flashcard generation assistant."},
+        {"role": "user", "content": prompt}
+    ]
+
+async def request_flashcards_from_openai(input_type: str, content: str) -> List[dict]:
+    """Gerar flashcards via OpenAI; falhas (inclusive JSON inválido) são propagadas"""
+    start = time.perf_counter()
     try:
-        response = await client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful flashcard generation assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
+        with track_external("openai"):
+            response = await get_client().chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                messages=build_messages(input_type, content),
+                temperature=0.7,
+                max_tokens=1000
+            )
         
         # Extrair e parsear JSON
         content = response.choices[0].message.content
-        flashcards = json.loads(content)
-        
-        return flashcards
-    except json.JSONDecodeError:
-        return []
-    except Exception as e:
-        print(f"Erro ao gerar flashcards: {e}")
-        return []
\ No newline at end of file
+        return normalize_flashcards(json.loads(content))
+    except Exception:
+        ai_generation_failures.inc("request")
+        logger.exception("Erro ao gerar flashcards")
+        raise
+    finally:
+        ai_generation_duration.observe("request", value=time.perf_counter() - start)
\ No newline at end of file
@@ -0,0 +1,56 @@
+import uuid
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Collection, Flashcard
+from app.services.public_cache import TRACKED_OPTION, mark_collections
+
+class BatchLimitError(ValueError):
+    pass
+
+def owned_flashcards(user_id: uuid.UUID, ids: list[uuid.UUID]) -> list:
+    """Cartões da lista que pertencem a coleções do usuário (na mesma consulta da operação)"""
+    return [
+        Flashcard.id.in_(ids),
+        Flashcard.collection_id.in_(select(Collection.id).where(Collection.user_id == user_id)),
+    ]
+
+async def _execute_tracked(db: AsyncSession, stmt) -> list[uuid.UUID]:
+    """Executar o statement e anotar no cache público as coleções retornadas"""
+    collection_ids = (await db.scalars(
+        stmt.returning(Flashcard.collection_id).execution_options(
+            synchronize_session=False, **{TRACKED_OPTION: True}
+        )
+    )).all()
+    mark_collections(db.sync_session, set(collection_ids))
+    return collection_ids
+
+async def delete_flashcards(db: AsyncSession, user_id: uuid.UUID, ids: list[uuid.UUID]) -> int:
+    collection_ids = await _execute_tracked(db, delete(Flashcard).where(*owned_flashcards(user_id, ids)))
+    return len(collection_ids)
+
+async def update_flashcards(db: AsyncSession, user_id: uuid.UUID, ids: list[uuid.UUID], values: dict) -> int:
+    collection_ids = await _execute_tracked(
+        db, update(Flashcard).where(*owned_flashcards(user_id, ids)).values(**values)
+    )
+    return len(collection_ids)
+
+async def move_flashcards(db: AsyncSession, user_id: uuid.UUID, ids: list[uuid.UUID], target: Collection) -> int:
+    """Mover cartões para `target` (já bloqueada pelo chamador), respeitando max_cards"""
+    conditions = [*owned_flashcards(user_id, ids), Flashcard.collection_id != target.id]
+    # Coleções de origem: o RETURNING do UPDATE só traria a coleção de destino
+    sources = (await db.execute(
+        select(Flashcard.collection_id, func.count()).where(*conditions).group_by(Flashcard.collection_id)
+    )).all()
+    moving = sum(count for _, count in sources)
+    if not moving:
+        return 0
+
+    card_count = await db.scalar(
+        select(func.count()).select_from(Flashcard).where(Flashcard.collection_id == target.id)
+    )
+    if card_count + moving > target.max_cards:
+        raise BatchLimitError("Limite de cartões da coleção atingido")
+
+    moved = await _execute_tracked(db, update(Flashcard).where(*conditions).values(collection_id=target.id))
+    mark_collections(db.sync_session, {collection_id for collection_id, _ in sources})
+    return len(moved)
@@ -0,0 +1,44 @@
+import json
+import uuid
+from datetime import datetime
+from typing import AsyncIterator
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.database import AsyncSessionLocal
+from app.models import Flashcard
+
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_COLUMNS = (
+    Flashcard.id,
+    Flashcard.front,
+    Flashcard.back,
+    Flashcard.video_url,
+    Flashcard.extra,
+    Flashcard.created_by_ia,
+    Flashcard.created_at,
+    Flashcard.updated_at,
+)
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+async def export_flashcards_ndjson(
+    collection_id: uuid.UUID, session_factory: async_sessionmaker = AsyncSessionLocal
+) -> AsyncIterator[bytes]:
+    """Exportar os flashcards da coleção como NDJSON, lendo em blocos de um cursor no servidor"""
+    # Sessão própria: a sessão da requisição pode ser fechada antes do fim do streaming
+    async with session_factory() as db:
+        result = await db.stream(
+            select(*EXPORT_COLUMNS)
+            .where(Flashcard.collection_id == collection_id)
+            .order_by(Flashcard.created_at, Flashcard.id)
+            .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        async for rows in result.mappings().partitions():
+            yield "".join(
+                json.dumps(dict(row), default=_json_default, ensure_ascii=False) + "\n"
+                for row in rows
+            ).encode()
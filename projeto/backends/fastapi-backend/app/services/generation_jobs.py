@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Flashcard, utcnow
+from app.schemas import FlashcardResponse
+from app.services.ai_service import generate_flashcards_with_ai
+from app.services.quota import release_generation
+from app.utils.cache import TTLCache
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+generation_jobs_finished = registry.counter(
+    "generation_jobs_finished_total", "Jobs de geração concluídos, por status final", ("status",)
+)
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+@dataclass
+class GenerationJob:
+    user_id: uuid.UUID
+    collection_id: uuid.UUID
+    input_type: str
+    content: str
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+    status: JobStatus = JobStatus.QUEUED
+    flashcards: list = field(default_factory=list)
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=utcnow)
+    finished_at: Optional[datetime] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": str(self.id),
+            "status": self.status.value,
+            "collection_id": str(self.collection_id),
+            "flashcards": self.flashcards,
+            "count": len(self.flashcards),
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+class GenerationQueueFull(Exception):
+    pass
+
+class GenerationJobQueue:
+    """Fila em processo para geração de flashcards com concorrência limitada
+
+    A chamada ao LLM roda fora de qualquer sessão do banco; a conexão só é
+    usada no fim, para inserir os cartões. Jobs ainda na fila se perdem se o
+    worker for encerrado.
+    """
+
+    def __init__(self, workers: int, max_queue_size: int, job_ttl_seconds: int):
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.jobs = TTLCache(maxsize=max_queue_size * 100, ttl=job_ttl_seconds)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, job: GenerationJob) -> GenerationJob:
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise GenerationQueueFull()
+        self.jobs.set(job.id, job)
+        return job
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queue_size": self.max_queue_size,
+        }
+
+    def get(self, job_id: uuid.UUID) -> Optional[GenerationJob]:
+        return self.jobs.get(job_id)
+
+    async def wait(self, job: GenerationJob, timeout: float) -> GenerationJob:
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: GenerationJob) -> None:
+        job.status = JobStatus.RUNNING
+        try:
+            cards = await generate_flashcards_with_ai(job.input_type, job.content)
+            job.flashcards = await save_generated_flashcards(job.collection_id, cards)
+            job.status = JobStatus.SUCCEEDED
+        except Exception as e:
+            logger.exception("Falha no job de geração %s", job.id)
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+        finally:
+            if not job.flashcards:
+                # A geração foi reservada na cota ao enfileirar; sem cartões, é devolvida
+                async with AsyncSessionLocal() as db:
+                    await release_generation(db, job.user_id)
+            job.finished_at = utcnow()
+            job.done.set()
+            generation_jobs_finished.inc(job.status.value)
+
+async def save_generated_flashcards(collection_id: uuid.UUID, cards: list[dict]) -> list[dict]:
+    """Inserir os cartões gerados em uma sessão própria"""
+    async with AsyncSessionLocal() as db:
+        flashcards = [
+            Flashcard(
+                collection_id=collection_id,
+                front=card["front"],
+                back=card["back"],
+                created_by_ia=True
+            )
+            for card in cards
+        ]
+        db.add_all(flashcards)
+        await db.commit()
+        return [FlashcardResponse.from_orm(f).dict() for f in flashcards]
+
+generation_queue = GenerationJobQueue(
+    workers=settings.GENERATION_WORKERS,
+    max_queue_size=settings.GENERATION_QUEUE_SIZE,
+    job_ttl_seconds=settings.GENERATION_JOB_TTL_SECONDS
+)
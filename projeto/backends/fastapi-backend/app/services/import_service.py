@@ -0,0 +1,167 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Iterable, Optional
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Collection, Flashcard
+from app.schemas import CreateFlashcardRequest
+
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+
+class ImportFormatError(ValueError):
+    pass
+
+class ImportErrors:
+    """Erros por linha: todos contados, só os primeiros MAX_REPORTED_ERRORS guardados"""
+
+    def __init__(self):
+        self.rows = []
+        self.count = 0
+
+    def append(self, error: dict) -> None:
+        self.count += 1
+        if len(self.rows) < MAX_REPORTED_ERRORS:
+            self.rows.append(error)
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line + "\n"
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Optional[dict]]:
+    """Ler registros CSV (com cabeçalho) à medida que o corpo da requisição chega"""
+    header = None
+    pending = ""
+    async for line in iter_lines(chunks):
+        pending += line
+        # Aspas abertas: o campo continua na próxima linha
+        if pending.count('"') % 2:
+            continue
+        values = next(csv.reader([pending]), [])
+        pending = ""
+        if not values:
+            continue
+        if header is None:
+            header = [value.strip().lower() for value in values]
+            if "front" not in header or "back" not in header:
+                raise ImportFormatError("O CSV deve ter as colunas front e back")
+            continue
+        yield dict(zip(header, values))
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Optional[dict]]:
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = None
+        yield record if isinstance(record, dict) else None
+
+async def iter_json_records(body: bytes) -> AsyncIterator[Optional[dict]]:
+    try:
+        records = json.loads(body)
+    except json.JSONDecodeError:
+        raise ImportFormatError("JSON inválido")
+    if not isinstance(records, list):
+        raise ImportFormatError("O JSON deve ser uma lista de flashcards")
+    for record in records:
+        yield record if isinstance(record, dict) else None
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+def validate_batch(
+    batch: Iterable[tuple[int, Optional[dict]]],
+    errors: ImportErrors
+) -> list[tuple[int, CreateFlashcardRequest]]:
+    valid = []
+    for row_number, record in batch:
+        if record is None:
+            errors.append({"row": row_number, "error": "Registro inválido"})
+            continue
+        try:
+            data = CreateFlashcardRequest(**{
+                key: value for key, value in record.items()
+                if value not in (None, "")
+            })
+        except ValidationError as exc:
+            errors.append({"row": row_number, "error": _format_validation_error(exc)})
+            continue
+        valid.append((row_number, data))
+    return valid
+
+async def import_flashcards(
+    db: AsyncSession,
+    collection: Collection,
+    records: AsyncIterator[Optional[dict]]
+) -> dict:
+    """Validar e inserir flashcards em lotes, coletando os erros por linha
+
+    Cada lote é validado fora da transação e gravado numa transação curta, com
+    a coleção bloqueada e max_cards conferido de novo; um upload lento não
+    segura o bloqueio, e os lotes já gravados ficam mesmo se o envio parar.
+    """
+    imported = 0
+    errors = ImportErrors()
+
+    async def flush(batch):
+        nonlocal imported
+        valid = validate_batch(batch, errors)
+        if not valid:
+            return
+        max_cards = await db.scalar(
+            select(Collection.max_cards).where(Collection.id == collection.id).with_for_update()
+        )
+        card_count = await db.scalar(
+            select(func.count()).select_from(Flashcard).where(Flashcard.collection_id == collection.id)
+        )
+        available = max((max_cards or 0) - card_count, 0)
+        for row_number, _ in valid[available:]:
+            errors.append({"row": row_number, "error": "Limite de cartões da coleção atingido"})
+        valid = valid[:available]
+        if not valid:
+            await db.commit()
+            return
+        await db.execute(insert(Flashcard), [
+            {
+                "collection_id": collection.id,
+                "front": data.front,
+                "back": data.back,
+                "video_url": data.video_url,
+                "created_by_ia": False
+            }
+            for _, data in valid
+        ])
+        await db.commit()
+        imported += len(valid)
+
+    batch = []
+    row_number = 0
+    async for record in records:
+        row_number += 1
+        batch.append((row_number, record))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+
+    return {
+        "imported": imported,
+        "failed": errors.count,
+        "errors": sorted(errors.rows, key=lambda error: error["row"])
+    }
@@ -0,0 +1,65 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from fastapi import HTTPException, status
+from app.config import settings
+from app.security import hash_password, verify_password
+from app.utils.timing import track_external
+
+class PasswordHasherPool:
+    """Executa o bcrypt em um pool de processos com limite de operações pendentes
+
+    Acima de `max_pending` as requisições recebem 503 em vez de enfileirar,
+    para que uma rajada de logins não acumule latência sem limite.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servidor ocupado, tente novamente em instantes",
+                headers={"Retry-After": "1"}
+            )
+        self.pending += 1
+        try:
+            with track_external("bcrypt"):
+                return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password, settings.BCRYPT_ROUNDS)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+password_hasher = PasswordHasherPool(
+    workers=settings.PASSWORD_HASHER_WORKERS,
+    max_pending=settings.PASSWORD_HASHER_MAX_PENDING
+)
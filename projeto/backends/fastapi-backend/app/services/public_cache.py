@@ -0,0 +1,123 @@
+import itertools
+import uuid
+from typing import Any, Hashable, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Collection, Flashcard
+from app.utils.cache import TTLCache
+
+class PublicCollectionCache:
+    """Cache das leituras de coleções públicas, invalidado por coleção
+
+    Cada coleção tem uma versão; invalidar troca a versão e as entradas antigas
+    deixam de ser encontradas (e saem pelo LRU/TTL). Versão ausente gera uma
+    nova, então perder a versão nunca serve dado antigo.
+
+    Fica em processo (sem Redis, ao contrário do Django): a invalidação roda no
+    after_commit síncrono da sessão, antes da resposta da escrita, e num backend
+    remoto precisaria de I/O bloqueante ali. Outros workers veem a escrita ao
+    expirar o TTL (PUBLIC_CACHE_TTL_SECONDS, curto por isso).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._counter = itertools.count(1)
+
+    def _version(self, collection_id: uuid.UUID) -> int:
+        version = self._versions.get(collection_id)
+        if version is None:
+            version = next(self._counter)
+            self._versions.set(collection_id, version)
+        return version
+
+    def key(self, collection_id: uuid.UUID, name: Hashable) -> tuple:
+        """Chave na versão atual; obter antes de consultar o banco e usar no set(),
+        para que uma escrita concluída no meio grave o dado antigo na versão antiga"""
+        return (collection_id, self._version(collection_id), name)
+
+    def get(self, key: tuple) -> Optional[Any]:
+        return self.entries.get(key)
+
+    def set(self, key: tuple, value: Any) -> None:
+        self.entries.set(key, value)
+
+    def invalidate(self, collection_id: uuid.UUID) -> None:
+        self._versions.invalidate(collection_id)
+
+    def clear(self) -> None:
+        self._versions.clear()
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return self.entries.stats()
+
+public_cache = PublicCollectionCache(
+    maxsize=settings.PUBLIC_CACHE_MAX_SIZE,
+    ttl=settings.PUBLIC_CACHE_TTL_SECONDS
+)
+
+# Invalidação por eventos do SQLAlchemy: coleções alteradas na transação são
+# anotadas em session.info e invalidadas só após o commit
+PENDING_KEY = "public_cache_collections"
+ALL_COLLECTIONS = object()
+
+def _pending(session: Session) -> set:
+    return session.info.setdefault(PENDING_KEY, set())
+
+def _affected_collection(obj) -> Optional[uuid.UUID]:
+    if isinstance(obj, Collection):
+        return obj.id
+    if isinstance(obj, Flashcard):
+        return obj.collection_id
+    return None
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_objects(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        collection_id = _affected_collection(obj)
+        if collection_id is not None:
+            _pending(session).add(collection_id)
+
+def mark_collections(session: Session, collection_ids) -> None:
+    """Anotar coleções alteradas por um statement executado com TRACKED_OPTION"""
+    _pending(session).update(collection_ids)
+
+# Statements cujas coleções o chamador anota com mark_collections (ex.: via RETURNING),
+# em vez de invalidar o cache inteiro
+TRACKED_OPTION = "public_cache_tracked"
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_statements(state):
+    # insert/update/delete em massa (ex.: importação) não passam pelo flush
+    if not (state.is_insert or state.is_update or state.is_delete) or state.bind_mapper is None:
+        return
+    if state.execution_options.get(TRACKED_OPTION):
+        return
+    entity = state.bind_mapper.class_
+    if entity not in (Collection, Flashcard):
+        return
+    id_key = "id" if entity is Collection else "collection_id"
+    parameters = state.parameters
+    rows = parameters if isinstance(parameters, list) else [parameters or {}]
+    ids = {row.get(id_key) for row in rows}
+    if None in ids or not ids:
+        _pending(state.session).add(ALL_COLLECTIONS)
+    else:
+        _pending(state.session).update(ids)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending:
+        return
+    if ALL_COLLECTIONS in pending:
+        public_cache.clear()
+        return
+    for collection_id in pending:
+        public_cache.invalidate(collection_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,82 @@
+import uuid
+from typing import Optional
+from fastapi import HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models import GenerationLog, UserPlan, utctoday
+from app.schemas import UserPrincipal
+from app.utils.cache import TTLCache
+from app.utils.rate_limit import SlidingWindowLimiter
+
+DAILY_LIMITS = {UserPlan.PRO: 999, UserPlan.ADMIN: 999}
+FREE_DAILY_LIMIT = 6
+
+generation_limiter = SlidingWindowLimiter(
+    limit=settings.GENERATION_RATE_LIMIT,
+    window=settings.GENERATION_RATE_WINDOW_SECONDS
+)
+# Usuários que já esgotaram a cota do dia, para recusar sem consultar o banco
+exhausted_quotas = TTLCache(maxsize=100000, ttl=24 * 3600)
+
+def daily_limit(plan: str) -> int:
+    return DAILY_LIMITS.get(plan, FREE_DAILY_LIMIT)
+
+def _insert(db: AsyncSession):
+    return postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+
+async def generated_today(db: AsyncSession, user_id: uuid.UUID) -> int:
+    count = await db.scalar(select(GenerationLog.count).where(
+        GenerationLog.user_id == user_id,
+        GenerationLog.date == utctoday()
+    ))
+    return count or 0
+
+async def add_generations(db: AsyncSession, user_id: uuid.UUID, n: int, limit: Optional[int] = None) -> Optional[int]:
+    """Somar n ao contador do dia com um único UPSERT; None se passar do limite"""
+    if limit is not None and n > limit:
+        return None
+    stmt = _insert(db)(GenerationLog).values(id=uuid.uuid4(), user_id=user_id, date=utctoday(), count=n)
+    new_count = GenerationLog.count + stmt.excluded.count
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GenerationLog.user_id, GenerationLog.date],
+        set_={"count": new_count},
+        where=new_count <= limit if limit is not None else None
+    ).returning(GenerationLog.count)
+    count = await db.scalar(stmt)
+    await db.commit()
+    return count
+
+async def reserve_generation(db: AsyncSession, user: UserPrincipal) -> None:
+    """Reservar uma geração da cota diária ou responder 429"""
+    if not generation_limiter.allow(user.id):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Muitas gerações em pouco tempo, tente novamente em instantes"
+        )
+    
+    key = (user.id, utctoday())
+    if exhausted_quotas.get(key) == user.plan:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Limite diário de gerações atingido"
+        )
+    
+    if await add_generations(db, user.id, 1, daily_limit(user.plan)) is None:
+        exhausted_quotas.set(key, user.plan)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Limite diário de gerações atingido"
+        )
+
+async def release_generation(db: AsyncSession, user_id: uuid.UUID) -> None:
+    """Devolver uma geração reservada que não produziu cartões"""
+    await db.execute(update(GenerationLog).where(
+        GenerationLog.user_id == user_id,
+        GenerationLog.date == utctoday(),
+        GenerationLog.count > 0
+    ).values(count=GenerationLog.count - 1))
+    await db.commit()
+    exhausted_quotas.invalidate((user_id, utctoday()))
@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_EASE_FACTOR = 2.5
+MIN_EASE_FACTOR = 1.3
+DEFAULT_INTERVAL_MODIFIER = 1.0
+DEFAULT_MAXIMUM_INTERVAL_DAYS = 365
+RESCHEDULE_BATCH_SIZE = 5000
+# As duas primeiras revisões (e a que segue um lapso) têm intervalos fixos de 1 e 6
+# dias; só a partir da terceira o intervalo depende do fator e do modificador
+GRADUATED_REPETITIONS = 3
+
+@dataclass
+class ReviewState:
+    ease_factor: float = DEFAULT_EASE_FACTOR
+    interval_days: float = 0.0
+    repetitions: int = 0
+    lapses: int = 0
+
+def sm2_review(
+    state: ReviewState,
+    quality: int,
+    interval_modifier: float = DEFAULT_INTERVAL_MODIFIER,
+    maximum_interval_days: int = DEFAULT_MAXIMUM_INTERVAL_DAYS
+) -> ReviewState:
+    """Aplicar uma revisão (qualidade 0-5) segundo o algoritmo SM-2"""
+    ease_factor = state.ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    ease_factor = max(MIN_EASE_FACTOR, ease_factor)
+
+    if quality < 3:
+        return ReviewState(ease_factor, 1.0, 0, state.lapses + 1)
+
+    if state.repetitions == 0:
+        interval_days = 1.0
+    elif state.repetitions == 1:
+        interval_days = 6.0
+    else:
+        interval_days = state.interval_days * state.ease_factor * interval_modifier
+
+    interval_days = min(max(interval_days, 1.0), float(maximum_interval_days))
+    return ReviewState(ease_factor, interval_days, state.repetitions + 1, state.lapses)
+
+def next_due_at(reviewed_at: datetime, interval_days: float) -> datetime:
+    return reviewed_at + timedelta(days=interval_days)
+
+def reschedule_intervals(
+    last_reviewed_at: list[datetime],
+    interval_days: list[float],
+    repetitions: list[int],
+    scale: float,
+    maximum_interval_days: int
+) -> tuple["np.ndarray", "np.ndarray"]:
+    """Reescalar intervalos e recalcular vencimentos de um lote de cartões de uma vez
+
+    Cartões ainda nos passos fixos não são reescalados, só limitados ao intervalo máximo.
+    """
+    # NumPy só é importado no reagendamento em lote, fora do boot do worker
+    import numpy as np
+    
+    scales = np.where(np.asarray(repetitions) >= GRADUATED_REPETITIONS, scale, 1.0)
+    intervals = np.clip(
+        np.asarray(interval_days, dtype=np.float64) * scales,
+        1.0,
+        float(maximum_interval_days)
+    )
+    reviewed = np.asarray(last_reviewed_at, dtype="datetime64[us]")
+    due = reviewed + np.rint(intervals * 86_400_000_000).astype("timedelta64[us]")
+    return intervals, due.astype(object)
@@ -0,0 +1,40 @@
+import logging
+import os
+from typing import Optional
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic.ini")
+
+# Resultado da última verificação, exposto no /health
+schema_status: dict = {"checked": False, "current": None, "head": None, "up_to_date": None}
+
+def _current_revision(connection) -> Optional[str]:
+    from alembic.runtime.migration import MigrationContext
+    return MigrationContext.configure(connection).get_current_revision()
+
+async def check_schema() -> dict:
+    """Comparar a revisão do banco com a última migração
+
+    Roda em segundo plano no startup: o worker não espera o banco para subir,
+    e o Alembic só é importado aqui.
+    """
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+    
+    try:
+        head = ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_current_head()
+        async with engine.connect() as conn:
+            current = await conn.run_sync(_current_revision)
+    except Exception:
+        logger.exception("Falha ao verificar a versão do esquema do banco")
+        return schema_status
+    
+    schema_status.update(checked=True, current=current, head=head, up_to_date=current == head)
+    if current != head:
+        logger.error(
+            "Banco na revisão %s, mas a última migração é %s; rode `alembic upgrade head`",
+            current, head
+        )
+    return schema_status
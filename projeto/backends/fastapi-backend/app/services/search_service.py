@@ -0,0 +1,61 @@
+import uuid
+from sqlalchemy import Row, func, literal_column, or_, select, table, column
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Collection, Flashcard, Share
+from app.schemas import FlashcardResponse
+from app.utils.responses import response_columns
+
+MIN_QUERY_LENGTH = 3
+
+def accessible_collection_ids(user_id: uuid.UUID):
+    """Coleções do usuário e coleções compartilhadas com ele"""
+    return select(Collection.id).where(or_(
+        Collection.user_id == user_id,
+        Collection.id.in_(select(Share.collection_id).where(Share.user_id == user_id))
+    ))
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _postgres_search_query(query: str):
+    pattern = f"%{_escape_like(query)}%"
+    rank = func.greatest(func.similarity(Flashcard.front, query), func.similarity(Flashcard.back, query))
+    # ILIKE e o operador % usam os índices GIN gin_trgm_ops
+    return select(*response_columns(Flashcard, FlashcardResponse), rank.label("rank")).where(or_(
+        Flashcard.front.ilike(pattern, escape="\\"),
+        Flashcard.back.ilike(pattern, escape="\\"),
+        Flashcard.front.op("%")(query),
+        Flashcard.back.op("%")(query)
+    ))
+
+def _sqlite_search_query(query: str):
+    fts = table("flashcards_fts", column("rowid"))
+    # Frase FTS5: com o tokenizer trigram equivale a uma busca por substring
+    phrase = '"' + query.replace('"', '""') + '"'
+    rank = -func.bm25(literal_column("flashcards_fts"))
+    return (
+        select(*response_columns(Flashcard, FlashcardResponse), rank.label("rank"))
+        .join(fts, fts.c.rowid == literal_column("flashcards.rowid"))
+        .where(literal_column("flashcards_fts").op("MATCH")(phrase))
+    )
+
+async def search_flashcards(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    query: str,
+    limit: int,
+    offset: int
+) -> list[Row]:
+    """Buscar flashcards por front/back, ordenados por relevância (campos de FlashcardResponse e rank)"""
+    if db.bind.dialect.name == "postgresql":
+        stmt = _postgres_search_query(query)
+    else:
+        stmt = _sqlite_search_query(query)
+
+    stmt = (
+        stmt.where(Flashcard.collection_id.in_(accessible_collection_ids(user_id)))
+        .order_by(literal_column("rank").desc(), Flashcard.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    return (await db.execute(stmt)).all()
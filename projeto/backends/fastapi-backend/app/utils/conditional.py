@@ -0,0 +1,32 @@
+import hashlib
+from typing import Optional
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+async def list_validators(db: AsyncSession, model, criteria: list, *key_parts) -> dict:
+    """ETag forte de uma listagem a partir de count e max(updated_at)
+
+    `key_parts` identifica a página (filtros, limit, cursor) para que páginas
+    diferentes da mesma listagem não compartilhem a ETag. Sem Last-Modified:
+    max(updated_at) não avança quando uma linha é excluída, só o count muda.
+    """
+    count, last_modified = (await db.execute(
+        select(func.count(), func.max(model.updated_at)).where(*criteria)
+    )).one()
+
+    digest = hashlib.sha256(
+        repr((count, last_modified.isoformat() if last_modified else None, *key_parts)).encode()
+    ).hexdigest()[:32]
+    return {"ETag": f'"{digest}"', "Cache-Control": "private, no-cache"}
+
+def not_modified(request: Request, headers: dict) -> Optional[Response]:
+    """Resposta 304 se If-None-Match casar com a ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return None
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    if "*" in tags or headers["ETag"] in tags:
+        return Response(status_code=304, headers=headers)
+    return None
@@ -0,0 +1,52 @@
+import json
+from typing import Any, List
+
+class JSONArrayStreamParser:
+    """Extrair os objetos de um array JSON à medida que os fragmentos chegam"""
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self._finished = False
+
+    def feed(self, chunk: str) -> List[Any]:
+        items = []
+        for char in chunk:
+            if self._finished:
+                # Texto depois do fim do array (ex.: explicações do modelo) não vira cartão
+                break
+            if not self._started:
+                # Ignorar qualquer texto antes do array (ex.: cercas de markdown)
+                self._started = char == "["
+                continue
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._buffer = [char]
+                elif char == "]":
+                    self._finished = True
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        items.append(json.loads("".join(self._buffer)))
+                    except json.JSONDecodeError:
+                        pass
+        return items
@@ -0,0 +1,177 @@
+import bisect
+import math
+import threading
+import time
+from typing import Callable, Iterator
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric:
+    """Métrica com rótulos, exposta no formato de texto do Prometheus"""
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}"
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type}"
+        yield from self.samples()
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set(self, *labels, value: float) -> None:
+        """Copiar um contador mantido por outro componente (no momento da coleta)"""
+        with self._lock:
+            self._values[labels] = value
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._histograms: dict[tuple, list] = {}
+
+    def observe(self, *labels, value: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(labels)
+            if histogram is None:
+                # Contagem por faixa (não acumulada), soma e total
+                histogram = self._histograms[labels] = [[0] * len(self.buckets), 0.0, 0]
+            histogram[0][bisect.bisect_left(self.buckets, value)] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            histograms = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._histograms.items()]
+        for labels, counts, total, count in histograms:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = format_labels(self.labelnames, labels, f'le="{format_value(bound)}"')
+                yield f"{self.name}_bucket{le} {cumulative}"
+            yield f"{self.name}_sum{format_labels(self.labelnames, labels)} {format_value(total)}"
+            yield f"{self.name}_count{format_labels(self.labelnames, labels)} {count}"
+
+class MetricsRegistry:
+    """Métricas do processo; com vários workers, cada um expõe as suas"""
+
+    def __init__(self):
+        self.metrics: list[Metric] = []
+        self.collectors: list[Callable[[], None]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def collector(self, fn: Callable[[], None]) -> Callable[[], None]:
+        """Função chamada a cada coleta para atualizar gauges de estado (pool, caches...)"""
+        self.collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        for collect in self.collectors:
+            collect()
+        lines = [line for metric in self.metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress", "Requisições HTTP em andamento", ("method",)
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP por rota", ("method", "route", "status")
+)
+
+class MetricsMiddleware:
+    """Latência por rota e requisições em andamento
+
+    A rota é o padrão do path (ex.: /collections/{collection_id}), para que o
+    número de séries não cresça com os ids; sem rota correspondente, "unmatched".
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc(method)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_progress.dec(method)
+            route = scope.get("route")
+            http_request_duration.observe(
+                method, getattr(route, "path", "unmatched"), str(status_code),
+                value=time.perf_counter() - start
+            )
@@ -0,0 +1,53 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(created_at: datetime, id: uuid.UUID) -> str:
+    payload = json.dumps([created_at.isoformat(), str(id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), uuid.UUID(id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    model,
+    cursor: Optional[str],
+    limit: int,
+    scalars: bool = True
+) -> tuple[list, Optional[str]]:
+    """Paginação keyset em (created_at, id), do mais recente para o mais antigo
+
+    Com `scalars=False` a consulta pode selecionar colunas e retorna Rows.
+    """
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        query = query.where(tuple_(model.created_at, model.id) < tuple_(created_at, id))
+
+    query = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    result = await db.execute(query)
+    rows = result.scalars().all() if scalars else result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return rows, next_cursor
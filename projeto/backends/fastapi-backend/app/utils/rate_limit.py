@@ -0,0 +1,34 @@
+import threading
+import time
+from collections import deque
+from typing import Hashable
+
+class SlidingWindowLimiter:
+    """Limitador em memória por chave: no máximo `limit` eventos em `window` segundos"""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._events: dict[Hashable, deque] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key: Hashable, cost: int = 1) -> bool:
+        if self.limit <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.setdefault(key, deque())
+            while events and events[0] <= now - self.window:
+                events.popleft()
+            if len(events) + cost > self.limit:
+                return False
+            events.extend([now] * cost)
+            self._prune(now)
+            return True
+
+    def _prune(self, now: float) -> None:
+        # Remover chaves ociosas para o dicionário não crescer sem limite
+        if len(self._events) < 10000:
+            return
+        for key in [k for k, v in self._events.items() if not v or v[-1] <= now - self.window]:
+            del self._events[key]
@@ -0,0 +1,38 @@
+from typing import Any, Optional
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+from app.utils.timing import track_serialization
+
+class FastJSONResponse(Response):
+    """Resposta JSON serializada com orjson (UUID, datetime e enums nativos)"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        with track_serialization():
+            return orjson.dumps(content)
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse padrão com a renderização contada no Server-Timing"""
+
+    def render(self, content: Any) -> bytes:
+        with track_serialization():
+            return super().render(content)
+
+def api_response(
+    message: str,
+    data: Optional[dict] = None,
+    success: bool = True,
+    status_code: int = 200,
+    headers: Optional[dict] = None
+) -> FastJSONResponse:
+    """Envelope ApiResponse sem revalidar os dados com Pydantic"""
+    return FastJSONResponse(
+        {"success": success, "message": message, "data": data},
+        status_code=status_code,
+        headers=headers
+    )
+
+def response_columns(model, schema: type[BaseModel]) -> list:
+    """Colunas do modelo correspondentes aos campos do schema de resposta"""
+    return [getattr(model, name) for name in schema.model_fields]
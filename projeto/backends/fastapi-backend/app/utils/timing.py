@@ -0,0 +1,135 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RequestTimings:
+    """Tempos acumulados durante uma requisição, em milissegundos"""
+    db_queries: int = 0
+    db_ms: float = 0.0
+    serialize_ms: float = 0.0
+    external_ms: dict[str, float] = field(default_factory=dict)
+
+    def server_timing(self, total_ms: float) -> str:
+        metrics = [
+            f'db;dur={self.db_ms:.2f};desc="{self.db_queries} queries"',
+            f"serialize;dur={self.serialize_ms:.2f}",
+        ]
+        metrics += [f"{name};dur={ms:.2f}" for name, ms in self.external_ms.items()]
+        metrics.append(f"total;dur={total_ms:.2f}")
+        return ", ".join(metrics)
+
+    def as_log(self, total_ms: float) -> dict:
+        return {
+            "total_ms": round(total_ms, 2),
+            "db_queries": self.db_queries,
+            "db_ms": round(self.db_ms, 2),
+            "serialize_ms": round(self.serialize_ms, 2),
+            **{f"{name}_ms": round(ms, 2) for name, ms in self.external_ms.items()},
+        }
+
+# Só existe dentro do ServerTimingMiddleware; com a medição desligada os
+# pontos instrumentados fazem apenas esta leitura
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+@contextmanager
+def track_serialization() -> Iterator[None]:
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.serialize_ms += (time.perf_counter() - start) * 1000
+
+@contextmanager
+def track_external(name: str) -> Iterator[None]:
+    """Tempo de espera por um serviço externo (OpenAI, pool do bcrypt...)"""
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        timings.external_ms[name] = timings.external_ms.get(name, 0.0) + elapsed
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Contar consultas e somar o tempo de banco da requisição corrente"""
+
+    # O início fica no contexto de execução, descartado junto com ele; numa pilha
+    # por conexão, um statement que falhou deixaria o início para o próximo
+    def record(context) -> None:
+        start = getattr(context, "query_start", None)
+        timings = current_timings.get()
+        if start is not None and timings is not None:
+            context.query_start = None
+            timings.db_queries += 1
+            timings.db_ms += (time.perf_counter() - start) * 1000
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.query_start = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        record(context)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(exception_context):
+        # Statements que falharam (IntegrityError, timeout) também contam no tempo de banco
+        record(exception_context.execution_context)
+
+class ServerTimingMiddleware:
+    """Cabeçalho Server-Timing e uma linha de log JSON por requisição HTTP
+
+    O cabeçalho sai com os tempos até o início da resposta; a linha de log é
+    escrita no fim e inclui também o corpo de respostas em streaming.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.server_timing((time.perf_counter() - start) * 1000))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timings.reset(token)
+            logger.info(json.dumps({
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                **timings.as_log((time.perf_counter() - start) * 1000),
+            }))
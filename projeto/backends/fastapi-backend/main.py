@@ -1,15 +1,40 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.database import engine, Base
-from app.routers import auth, collections, flashcards, shares, subscriptions
+from app.database import ReadYourWritesMiddleware, engine, read_engine
+from app.routers import auth, collections, flashcards, reviews, shares, subscriptions
+from app.services.ai_cache import ai_cache
+from app.services.generation_jobs import generation_queue
+from app.services.password_hasher import password_hasher
+from app.services.public_cache import public_cache
+from app.services.schema_check import check_schema, schema_status
+from app.utils.metrics import CONTENT_TYPE, MetricsMiddleware, registry
+from app.utils.responses import TimedJSONResponse
+from app.utils.timing import ServerTimingMiddleware, instrument_engine
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # O esquema é criado/atualizado pelas migrações (alembic upgrade head); aqui só
+    # verificamos a versão, em segundo plano para não atrasar o boot do worker
+    schema_check = asyncio.create_task(check_schema()) if settings.SCHEMA_CHECK_ON_STARTUP else None
+    await generation_queue.start()
+    yield
+    if schema_check:
+        schema_check.cancel()
+    await generation_queue.stop()
+    password_hasher.shutdown()
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
 
 app = FastAPI(
     title="Flashcards API",
     description="API for managing flashcards, collections, user authentication, sharing, and subscriptions.",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse,
 )
 app.add_middleware(
     CORSMiddleware,
@@ -17,16 +42,82 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(MetricsMiddleware)
+# Sem réplica configurada o middleware só repassa a requisição
+app.add_middleware(ReadYourWritesMiddleware)
+if settings.SERVER_TIMING_ENABLED:
+    # Desligado, nem o middleware nem os eventos do engine são instalados
+    instrument_engine(engine)
+    if read_engine is not engine:
+        instrument_engine(read_engine)
+    app.add_middleware(ServerTimingMiddleware)
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "principal_cache": auth.principal_cache.stats(),
+        "ai_cache": ai_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "public_cache": public_cache.stats(),
+        "generation_queue": generation_queue.stats(),
+        "schema": schema_status
+    }
+
+db_pool_size = registry.gauge("db_pool_size", "Tamanho configurado do pool do SQLAlchemy", ("engine",))
+db_pool = registry.gauge("db_pool_connections", "Conexões do pool do SQLAlchemy por estado", ("engine", "state"))
+cache_hits = registry.counter("cache_hits_total", "Acertos dos caches", ("cache",))
+cache_misses = registry.counter("cache_misses_total", "Faltas dos caches", ("cache",))
+cache_hit_ratio = registry.gauge("cache_hit_ratio", "Proporção de acertos desde o início do worker", ("cache",))
+password_hasher_pending = registry.gauge("password_hasher_pending", "Operações de bcrypt em andamento ou na fila")
+password_hasher_rejected = registry.counter("password_hasher_rejected_total", "Operações de bcrypt recusadas com 503")
+generation_queue_depth = registry.gauge("generation_queue_depth", "Jobs de geração aguardando na fila")
+
+@registry.collector
+def collect_runtime_metrics():
+    # Com réplica, as leituras usam o pool do read_engine
+    engines = {"primary": engine}
+    if read_engine is not engine:
+        engines["replica"] = read_engine
+    for name, db_engine in engines.items():
+        pool = db_engine.pool
+        # Pools sem fila (NullPool/StaticPool) não expõem estas contagens
+        if hasattr(pool, "checkedout"):
+            db_pool_size.set(name, value=pool.size())
+            db_pool.set(name, "checked_out", value=pool.checkedout())
+            db_pool.set(name, "checked_in", value=pool.checkedin())
+            # overflow() fica negativo enquanto o pool não chegou ao tamanho configurado
+            db_pool.set(name, "overflow", value=max(pool.overflow(), 0))
+
+    ai = ai_cache.stats()
+    caches = {
+        "principal": auth.principal_cache.stats(),
+        "ai_memory": ai["memory"],
+        "ai": {"hits": ai["memory"]["hits"] + ai["db_hits"], "misses": ai["misses"], "hit_ratio": ai["hit_ratio"]},
+        "public": public_cache.stats(),
+    }
+    for name, stats in caches.items():
+        cache_hits.set(name, value=stats["hits"])
+        cache_misses.set(name, value=stats["misses"])
+        cache_hit_ratio.set(name, value=stats["hit_ratio"])
+
+    hasher = password_hasher.stats()
+    password_hasher_pending.set(value=hasher["pending"])
+    password_hasher_rejected.set(value=hasher["rejected"])
+    generation_queue_depth.set(value=generation_queue.stats()["queued"])
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métricas deste worker no formato de texto do Prometheus"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
 
 
 app.include_router(auth.router)
 app.include_router(collections.router)
 app.include_router(flashcards.router)
+app.include_router(reviews.router)
 app.include_router(shares.router)
 app.include_router(subscriptions.router)
 
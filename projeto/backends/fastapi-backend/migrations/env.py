@@ -0,0 +1,59 @@
+import asyncio
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.database import Base, database_url
+import app.models  # noqa: F401 (registra os modelos no metadata)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Busca textual é específica do banco: FTS5 no SQLite (DDL próprio na migração)
+    # e índices GIN de trigramas só no Postgres
+    if type_ == "table" and name.startswith("flashcards_fts"):
+        return False
+    if type_ == "index" and name.endswith("_trgm"):
+        return context.get_context().dialect.name == "postgresql"
+    return True
+
+def run_migrations_offline() -> None:
+    """Gerar o SQL das migrações sem conectar ao banco (alembic upgrade --sql)"""
+    context.configure(
+        url=database_url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        include_object=include_object,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=database_url.get_backend_name() == "sqlite"
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def do_run_migrations(connection) -> None:
+    is_sqlite = connection.dialect.name == "sqlite"
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # No SQLite o UUID é refletido como NUMERIC; só o Postgres compara tipos
+        compare_type=not is_sqlite,
+        # SQLite não suporta ALTER de constraints; o batch recria a tabela
+        render_as_batch=is_sqlite
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+async def run_migrations_online() -> None:
+    engine = create_async_engine(database_url)
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await engine.dispose()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
@@ -0,0 +1,190 @@
+"""initial schema
+
+Esquema completo com os índices das consultas quentes: listagens keyset
+(user_id/collection_id, created_at, id), ETag das listagens
+(collection_id, updated_at), cota diária única por (user_id, date), fila de
+revisões (user_id, due_at) e compartilhamentos por (user_id, collection_id).
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 03:51:39.143876
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Busca textual no SQLite (FTS5 com tokenizer de trigramas), espelho de app.models.SQLITE_FTS_DDL
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS flashcards_fts USING fts5("
+    "front, back, content='flashcards', content_rowid='rowid', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS flashcards_fts_ai AFTER INSERT ON flashcards BEGIN "
+    "INSERT INTO flashcards_fts(rowid, front, back) VALUES (new.rowid, new.front, new.back); END",
+    "CREATE TRIGGER IF NOT EXISTS flashcards_fts_ad AFTER DELETE ON flashcards BEGIN "
+    "INSERT INTO flashcards_fts(flashcards_fts, rowid, front, back) VALUES ('delete', old.rowid, old.front, old.back); END",
+    "CREATE TRIGGER IF NOT EXISTS flashcards_fts_au AFTER UPDATE ON flashcards BEGIN "
+    "INSERT INTO flashcards_fts(flashcards_fts, rowid, front, back) VALUES ('delete', old.rowid, old.front, old.back); "
+    "INSERT INTO flashcards_fts(rowid, front, back) VALUES (new.rowid, new.front, new.back); END",
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    op.create_table('users',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('plan', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table('collections',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('is_public', sa.Boolean(), nullable=True),
+    sa.Column('max_cards', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_collections_user_id_created_at_id', 'collections', ['user_id', 'created_at', 'id'])
+
+    op.create_table('flashcards',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('collection_id', sa.UUID(), nullable=False),
+    sa.Column('front', sa.Text(), nullable=False),
+    sa.Column('back', sa.Text(), nullable=False),
+    sa.Column('video_url', sa.String(length=1000), nullable=True),
+    sa.Column('extra', sa.JSON(), nullable=True),
+    sa.Column('created_by_ia', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['collection_id'], ['collections.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_flashcards_collection_id_created_at_id', 'flashcards', ['collection_id', 'created_at', 'id'])
+    op.create_index('ix_flashcards_collection_id_updated_at', 'flashcards', ['collection_id', 'updated_at'])
+    if dialect == 'postgresql':
+        op.create_index(
+            'ix_flashcards_front_trgm', 'flashcards', ['front'],
+            postgresql_using='gin', postgresql_ops={'front': 'gin_trgm_ops'}
+        )
+        op.create_index(
+            'ix_flashcards_back_trgm', 'flashcards', ['back'],
+            postgresql_using='gin', postgresql_ops={'back': 'gin_trgm_ops'}
+        )
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+
+    op.create_table('shares',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('collection_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('permissions', sa.String(length=20), nullable=True),
+    sa.Column('share_id', sa.String(length=50), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['collection_id'], ['collections.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('share_id')
+    )
+    op.create_index('ix_shares_collection_id', 'shares', ['collection_id'])
+    op.create_index('ix_shares_user_id_collection_id', 'shares', ['user_id', 'collection_id'])
+
+    op.create_table('generation_logs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'date', name='uq_generation_logs_user_id_date')
+    )
+
+    op.create_table('payments',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('subscription_id', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('start_date', sa.DateTime(), nullable=True),
+    sa.Column('end_date', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_payments_user_id', 'payments', ['user_id'])
+
+    op.create_table('card_reviews',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('flashcard_id', sa.UUID(), nullable=False),
+    sa.Column('ease_factor', sa.Float(), nullable=False),
+    sa.Column('interval_days', sa.Float(), nullable=False),
+    sa.Column('repetitions', sa.Integer(), nullable=False),
+    sa.Column('lapses', sa.Integer(), nullable=False),
+    sa.Column('due_at', sa.DateTime(), nullable=False),
+    sa.Column('last_reviewed_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['flashcard_id'], ['flashcards.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'flashcard_id', name='uq_card_reviews_user_id_flashcard_id')
+    )
+    op.create_index('ix_card_reviews_user_id_due_at', 'card_reviews', ['user_id', 'due_at'])
+
+    op.create_table('review_settings',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('interval_modifier', sa.Float(), nullable=False),
+    sa.Column('maximum_interval_days', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    op.create_table('ai_generation_cache',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('input_type', sa.String(length=20), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('prompt_version', sa.String(length=20), nullable=False),
+    sa.Column('flashcards', sa.JSON(), nullable=False),
+    sa.Column('hits', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('last_accessed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_ai_generation_cache_created_at', 'ai_generation_cache', ['created_at'])
+    op.create_index('ix_ai_generation_cache_last_accessed_at', 'ai_generation_cache', ['last_accessed_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('ai_generation_cache')
+    op.drop_table('review_settings')
+    op.drop_table('card_reviews')
+    op.drop_table('payments')
+    op.drop_table('generation_logs')
+    op.drop_table('shares')
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS flashcards_fts')
+    op.drop_table('flashcards')
+    op.drop_table('collections')
+    op.drop_table('users')
@@ -0,0 +1,44 @@
+import gc
+import os
+import tempfile
+import pytest
+from alembic import command
+from alembic.config import Config
+
+# Configuração mínima antes de importar a aplicação (app.config lê o ambiente no import).
+# TEST_DATABASE_URL permite rodar os testes contra um Postgres vazio.
+os.environ["DATABASE_URL"] = os.getenv(
+    "TEST_DATABASE_URL",
+    "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="flashcards-tests-"), "test.db")
+)
+os.environ.setdefault("JWT_SECRET", "test-secret-key-with-at-least-32-bytes")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ["DEBUG"] = "false"
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture(scope="session")
+def migrated_database():
+    """Banco criado pelas migrações (o mesmo caminho usado em produção)"""
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    command.upgrade(config, "head")
+    yield os.environ["DATABASE_URL"]
+    # Conexões SQLite não devolvidas ao pool só são fechadas pelo coletor de lixo e,
+    # até lá, podem manter o arquivo bloqueado para o DROP TABLE do downgrade
+    gc.collect()
+    command.downgrade(config, "base")
+
+@pytest.fixture(scope="session")
+def client(migrated_database):
+    from fastapi.testclient import TestClient
+    from main import app
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    client.post("/auth/register", json={"email": "tests@example.com", "password": "password123"})
+    token = client.post(
+        "/auth/login", json={"email": "tests@example.com", "password": "password123"}
+    ).json()["data"]["token"]
+    return {"Authorization": f"Bearer {token}"}
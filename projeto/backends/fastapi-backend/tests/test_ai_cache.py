@@ -0,0 +1,39 @@
+"""Limpeza da tabela do cache de IA: periódica, e só acima do limite de linhas"""
+import asyncio
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app import database
+from app.models import AIGenerationCache
+from app.services import ai_cache as ai_cache_module
+from app.services.ai_cache import AIResultCache
+
+def test_eviction_runs_every_n_writes(migrated_database, monkeypatch):
+    # Sem pool: nenhuma conexão fica presa a este event loop
+    engine = create_async_engine(database.get_async_database_url(migrated_database), poolclass=NullPool)
+    monkeypatch.setattr(ai_cache_module, "AsyncSessionLocal", async_sessionmaker(bind=engine, class_=AsyncSession))
+    cache = AIResultCache(memory_size=10, ttl_seconds=3600, max_rows=2, evict_every=3)
+    deletes = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("DELETE") and "ORDER BY" in statement:
+            deletes.append(statement)
+
+    async def run():
+        async with ai_cache_module.AsyncSessionLocal() as db:
+            await db.execute(delete(AIGenerationCache))
+            await db.commit()
+        for n in range(5):
+            await cache.set("topic", f"tema {n}", "modelo", [{"front": "f", "back": "b"}])
+        async with ai_cache_module.AsyncSessionLocal() as db:
+            return await db.scalar(select(func.count()).select_from(AIGenerationCache))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        rows = asyncio.run(run())
+    finally:
+        asyncio.run(engine.dispose())
+
+    # Só a 3ª gravação limpa (3 linhas > 2); a 4ª e a 5ª ainda não chegaram à próxima
+    assert len(deletes) == 1
+    assert rows == 4
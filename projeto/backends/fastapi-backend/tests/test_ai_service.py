@@ -0,0 +1,51 @@
+"""Resposta da OpenAI normalizada antes de ir para o cache"""
+import asyncio
+from types import SimpleNamespace
+import pytest
+from app.services import ai_service
+
+class MemoryCache:
+    def __init__(self, initial=None):
+        self.values = dict(initial or {})
+
+    async def get(self, input_type, content, model):
+        return self.values.get((input_type, content))
+
+    async def set(self, input_type, content, model, flashcards):
+        if flashcards:
+            self.values[(input_type, content)] = flashcards
+
+def fake_client(content: str):
+    async def create(**kwargs):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+    return lambda: SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+@pytest.mark.parametrize("content, expected", [
+    ('{"front": "a", "back": "b"}', []),
+    ('[{"front": "a"}, {"front": "", "back": "b"}, "x", {"front": 1, "back": "b"}]', []),
+    ('[{"front": "a", "back": "b", "extra": 1}, {"back": "c"}]', [{"front": "a", "back": "b"}]),
+])
+def test_invalid_results_are_not_cached(monkeypatch, content, expected):
+    cache = MemoryCache()
+    monkeypatch.setattr(ai_service, "ai_cache", cache)
+    monkeypatch.setattr(ai_service, "get_client", fake_client(content))
+
+    assert asyncio.run(ai_service.generate_flashcards_with_ai("topic", "tema")) == expected
+    assert cache.values == ({("topic", "tema"): expected} if expected else {})
+
+def test_invalid_cached_entry_is_regenerated(monkeypatch):
+    cache = MemoryCache({("topic", "tema"): {"front": "a", "back": "b"}})
+    monkeypatch.setattr(ai_service, "ai_cache", cache)
+    monkeypatch.setattr(ai_service, "get_client", fake_client('[{"front": "a", "back": "b"}]'))
+
+    assert asyncio.run(ai_service.generate_flashcards_with_ai("topic", "tema")) == [{"front": "a", "back": "b"}]
+    assert cache.values[("topic", "tema")] == [{"front": "a", "back": "b"}]
+
+def test_failures_propagate_and_are_not_cached(monkeypatch):
+    cache = MemoryCache()
+    monkeypatch.setattr(ai_service, "ai_cache", cache)
+    monkeypatch.setattr(ai_service, "get_client", fake_client("Desculpe, não consigo."))
+
+    with pytest.raises(ValueError):
+        asyncio.run(ai_service.generate_flashcards_with_ai("topic", "tema"))
+    assert cache.values == {}
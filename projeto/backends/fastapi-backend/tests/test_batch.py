@@ -0,0 +1,134 @@
+"""Operações em lote sobre flashcards: um statement por operação, com checagem de dono"""
+import pytest
+from sqlalchemy import event
+from app.database import engine
+
+@pytest.fixture(scope="module")
+def users(client):
+    headers = []
+    for email in ("batch@example.com", "batch-other@example.com"):
+        client.post("/auth/register", json={"email": email, "password": "password123"})
+        token = client.post("/auth/login", json={"email": email, "password": "password123"}).json()["data"]["token"]
+        headers.append({"Authorization": f"Bearer {token}"})
+    return headers
+
+def create_collection(client, headers, **fields) -> str:
+    response = client.post("/collections/", json={"name": "lote", **fields}, headers=headers)
+    return response.json()["data"]["collection"]["id"]
+
+def create_cards(client, headers, collection_id, count: int) -> list[str]:
+    return [
+        client.post(
+            f"/flashcards/collections/{collection_id}",
+            json={"front": f"pergunta {n}", "back": f"resposta {n}"}, headers=headers
+        ).json()["data"]["flashcard"]["id"]
+        for n in range(count)
+    ]
+
+def list_cards(client, headers, collection_id) -> dict:
+    response = client.get(f"/flashcards/collections/{collection_id}?limit=100", headers=headers)
+    return {card["id"]: card for card in response.json()["data"]["flashcards"]}
+
+def batch(client, headers, **body):
+    return client.post("/flashcards/batch", json=body, headers=headers)
+
+def test_delete_checks_ownership(client, users):
+    owner, other = users
+    collection_id = create_collection(client, owner)
+    other_collection_id = create_collection(client, other)
+    cards = create_cards(client, owner, collection_id, 3)
+    other_cards = create_cards(client, other, other_collection_id, 1)
+
+    response = batch(client, owner, ids=cards[:2] + other_cards, operation="delete")
+    assert response.status_code == 200
+    assert response.json()["data"] == {"affected": 2, "skipped": 1}
+    assert set(list_cards(client, owner, collection_id)) == {cards[2]}
+    assert set(list_cards(client, other, other_collection_id)) == set(other_cards)
+
+def test_update_fields(client, users):
+    owner, other = users
+    collection_id = create_collection(client, owner)
+    cards = create_cards(client, owner, collection_id, 3)
+
+    response = batch(client, owner, ids=cards[:2], operation="update", fields={"back": "revisado"})
+    assert response.json()["data"] == {"affected": 2, "skipped": 0}
+    backs = {card_id: card["back"] for card_id, card in list_cards(client, owner, collection_id).items()}
+    assert backs == {cards[0]: "revisado", cards[1]: "revisado", cards[2]: "resposta 2"}
+
+    assert batch(client, other, ids=cards, operation="update", fields={"back": "x"}).json()["data"]["affected"] == 0
+    assert batch(client, owner, ids=cards, operation="update", fields={"front": None}).status_code == 422
+    assert batch(client, owner, ids=cards, operation="update", fields={"video_url": "https://x.com"}).status_code == 422
+    assert batch(client, owner, ids=cards, operation="update").status_code == 422
+
+def test_move(client, users):
+    owner, other = users
+    source_id = create_collection(client, owner)
+    target_id = create_collection(client, owner)
+    cards = create_cards(client, owner, source_id, 3)
+
+    response = batch(client, owner, ids=cards[:2], operation="move", target_collection_id=target_id)
+    assert response.json()["data"] == {"affected": 2, "skipped": 0}
+    assert set(list_cards(client, owner, source_id)) == {cards[2]}
+    assert set(list_cards(client, owner, target_id)) == set(cards[:2])
+
+    # Destino de outro usuário
+    other_target_id = create_collection(client, other)
+    response = batch(client, owner, ids=cards, operation="move", target_collection_id=other_target_id)
+    assert response.status_code == 404
+
+def test_move_respects_max_cards(client, users):
+    owner = users[0]
+    source_id = create_collection(client, owner)
+    target_id = create_collection(client, owner)
+    cards = create_cards(client, owner, source_id, 2)
+    records = [{"front": f"f{n}", "back": "b"} for n in range(99)]
+    assert client.post(
+        f"/flashcards/collections/{target_id}/import", json=records, headers=owner
+    ).json()["data"]["imported"] == 99
+
+    response = batch(client, owner, ids=cards, operation="move", target_collection_id=target_id)
+    assert response.status_code == 400
+    assert set(list_cards(client, owner, source_id)) == set(cards)
+
+def test_invalidates_public_cache(client, users):
+    owner, other = users
+    collection_id = create_collection(client, owner, is_public=True)
+    cards = create_cards(client, owner, collection_id, 2)
+    # Leitura de outro usuário preenche o cache da coleção pública
+    assert set(list_cards(client, other, collection_id)) == set(cards)
+
+    batch(client, owner, ids=cards[:1], operation="delete")
+    assert set(list_cards(client, other, collection_id)) == set(cards[1:])
+
+    target_id = create_collection(client, owner, is_public=True)
+    assert list_cards(client, other, target_id) == {}
+    batch(client, owner, ids=cards[1:], operation="move", target_collection_id=target_id)
+    assert list_cards(client, other, collection_id) == {}
+    assert set(list_cards(client, other, target_id)) == set(cards[1:])
+
+@pytest.mark.parametrize("operation, body, budget", [
+    ("delete", {}, 1),
+    ("update", {"fields": {"front": "nova"}}, 1),
+    ("move", {}, 4),
+])
+def test_statements_do_not_grow_with_ids(client, users, operation, body, budget):
+    owner = users[0]
+    source_id = create_collection(client, owner)
+    target_id = create_collection(client, owner)
+    cards = create_cards(client, owner, source_id, 20)
+    if operation == "move":
+        body = {"target_collection_id": target_id}
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith(("BEGIN", "COMMIT", "ROLLBACK")):
+            statements.append(statement)
+
+    # O usuário autenticado já está no cache do processo após create_cards
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = batch(client, owner, ids=cards, operation=operation, **body)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    assert response.json()["data"]["affected"] == 20
+    assert len(statements) <= budget, statements
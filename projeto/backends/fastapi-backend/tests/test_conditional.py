@@ -0,0 +1,27 @@
+"""ETag das listagens: exclusões também invalidam a versão que o cliente tem"""
+from email.utils import formatdate
+
+def test_delete_then_conditional_get(client, auth_headers):
+    collection_id = client.post(
+        "/collections/", json={"name": "condicional"}, headers=auth_headers
+    ).json()["data"]["collection"]["id"]
+    card_ids = [
+        client.post(
+            f"/flashcards/collections/{collection_id}", json={"front": f"f{n}", "back": "b"}, headers=auth_headers
+        ).json()["data"]["flashcard"]["id"]
+        for n in range(2)
+    ]
+    path = f"/flashcards/collections/{collection_id}"
+    first = client.get(path, headers=auth_headers)
+    etag = first.headers["ETag"]
+    assert "Last-Modified" not in first.headers
+    assert client.get(path, headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+
+    client.delete(f"/flashcards/{card_ids[-1]}", headers=auth_headers)
+
+    response = client.get(path, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    # If-Modified-Since sozinho não gera 304: a data não acompanha exclusões
+    since = {**auth_headers, "If-Modified-Since": formatdate(usegmt=True)}
+    assert client.get(path, headers=since).status_code == 200
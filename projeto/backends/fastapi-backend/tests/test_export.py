@@ -0,0 +1,60 @@
+"""Exportação NDJSON: um objeto JSON por linha, datas e UUIDs como texto, só coleções acessíveis"""
+import json
+import uuid
+from datetime import datetime
+from app.services import export_service
+from app.services.export_service import _json_default
+
+def login(client, email: str) -> dict:
+    client.post("/auth/register", json={"email": email, "password": "password123"})
+    token = client.post("/auth/login", json={"email": email, "password": "password123"}).json()["data"]["token"]
+    return {"Authorization": f"Bearer {token}"}
+
+def create_collection(client, headers, **fields) -> str:
+    return client.post("/collections/", json={"name": "exportação", **fields}, headers=headers).json()["data"]["collection"]["id"]
+
+def test_json_default():
+    id = uuid.uuid4()
+    assert _json_default(datetime(2026, 1, 2, 3, 4, 5, 6)) == "2026-01-02T03:04:05.000006"
+    assert _json_default(id) == str(id)
+
+def test_one_object_per_line(client, monkeypatch):
+    # Blocos de 2 linhas: o corte entre blocos não pode juntar nem partir objetos
+    monkeypatch.setattr(export_service, "EXPORT_CHUNK_SIZE", 2)
+    headers = login(client, "export@example.com")
+    collection_id = create_collection(client, headers)
+    created = [
+        client.post(
+            f"/flashcards/collections/{collection_id}",
+            json={"front": f"pergunta {n} \"com aspas\"\ne quebra", "back": "ação ☃"}, headers=headers
+        ).json()["data"]["flashcard"]
+        for n in range(5)
+    ]
+
+    response = client.get(f"/flashcards/collections/{collection_id}/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == f'attachment; filename="collection-{collection_id}.ndjson"'
+    assert response.text.endswith("\n")
+    assert "ação ☃" in response.text
+
+    lines = response.text.splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert [row["id"] for row in rows] == [card["id"] for card in created]
+    for row in rows:
+        assert set(row) == {"id", "front", "back", "video_url", "extra", "created_by_ia", "created_at", "updated_at"}
+        assert str(uuid.UUID(row["id"])) == row["id"]
+        datetime.fromisoformat(row["created_at"])
+        datetime.fromisoformat(row["updated_at"])
+        assert row["created_by_ia"] is False
+
+def test_inaccessible_collection(client):
+    owner = login(client, "export-owner@example.com")
+    other = login(client, "export-other@example.com")
+    private_id = create_collection(client, owner)
+    public_id = create_collection(client, owner, is_public=True)
+
+    assert client.get(f"/flashcards/collections/{private_id}/export", headers=other).status_code == 404
+    assert client.get(f"/flashcards/collections/{uuid.uuid4()}/export", headers=other).status_code == 404
+    assert client.get(f"/flashcards/collections/{private_id}/export").status_code == 401
+    assert client.get(f"/flashcards/collections/{public_id}/export", headers=other).status_code == 200
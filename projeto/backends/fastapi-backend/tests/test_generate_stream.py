@@ -0,0 +1,79 @@
+"""Geração por streaming (SSE): sequência de eventos e devolução da cota sem cartões"""
+import json
+import pytest
+from app.routers import flashcards as flashcards_router
+
+@pytest.fixture(scope="module")
+def stream_user(client):
+    client.post("/auth/register", json={"email": "stream@example.com", "password": "password123"})
+    token = client.post(
+        "/auth/login", json={"email": "stream@example.com", "password": "password123"}
+    ).json()["data"]["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    collection_id = client.post("/collections/", json={"name": "streaming"}, headers=headers).json()["data"]["collection"]["id"]
+    return headers, collection_id
+
+def fake_stream(cards, error=None):
+    async def stream(input_type, content):
+        for card in cards:
+            yield card
+        if error:
+            raise error
+    return stream
+
+def generate(client, stream_user) -> list[tuple[str, dict]]:
+    headers, collection_id = stream_user
+    response = client.post(
+        f"/flashcards/generate/stream?collection_id={collection_id}",
+        json={"input_type": "topic", "content": "fotossíntese"}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+def generated_today(client, stream_user) -> int:
+    return client.get("/flashcards/generation-logs", headers=stream_user[0]).json()["data"]["generated_today"]
+
+def test_cards_then_done(client, stream_user, monkeypatch):
+    cards = [{"front": "a", "back": "b"}, {"front": "c", "back": "d"}]
+    monkeypatch.setattr(flashcards_router, "stream_flashcards_with_ai", fake_stream(cards))
+    before = generated_today(client, stream_user)
+
+    events = generate(client, stream_user)
+    assert [event for event, _ in events] == ["card", "card", "done"]
+    assert [(data["front"], data["back"]) for _, data in events[:2]] == [("a", "b"), ("c", "d")]
+    assert events[-1][1] == {"count": 2}
+    assert generated_today(client, stream_user) == before + 1
+
+    listed = client.get(f"/flashcards/collections/{stream_user[1]}", headers=stream_user[0]).json()["data"]["flashcards"]
+    assert {card["id"] for card in listed} >= {data["id"] for _, data in events[:2]}
+
+def test_no_cards_releases_quota(client, stream_user, monkeypatch):
+    monkeypatch.setattr(flashcards_router, "stream_flashcards_with_ai", fake_stream([]))
+    before = generated_today(client, stream_user)
+
+    assert generate(client, stream_user) == [("done", {"count": 0})]
+    assert generated_today(client, stream_user) == before
+
+def test_failure_before_first_card_releases_quota(client, stream_user, monkeypatch):
+    monkeypatch.setattr(flashcards_router, "stream_flashcards_with_ai", fake_stream([], RuntimeError("openai")))
+    before = generated_today(client, stream_user)
+
+    assert generate(client, stream_user) == [
+        ("error", {"detail": "Erro ao gerar flashcards"}),
+        ("done", {"count": 0}),
+    ]
+    assert generated_today(client, stream_user) == before
+
+def test_failure_after_cards_keeps_quota(client, stream_user, monkeypatch):
+    monkeypatch.setattr(
+        flashcards_router, "stream_flashcards_with_ai", fake_stream([{"front": "a", "back": "b"}], RuntimeError("openai"))
+    )
+    before = generated_today(client, stream_user)
+
+    assert [event for event, _ in generate(client, stream_user)] == ["card", "error", "done"]
+    assert generated_today(client, stream_user) == before + 1
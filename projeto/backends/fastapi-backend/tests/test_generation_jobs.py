@@ -0,0 +1,121 @@
+"""Fila de jobs de geração: ciclo de vida, fila cheia, espera pelo resultado e devolução da cota"""
+import asyncio
+import threading
+import time
+import pytest
+from app.routers import flashcards as flashcards_router
+from app.services import generation_jobs
+from app.services.generation_jobs import GenerationJobQueue
+
+CONTENT = {"input_type": "topic", "content": "fotossíntese"}
+
+def login(client, email: str) -> dict:
+    client.post("/auth/register", json={"email": email, "password": "password123"})
+    token = client.post("/auth/login", json={"email": email, "password": "password123"}).json()["data"]["token"]
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture(scope="module")
+def jobs_user(client):
+    headers = login(client, "jobs@example.com")
+    collection_id = client.post("/collections/", json={"name": "jobs"}, headers=headers).json()["data"]["collection"]["id"]
+    return headers, collection_id
+
+@pytest.fixture
+def gate(monkeypatch):
+    """Geração falsa que só termina quando o teste libera o portão"""
+    gate = threading.Event()
+    result = {"cards": [{"front": "a", "back": "b"}], "error": None}
+
+    async def generate(input_type, content):
+        await asyncio.to_thread(gate.wait, 10)
+        if result["error"]:
+            raise result["error"]
+        return result["cards"]
+
+    monkeypatch.setattr(generation_jobs, "generate_flashcards_with_ai", generate)
+    gate.result = result
+    yield gate
+    gate.set()
+
+def enqueue(client, jobs_user):
+    headers, collection_id = jobs_user
+    return client.post(f"/flashcards/generate?collection_id={collection_id}", json=CONTENT, headers=headers)
+
+def get_job(client, headers, job_id: str, wait: float = 0):
+    return client.get(f"/flashcards/generate/jobs/{job_id}?wait={wait}", headers=headers)
+
+def generated_today(client, headers) -> int:
+    return client.get("/flashcards/generation-logs", headers=headers).json()["data"]["generated_today"]
+
+def wait_for_status(client, headers, job_id: str, status: str) -> dict:
+    for _ in range(100):
+        job = get_job(client, headers, job_id).json()["data"]
+        if job["status"] == status:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job não chegou a {status}: {job}")
+
+def test_job_succeeds(client, jobs_user, gate):
+    headers = jobs_user[0]
+    before = generated_today(client, headers)
+    response = enqueue(client, jobs_user)
+    assert response.status_code == 202
+    job = response.json()["data"]
+    assert job["status"] in ("queued", "running")
+
+    assert wait_for_status(client, headers, job["job_id"], "running")["flashcards"] == []
+    gate.set()
+    job = get_job(client, headers, job["job_id"], wait=10).json()["data"]
+    assert job["status"] == "succeeded"
+    assert [(card["front"], card["back"]) for card in job["flashcards"]] == [("a", "b")]
+    assert job["finished_at"] is not None
+    assert generated_today(client, headers) == before + 1
+
+@pytest.mark.parametrize("cards, error", [([], None), ([{"front": "a", "back": "b"}], RuntimeError("openai fora"))])
+def test_job_without_cards_releases_quota(client, jobs_user, gate, cards, error):
+    headers = jobs_user[0]
+    before = generated_today(client, headers)
+    gate.result.update(cards=cards, error=error)
+    gate.set()
+
+    job = enqueue(client, jobs_user).json()["data"]
+    job = get_job(client, headers, job["job_id"], wait=10).json()["data"]
+    assert job["status"] == ("failed" if error else "succeeded")
+    assert job["error"] == (str(error) if error else None)
+    assert job["flashcards"] == []
+    assert generated_today(client, headers) == before
+
+def test_wait_returns_when_job_finishes(client, jobs_user, gate):
+    headers = jobs_user[0]
+    job = enqueue(client, jobs_user).json()["data"]
+    threading.Timer(0.2, gate.set).start()
+
+    start = time.perf_counter()
+    job = get_job(client, headers, job["job_id"], wait=10).json()["data"]
+    assert job["status"] == "succeeded"
+    assert time.perf_counter() - start < 5
+
+def test_wait_times_out_while_running(client, jobs_user, gate):
+    headers = jobs_user[0]
+    job = enqueue(client, jobs_user).json()["data"]
+    assert get_job(client, headers, job["job_id"], wait=0.1).json()["data"]["status"] in ("queued", "running")
+
+def test_other_users_job_is_not_found(client, jobs_user, gate):
+    gate.set()
+    job = enqueue(client, jobs_user).json()["data"]
+    other = login(client, "jobs-other@example.com")
+    assert get_job(client, other, job["job_id"]).status_code == 404
+    assert get_job(client, jobs_user[0], "00000000-0000-0000-0000-000000000000").status_code == 404
+
+def test_full_queue_returns_503_and_releases_quota(client, jobs_user, monkeypatch):
+    headers = jobs_user[0]
+    # Sem workers: o primeiro job ocupa a única vaga da fila
+    queue = GenerationJobQueue(workers=0, max_queue_size=1, job_ttl_seconds=60)
+    asyncio.run(queue.start())
+    monkeypatch.setattr(flashcards_router, "generation_queue", queue)
+    before = generated_today(client, headers)
+
+    assert enqueue(client, jobs_user).status_code == 202
+    response = enqueue(client, jobs_user)
+    assert response.status_code == 503
+    assert generated_today(client, headers) == before + 1
@@ -0,0 +1,32 @@
+"""Importação em lotes: limite de cartões conferido por lote e erros reportados com teto"""
+from app.services.import_service import MAX_REPORTED_ERRORS
+
+def create_collection(client, headers) -> str:
+    response = client.post("/collections/", json={"name": "importação"}, headers=headers)
+    return response.json()["data"]["collection"]["id"]
+
+def import_ndjson(client, headers, collection_id, lines: list[str]):
+    return client.post(
+        f"/flashcards/collections/{collection_id}/import", content="\n".join(lines),
+        headers={**headers, "Content-Type": "application/x-ndjson"}
+    )
+
+def test_reported_errors_are_capped(client, auth_headers):
+    collection_id = create_collection(client, auth_headers)
+    lines = ['{"front": "a"}'] * (MAX_REPORTED_ERRORS + 150) + ['{"front": "a", "back": "b"}']
+
+    data = import_ndjson(client, auth_headers, collection_id, lines).json()["data"]
+    assert data["imported"] == 1
+    assert data["failed"] == MAX_REPORTED_ERRORS + 150
+    assert [error["row"] for error in data["errors"]] == list(range(1, MAX_REPORTED_ERRORS + 1))
+
+def test_max_cards_across_batches(client, auth_headers, monkeypatch):
+    from app.services import import_service
+    monkeypatch.setattr(import_service, "IMPORT_BATCH_SIZE", 40)
+    collection_id = create_collection(client, auth_headers)
+    lines = [f'{{"front": "f{n}", "back": "b"}}' for n in range(130)]
+
+    data = import_ndjson(client, auth_headers, collection_id, lines).json()["data"]
+    assert data["imported"] == 100
+    assert data["failed"] == 30
+    assert data["errors"][0] == {"row": 101, "error": "Limite de cartões da coleção atingido"}
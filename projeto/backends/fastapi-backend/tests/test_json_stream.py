@@ -0,0 +1,48 @@
+"""Parser incremental do array JSON da OpenAI: objetos completos, qualquer que seja o corte dos fragmentos"""
+import json
+import pytest
+from app.utils.json_stream import JSONArrayStreamParser
+
+CARDS = [
+    {"front": 'aspas "internas" e {chaves} [colchetes]', "back": "barra \\ invertida"},
+    {"front": "unicode é ☃", "back": "aninhado", "extra": {"tags": ["a", {"b": "]"}]}},
+    {"front": "fim", "back": "}"},
+]
+TEXT = "```json\n" + json.dumps(CARDS, indent=2) + "\n```"
+
+def feed_all(chunks) -> list:
+    parser = JSONArrayStreamParser()
+    return [item for chunk in chunks for item in parser.feed(chunk)]
+
+def test_single_chunk():
+    assert feed_all([TEXT]) == CARDS
+
+def test_every_split_point():
+    for position in range(len(TEXT) + 1):
+        assert feed_all([TEXT[:position], TEXT[position:]]) == CARDS, position
+
+def test_char_by_char_with_escapes():
+    # Escapes como vieram do modelo (\", \\, \u....), cortados no meio
+    text = r'[{"front": "a \"b\" \\", "back": "\u00e9\""}]'
+    assert feed_all(text) == [{"front": 'a "b" \\', "back": 'é"'}]
+
+def test_items_are_emitted_as_soon_as_complete():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[{"front": "a", "back": "b"}, {"front": "c"') == [{"front": "a", "back": "b"}]
+    assert parser.feed(', "back": "d"}') == [{"front": "c", "back": "d"}]
+    assert parser.feed("]") == []
+
+def test_text_after_closing_bracket_is_ignored():
+    assert feed_all(['[{"front": "a", "back": "b"}]', '\nExemplo: {"front": "x", "back": "y"}']) == [
+        {"front": "a", "back": "b"}
+    ]
+
+@pytest.mark.parametrize("text, expected", [
+    ("sem array nenhum", []),
+    ('{"front": "a", "back": "b"}', []),
+    ('[{"front": "a" "back": "b"}, {"front": "c", "back": "d"}]', [{"front": "c", "back": "d"}]),
+    ('[{"front": "a", "back": "b"}, {"front": "cortado', [{"front": "a", "back": "b"}]),
+    ('[1, "x", {"front": "a", "back": "b"}]', [{"front": "a", "back": "b"}]),
+])
+def test_malformed_input(text, expected):
+    assert feed_all([text]) == expected
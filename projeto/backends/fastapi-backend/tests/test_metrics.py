@@ -0,0 +1,71 @@
+"""/metrics no formato de texto do Prometheus"""
+import asyncio
+import re
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from app import database
+from app.services import ai_service
+from app.utils.metrics import Histogram
+
+# Valores de rótulo entre aspas podem conter chaves (rotas como /collections/{collection_id})
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_]\w*="(\\.|[^"\\])*",?)*\})? \S+$')
+
+def scrape(client) -> dict:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in response.text.splitlines():
+        if line.startswith("#"):
+            continue
+        assert SAMPLE.match(line), line
+        name, value = line.rsplit(" ", 1)
+        samples[name] = float(value)
+    return samples
+
+def test_route_latency_histogram(client, auth_headers):
+    for _ in range(2):
+        client.get("/collections/", headers=auth_headers)
+    samples = scrape(client)
+    labels = 'method="GET",route="/collections/",status="200"'
+    assert samples[f"http_request_duration_seconds_count{{{labels}}}"] >= 2
+    assert samples[f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'] == samples[f"http_request_duration_seconds_count{{{labels}}}"]
+    assert samples['http_requests_in_progress{method="GET"}'] == 1  # o próprio scrape
+    assert samples['db_pool_size{engine="primary"}'] >= 1
+    assert not any('engine="replica"' in name for name in samples)
+    assert 'cache_hit_ratio{cache="principal"}' in samples
+
+def test_ai_generation_failures(client, monkeypatch):
+    def failing_client():
+        raise RuntimeError("OpenAI indisponível")
+    monkeypatch.setattr(ai_service, "get_client", failing_client)
+    before = scrape(client).get('ai_generation_failures_total{mode="request"}', 0)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(ai_service.request_flashcards_from_openai("topic", "tema"))
+
+    samples = scrape(client)
+    assert samples['ai_generation_failures_total{mode="request"}'] == before + 1
+    assert samples['ai_generation_duration_seconds_count{mode="request"}'] >= 1
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "teste", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe("/x", value=value)
+    assert list(histogram.samples()) == [
+        'latency_seconds_bucket{route="/x",le="0.1"} 2',
+        'latency_seconds_bucket{route="/x",le="1.0"} 3',
+        'latency_seconds_bucket{route="/x",le="+Inf"} 4',
+        'latency_seconds_sum{route="/x"} 2.65',
+        'latency_seconds_count{route="/x"} 4',
+    ]
+
+def test_replica_pool_gauges(client, migrated_database, monkeypatch):
+    import main
+    replica_engine = create_async_engine(database.get_async_database_url(migrated_database), pool_size=3)
+    monkeypatch.setattr(main, "read_engine", replica_engine)
+
+    samples = scrape(client)
+    assert samples['db_pool_size{engine="replica"}'] == 3
+    assert samples['db_pool_connections{engine="replica",state="checked_out"}'] == 0
+    assert samples['db_pool_size{engine="primary"}'] >= 1
@@ -0,0 +1,74 @@
+"""Paginação keyset: desempate por id, sem repetições nem lacunas, e cursor inválido como 400"""
+import asyncio
+import base64
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app import database
+from app.models import Flashcard
+from app.utils.pagination import decode_cursor, encode_cursor
+
+def insert_cards(database_url: str, collection_id: str, created_at: list[datetime]) -> None:
+    # Sem pool: nenhuma conexão fica presa a este event loop
+    engine = create_async_engine(database.get_async_database_url(database_url), poolclass=NullPool)
+
+    async def run():
+        async with async_sessionmaker(bind=engine, class_=AsyncSession)() as db:
+            db.add_all([
+                Flashcard(collection_id=uuid.UUID(collection_id), front=f"f{n}", back="b", created_at=when)
+                for n, when in enumerate(created_at)
+            ])
+            await db.commit()
+        await engine.dispose()
+
+    asyncio.run(run())
+
+@pytest.fixture(scope="module")
+def collection_id(client, auth_headers) -> str:
+    return client.post("/collections/", json={"name": "paginação"}, headers=auth_headers).json()["data"]["collection"]["id"]
+
+def test_pages_through_equal_timestamps(client, auth_headers, migrated_database, collection_id):
+    now = datetime(2026, 1, 1, 12, 0)
+    # Dez cartões no mesmo instante entre dois outros: as páginas cortam no meio do empate
+    insert_cards(migrated_database, collection_id, [now + timedelta(seconds=1)] + [now] * 10 + [now - timedelta(seconds=1)])
+
+    ids, cursor, pages = [], None, 0
+    while True:
+        path = f"/flashcards/collections/{collection_id}?limit=5" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(path, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        data = response.json()["data"]
+        ids += [card["id"] for card in data["flashcards"]]
+        cursor, pages = data["next_cursor"], pages + 1
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert len(ids) == len(set(ids)) == 12
+    tied = ids[1:11]
+    assert tied == sorted(tied, key=uuid.UUID, reverse=True)
+
+def test_cursor_round_trip():
+    created_at, id = datetime(2026, 1, 1, 12, 0, 0, 123456), uuid.uuid4()
+    assert decode_cursor(encode_cursor(created_at, id)) == (created_at, id)
+
+def b64(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode()
+
+@pytest.mark.parametrize("cursor", [
+    "lixo!",
+    "é",
+    b64('"x"'),
+    b64("{}"),
+    b64("[1, 2]"),
+    b64('["ontem", "00000000-0000-0000-0000-000000000000"]'),
+    b64('["2026-01-01T00:00:00", "não-é-uuid"]'),
+    b64('["2026-01-01T00:00:00", "00000000-0000-0000-0000-000000000000", 3]'),
+])
+def test_malformed_cursor_is_400(client, auth_headers, collection_id, cursor):
+    for path in ("/collections/", f"/flashcards/collections/{collection_id}"):
+        response = client.get(path, params={"cursor": cursor}, headers=auth_headers)
+        assert response.status_code == 400, (path, response.text)
+        assert response.json()["detail"] == "Cursor inválido"
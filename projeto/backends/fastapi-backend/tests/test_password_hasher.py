@@ -0,0 +1,78 @@
+"""bcrypt no pool de processos: ida e volta, recusa com 503 quando saturado e rehash no login"""
+import asyncio
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from app import database
+from app.config import settings
+from app.models import User
+from app.security import hash_password, password_needs_rehash
+from app.services.password_hasher import PasswordHasherPool, password_hasher
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    pool = PasswordHasherPool(workers=1, max_pending=1)
+    yield pool
+    pool.shutdown()
+
+def test_hash_and_verify_round_trip(pool):
+    async def run():
+        hashed = await pool.hash("senha correta")
+        return hashed, await pool.verify("senha correta", hashed), await pool.verify("outra senha", hashed)
+
+    hashed, valid, invalid = asyncio.run(run())
+    assert hashed.startswith("$2b$04$")
+    assert (valid, invalid) == (True, False)
+    assert pool.stats()["pending"] == 0
+
+def test_saturated_pool_rejects(pool):
+    async def run():
+        return await asyncio.gather(pool.hash("a"), pool.hash("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    rejected = [result for result in results if isinstance(result, HTTPException)]
+    assert len(rejected) == 1
+    assert rejected[0].status_code == 503
+    assert rejected[0].headers == {"Retry-After": "1"}
+    assert pool.stats() == {"workers": 1, "pending": 0, "max_pending": 1, "rejected": 1}
+
+def test_login_returns_503_when_saturated(client, monkeypatch):
+    client.post("/auth/register", json={"email": "hasher-busy@example.com", "password": "password123"})
+    rejected = password_hasher.rejected
+    monkeypatch.setattr(password_hasher, "pending", password_hasher.max_pending)
+
+    response = client.post("/auth/login", json={"email": "hasher-busy@example.com", "password": "password123"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert password_hasher.rejected == rejected + 1
+    assert f"password_hasher_rejected_total {rejected + 1}" in client.get("/metrics").text
+
+def stored_hash(database_url: str, email: str, new_hash: str = None) -> str:
+    # Sem pool: nenhuma conexão fica presa a este event loop
+    engine = create_async_engine(database.get_async_database_url(database_url), poolclass=NullPool)
+
+    async def run():
+        async with engine.begin() as conn:
+            if new_hash:
+                await conn.execute(update(User).where(User.email == email).values(password_hash=new_hash))
+            password_hash = await conn.scalar(select(User.password_hash).where(User.email == email))
+        await engine.dispose()
+        return password_hash
+
+    return asyncio.run(run())
+
+def test_login_rehashes_lower_cost_hash(client, migrated_database):
+    email = "hasher-rehash@example.com"
+    client.post("/auth/register", json={"email": email, "password": "password123"})
+    old_hash = stored_hash(migrated_database, email, hash_password("password123", rounds=4))
+    assert password_needs_rehash(old_hash)
+
+    assert client.post("/auth/login", json={"email": email, "password": "password123"}).status_code == 200
+    new_hash = stored_hash(migrated_database, email)
+    assert new_hash.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert not password_needs_rehash(new_hash)
+    assert client.post("/auth/login", json={"email": email, "password": "password123"}).status_code == 200
+    assert client.post("/auth/login", json={"email": email, "password": "errada123"}).status_code == 401
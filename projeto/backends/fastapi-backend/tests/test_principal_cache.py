@@ -0,0 +1,40 @@
+"""Cache de usuários autenticados: uma consulta a menos por requisição, invalidado ao mudar o plano"""
+import uuid
+from sqlalchemy import event
+from app.database import engine
+from app.routers.auth import principal_cache
+
+def user_queries(client, method: str, path: str, headers: dict):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client.request(method, path, headers=headers)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 200, response.text
+    return response.json()["data"], len(statements)
+
+def test_cached_principal_and_upgrade(client):
+    client.post("/auth/register", json={"email": "principal@example.com", "password": "password123"})
+    token = client.post(
+        "/auth/login", json={"email": "principal@example.com", "password": "password123"}
+    ).json()["data"]["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    data, queries = user_queries(client, "GET", "/auth/me", headers)
+    assert (data["user"]["plan"], queries) == ("free", 1)
+    data, queries = user_queries(client, "GET", "/auth/me", headers)
+    assert (data["user"]["plan"], queries) == ("free", 0)
+
+    user_queries(client, "POST", "/subscriptions/upgrade", headers)
+    assert principal_cache.get(uuid.UUID(data["user"]["id"])) is None
+    # O próximo request relê o usuário e já enxerga o plano novo
+    data, queries = user_queries(client, "GET", "/subscriptions/status", headers)
+    assert (data["plan"], queries) == ("pro", 1)
+    data, queries = user_queries(client, "GET", "/auth/me", headers)
+    assert (data["user"]["plan"], queries) == ("pro", 0)
@@ -0,0 +1,36 @@
+"""Cache de coleções públicas: entradas invalidadas nunca voltam a ser lidas"""
+import uuid
+from app.database import AsyncSessionLocal
+from app.models import Flashcard
+from app.routers import flashcards as flashcards_router
+from app.services.public_cache import PublicCollectionCache
+
+def test_set_after_invalidation_uses_old_version():
+    cache = PublicCollectionCache(maxsize=10, ttl=60)
+    collection_id = uuid.uuid4()
+    key = cache.key(collection_id, "page")
+    cache.invalidate(collection_id)
+    cache.set(key, "antigo")
+    assert cache.get(cache.key(collection_id, "page")) is None
+
+def test_write_between_query_and_set(client, auth_headers, monkeypatch):
+    collection_id = client.post(
+        "/collections/", json={"name": "pública", "is_public": True}, headers=auth_headers
+    ).json()["data"]["collection"]["id"]
+    client.post(f"/flashcards/collections/{collection_id}", json={"front": "a", "back": "b"}, headers=auth_headers)
+    paginate = flashcards_router.paginate
+
+    async def paginate_then_write(*args, **kwargs):
+        page = await paginate(*args, **kwargs)
+        # Escrita concluída depois da consulta e antes do public_cache.set
+        async with AsyncSessionLocal() as db:
+            db.add(Flashcard(collection_id=uuid.UUID(collection_id), front="nova", back="b"))
+            await db.commit()
+        return page
+
+    path = f"/flashcards/collections/{collection_id}"
+    monkeypatch.setattr(flashcards_router, "paginate", paginate_then_write)
+    assert len(client.get(path, headers=auth_headers).json()["data"]["flashcards"]) == 1
+    monkeypatch.setattr(flashcards_router, "paginate", paginate)
+
+    assert len(client.get(path, headers=auth_headers).json()["data"]["flashcards"]) == 2
@@ -0,0 +1,86 @@
+"""Orçamento de consultas por endpoint: o número de consultas não pode crescer com o número de linhas (N+1)"""
+import itertools
+import pytest
+from sqlalchemy import event
+from app.database import engine
+
+counter = itertools.count()
+
+@pytest.fixture(scope="module")
+def budget_user(client):
+    """Usuário próprio, para que as linhas criadas aqui não afetem os outros testes"""
+    headers = {}
+    for email in ("budget@example.com", "budget-owner@example.com"):
+        client.post("/auth/register", json={"email": email, "password": "password123"})
+        token = client.post("/auth/login", json={"email": email, "password": "password123"}).json()["data"]["token"]
+        headers[email] = {"Authorization": f"Bearer {token}"}
+    client.post("/subscriptions/upgrade", headers=headers["budget@example.com"])
+    collection_id = client.post(
+        "/collections/", json={"name": "budget"}, headers=headers["budget@example.com"]
+    ).json()["data"]["collection"]["id"]
+    return headers["budget@example.com"], headers["budget-owner@example.com"], collection_id
+
+def add_rows(client, budget_user, count: int) -> None:
+    """Mais coleções, cartões, revisões e compartilhamentos para o usuário do teste"""
+    headers, owner_headers, collection_id = budget_user
+    for _ in range(count):
+        n = next(counter)
+        client.post("/collections/", json={"name": f"extra {n}"}, headers=headers)
+        card_id = client.post(
+            f"/flashcards/collections/{collection_id}",
+            json={"front": f"pergunta {n}", "back": f"resposta {n}"}, headers=headers
+        ).json()["data"]["flashcard"]["id"]
+        assert client.post(f"/reviews/{card_id}", json={"quality": 4}, headers=headers).status_code == 200
+        client.post(
+            f"/flashcards/collections/{collection_id}",
+            json={"front": f"nova {n}", "back": f"resposta {n}"}, headers=headers
+        )
+        shared_id = client.post(
+            "/collections/", json={"name": f"compartilhada {n}"}, headers=owner_headers
+        ).json()["data"]["collection"]["id"]
+        response = client.post(f"/shares/?collection_id={shared_id}&user_email=budget@example.com", headers=owner_headers)
+        assert response.status_code == 200, response.text
+
+def count_queries(client, method: str, path: str, headers: dict, **kwargs) -> int:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client.request(method, path, headers=headers, **kwargs)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    assert response.status_code < 400, response.text
+    return len(statements)
+
+def assert_query_budget(client, budget_user, method: str, path: str, budget: int, **kwargs) -> None:
+    headers = budget_user[0]
+    # A primeira requisição preenche os caches do processo (usuário autenticado)
+    count_queries(client, method, path, headers, **kwargs)
+    small = count_queries(client, method, path, headers, **kwargs)
+    add_rows(client, budget_user, 5)
+    large = count_queries(client, method, path, headers, **kwargs)
+    assert small == large, f"{method} {path}: {small} consultas antes, {large} com mais 5 linhas por tabela"
+    assert large <= budget, f"{method} {path}: {large} consultas (orçamento {budget})"
+
+@pytest.mark.parametrize("path, budget", [
+    ("/collections/?limit=100", 2),
+    ("/collections/{collection_id}", 1),
+    ("/flashcards/collections/{collection_id}?limit=100", 3),
+    ("/flashcards/search?q=pergunta&limit=100", 1),
+    ("/flashcards/generation-logs", 1),
+    ("/reviews/due?limit=100", 2),
+    ("/subscriptions/status", 0),
+])
+def test_read_endpoints(client, budget_user, path, budget):
+    add_rows(client, budget_user, 2)
+    assert_query_budget(client, budget_user, "GET", path.format(collection_id=budget_user[2]), budget)
+
+def test_create_flashcard(client, budget_user):
+    add_rows(client, budget_user, 2)
+    assert_query_budget(
+        client, budget_user, "POST", f"/flashcards/collections/{budget_user[2]}", 3,
+        json={"front": "pergunta do orçamento", "back": "resposta"}
+    )
@@ -0,0 +1,86 @@
+"""As consultas dos endpoints mais usados devem ser resolvidas por índices"""
+import re
+import pytest
+from sqlalchemy import create_engine, event
+from app.database import engine
+
+@pytest.fixture(scope="module")
+def explain_engine(migrated_database):
+    # Engine síncrono no mesmo banco: mesmo paramstyle dos drivers async (qmark/format)
+    sync_engine = create_engine(migrated_database)
+    yield sync_engine
+    sync_engine.dispose()
+
+@pytest.fixture(scope="module")
+def collection_id(client, auth_headers):
+    collection_id = client.post(
+        "/collections/", json={"name": "plans", "is_public": False}, headers=auth_headers
+    ).json()["data"]["collection"]["id"]
+    for i in range(20):
+        client.post(
+            f"/flashcards/collections/{collection_id}",
+            json={"front": f"pergunta {i}", "back": f"resposta {i}"},
+            headers=auth_headers
+        )
+    return collection_id
+
+def capture_selects(client, path, headers):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client.get(path, headers=headers)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 200, response.text
+    return response, statements
+
+def query_plan(explain_engine, statement, parameters) -> list[str]:
+    with explain_engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            # Sem seq scan o planner só o usa quando não há índice utilizável
+            conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            return [row[0] for row in conn.exec_driver_sql("EXPLAIN " + statement, parameters)]
+        return [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+
+def full_scans(plan: list[str]) -> list[str]:
+    # Postgres: Seq Scan; SQLite: "SCAN tabela" sem "USING ... INDEX"
+    return [line for line in plan if "Seq Scan" in line or re.fullmatch(r"SCAN \w+", line.strip())]
+
+def assert_indexed(client, explain_engine, path, headers, ordered=False):
+    response, statements = capture_selects(client, path, headers)
+    assert statements, f"{path} não executou consultas"
+    for statement, parameters in statements:
+        plan = query_plan(explain_engine, statement, parameters)
+        detail = f"{path}: {statement}\n" + "\n".join(plan)
+        assert full_scans(plan) == [], detail
+        if ordered:
+            # A ordenação da paginação keyset deve vir do índice, sem sort em memória
+            assert not any("TEMP B-TREE" in line for line in plan), detail
+    return response
+
+def test_list_collections(client, explain_engine, auth_headers, collection_id):
+    assert_indexed(client, explain_engine, "/collections/?limit=5", auth_headers, ordered=True)
+
+def test_list_flashcards(client, explain_engine, auth_headers, collection_id):
+    response = assert_indexed(
+        client, explain_engine, f"/flashcards/collections/{collection_id}?limit=5", auth_headers, ordered=True
+    )
+    cursor = response.json()["data"]["next_cursor"]
+    assert_indexed(
+        client, explain_engine, f"/flashcards/collections/{collection_id}?limit=5&cursor={cursor}",
+        auth_headers, ordered=True
+    )
+
+def test_search_flashcards(client, explain_engine, auth_headers, collection_id):
+    assert_indexed(client, explain_engine, "/flashcards/search?q=pergunta", auth_headers)
+
+def test_generation_logs(client, explain_engine, auth_headers):
+    assert_indexed(client, explain_engine, "/flashcards/generation-logs", auth_headers)
+
+def test_due_reviews(client, explain_engine, auth_headers, collection_id):
+    assert_indexed(client, explain_engine, "/reviews/due?limit=10", auth_headers)
@@ -0,0 +1,58 @@
+"""Cota diária: um UPSERT por reserva, sem passar do limite mesmo com reservas simultâneas"""
+import asyncio
+import uuid
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app import database
+from app.models import GenerationLog, User
+from app.services.quota import add_generations
+
+@pytest.fixture
+def sessions(migrated_database):
+    # Sem pool: nenhuma conexão fica presa ao event loop de cada teste
+    engine = create_async_engine(database.get_async_database_url(migrated_database), poolclass=NullPool)
+    yield async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+async def create_user(sessions) -> uuid.UUID:
+    async with sessions() as db:
+        user = User(email=f"quota-{uuid.uuid4()}@example.com", password_hash="x")
+        db.add(user)
+        await db.commit()
+        return user.id
+
+async def stored_count(sessions, user_id: uuid.UUID):
+    async with sessions() as db:
+        return await db.scalar(select(GenerationLog.count).where(GenerationLog.user_id == user_id))
+
+def test_insert_increment_and_refusal(sessions):
+    async def run():
+        user_id = await create_user(sessions)
+        async with sessions() as db:
+            first = await add_generations(db, user_id, 1, limit=3)
+            second = await add_generations(db, user_id, 2, limit=3)
+            # O WHERE do UPSERT não casa: nenhuma linha retornada, contador intacto
+            refused = await add_generations(db, user_id, 1, limit=3)
+            too_many = await add_generations(db, user_id, 4, limit=3)
+            unlimited = await add_generations(db, user_id, 5)
+        return first, second, refused, too_many, unlimited, await stored_count(sessions, user_id)
+
+    assert asyncio.run(run()) == (1, 3, None, None, 8, 8)
+
+def test_concurrent_reservations_respect_limit(sessions):
+    async def reserve(user_id):
+        async with sessions() as db:
+            return await add_generations(db, user_id, 1, limit=5)
+
+    async def run():
+        user_id = await create_user(sessions)
+        results = await asyncio.gather(*(reserve(user_id) for _ in range(12)))
+        return results, await stored_count(sessions, user_id)
+
+    results, count = asyncio.run(run())
+    accepted = sorted(result for result in results if result is not None)
+    assert accepted == [1, 2, 3, 4, 5]
+    assert results.count(None) == 7
+    assert count == 5
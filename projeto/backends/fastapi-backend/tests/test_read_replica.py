@@ -0,0 +1,75 @@
+"""Leituras na réplica, com read-your-writes para quem acabou de escrever"""
+import asyncio
+import os
+import shutil
+import pytest
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app import database
+
+@pytest.fixture
+def replica(client, auth_headers, migrated_database, monkeypatch, tmp_path):
+    """Réplica parada no tempo: cópia do arquivo SQLite do primário, sem replicação"""
+    url = make_url(migrated_database)
+    if url.get_backend_name() != "sqlite":
+        pytest.skip("a réplica simulada copia o arquivo do SQLite")
+    replica_path = os.path.join(tmp_path, "replica.db")
+    shutil.copyfile(url.database, replica_path)
+    # Sem pool: nenhuma conexão sobra presa ao event loop do TestClient
+    replica_engine = create_async_engine(
+        database.get_async_database_url(f"sqlite:///{replica_path}"), poolclass=NullPool
+    )
+
+    monkeypatch.setattr(database, "replica_enabled", True)
+    monkeypatch.setattr(database, "AsyncReadSessionLocal", async_sessionmaker(
+        bind=replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    ))
+    database.recent_writers.clear()
+    yield
+    database.recent_writers.clear()
+
+def collection_names(client, headers) -> set:
+    response = client.get("/collections/?limit=100", headers=headers)
+    assert response.status_code == 200
+    return {c["name"] for c in response.json()["data"]["collections"]}
+
+def test_reads_go_to_replica(client, auth_headers, replica):
+    before = collection_names(client, auth_headers)
+    client.post("/collections/", json={"name": "só no primário"}, headers=auth_headers)
+    # Janela de read-your-writes expirada
+    database.recent_writers.clear()
+
+    assert collection_names(client, auth_headers) == before
+
+def test_read_your_writes(client, auth_headers, replica):
+    created = client.post("/collections/", json={"name": "acabei de criar"}, headers=auth_headers)
+    assert created.status_code == 200
+
+    # Dentro da janela, o mesmo cliente lê do primário
+    assert "acabei de criar" in collection_names(client, auth_headers)
+    collection_id = created.json()["data"]["collection"]["id"]
+    assert client.get(f"/collections/{collection_id}", headers=auth_headers).status_code == 200
+
+    # Fora da janela (ou outro worker), a leitura volta para a réplica
+    database.recent_writers.clear()
+    assert "acabei de criar" not in collection_names(client, auth_headers)
+    assert client.get(f"/collections/{collection_id}", headers=auth_headers).status_code == 404
+
+def test_mark_is_set_before_response_and_hashed(replica):
+    authorization = "Bearer segredo"
+    marked_at_start = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            marked_at_start.append(database.recent_writers.get(database.writer_key(authorization)))
+
+    scope = {"type": "http", "method": "POST", "headers": [(b"authorization", authorization.encode())]}
+    asyncio.run(database.ReadYourWritesMiddleware(app)(scope, None, send))
+
+    assert marked_at_start == [True]
+    assert database.recent_writers.get(authorization) is None
@@ -0,0 +1,75 @@
+"""Fila de revisão e configurações do agendador"""
+import asyncio
+import uuid
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from app import database
+from app.models import CardReview
+
+def login(client, email: str) -> dict:
+    client.post("/auth/register", json={"email": email, "password": "password123"})
+    token = client.post("/auth/login", json={"email": email, "password": "password123"}).json()["data"]["token"]
+    return {"Authorization": f"Bearer {token}"}
+
+def test_shared_cards_are_due_as_new(client):
+    owner = login(client, "reviews-owner@example.com")
+    reader = login(client, "reviews-reader@example.com")
+    collection_id = client.post("/collections/", json={"name": "compartilhada"}, headers=owner).json()["data"]["collection"]["id"]
+    card_id = client.post(
+        f"/flashcards/collections/{collection_id}", json={"front": "f", "back": "b"}, headers=owner
+    ).json()["data"]["flashcard"]["id"]
+
+    def due() -> list:
+        return [card["flashcard"]["id"] for card in client.get("/reviews/due", headers=reader).json()["data"]["cards"]]
+
+    assert card_id not in due()
+
+    response = client.post(f"/shares/?collection_id={collection_id}&user_email=reviews-reader@example.com", headers=owner)
+    assert response.status_code == 200, response.text
+    assert card_id in due()
+
+    assert client.post(f"/reviews/{card_id}", json={"quality": 4}, headers=reader).status_code == 200
+    assert card_id not in due()
+
+def stored_intervals(database_url: str, card_ids: list[str]) -> dict:
+    # Sem pool: nenhuma conexão fica presa a este event loop
+    engine = create_async_engine(database.get_async_database_url(database_url), poolclass=NullPool)
+
+    async def run():
+        async with engine.connect() as conn:
+            rows = (await conn.execute(
+                select(CardReview.flashcard_id, CardReview.interval_days)
+                .where(CardReview.flashcard_id.in_([uuid.UUID(card_id) for card_id in card_ids]))
+            )).all()
+        await engine.dispose()
+        return {str(card_id): interval for card_id, interval in rows}
+
+    return asyncio.run(run())
+
+def test_settings_rescale_graduated_cards_only(client, migrated_database):
+    headers = login(client, "reviews-settings@example.com")
+    collection_id = client.post("/collections/", json={"name": "agendador"}, headers=headers).json()["data"]["collection"]["id"]
+    learning, graduated = [
+        client.post(
+            f"/flashcards/collections/{collection_id}", json={"front": f"f{n}", "back": "b"}, headers=headers
+        ).json()["data"]["flashcard"]["id"]
+        for n in range(2)
+    ]
+    for card_id, reviews in ((learning, 2), (graduated, 3)):
+        for _ in range(reviews):
+            assert client.post(f"/reviews/{card_id}", json={"quality": 5}, headers=headers).status_code == 200
+    assert stored_intervals(migrated_database, [learning, graduated]) == pytest.approx({learning: 6.0, graduated: 16.2})
+
+    response = client.put("/reviews/settings", json={"interval_modifier": 2.0, "maximum_interval_days": 365}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["data"] == {"interval_modifier": 2.0, "maximum_interval_days": 365, "rescheduled": 2}
+    # O passo fixo de 6 dias fica como está; só o intervalo calculado é reescalado
+    assert stored_intervals(migrated_database, [learning, graduated]) == pytest.approx({learning: 6.0, graduated: 32.4})
+
+    client.put("/reviews/settings", json={"interval_modifier": 1.0, "maximum_interval_days": 5}, headers=headers)
+    assert stored_intervals(migrated_database, [learning, graduated]) == pytest.approx({learning: 5.0, graduated: 5.0})
+
+    response = client.put("/reviews/settings", json={"interval_modifier": 0, "maximum_interval_days": 5}, headers=headers)
+    assert response.status_code == 422
@@ -0,0 +1,46 @@
+"""Agendador SM-2: lapsos, progressão dos intervalos e limites"""
+from datetime import datetime, timedelta
+import pytest
+from app.services.scheduler import MIN_EASE_FACTOR, ReviewState, reschedule_intervals, sm2_review
+
+def test_lapse_resets_repetitions():
+    state = sm2_review(ReviewState(ease_factor=2.5, interval_days=40.0, repetitions=5, lapses=1), quality=2)
+    assert state.interval_days == 1.0
+    assert state.repetitions == 0
+    assert state.lapses == 2
+    assert state.ease_factor == pytest.approx(2.18)
+
+    # Depois do lapso o cartão volta aos passos fixos
+    assert sm2_review(state, quality=4).interval_days == 1.0
+
+def test_interval_progression():
+    state = ReviewState()
+    intervals = []
+    for _ in range(4):
+        state = sm2_review(state, quality=5)
+        intervals.append(state.interval_days)
+    # 1 → 6 → intervalo anterior × fator anterior (2.7, depois 2.8)
+    assert intervals == pytest.approx([1.0, 6.0, 16.2, 45.36])
+    assert state.ease_factor == pytest.approx(2.9)
+
+def test_ease_factor_floor():
+    state = sm2_review(ReviewState(ease_factor=1.35, interval_days=10.0, repetitions=3), quality=3)
+    assert state.ease_factor == MIN_EASE_FACTOR
+    assert state.interval_days == pytest.approx(13.5)
+    assert sm2_review(ReviewState(ease_factor=MIN_EASE_FACTOR), quality=0).ease_factor == MIN_EASE_FACTOR
+
+def test_interval_is_clamped_to_maximum():
+    state = ReviewState(ease_factor=2.5, interval_days=300.0, repetitions=6)
+    assert sm2_review(state, quality=5, maximum_interval_days=365).interval_days == 365.0
+    assert sm2_review(state, quality=5, interval_modifier=0.1, maximum_interval_days=365).interval_days == pytest.approx(75.0)
+    # Também os passos fixos respeitam um máximo menor
+    assert sm2_review(ReviewState(repetitions=1), quality=5, maximum_interval_days=3).interval_days == 3.0
+
+def test_reschedule_skips_learning_steps():
+    reviewed = datetime(2026, 1, 1, 12, 0)
+    intervals, due = reschedule_intervals([reviewed] * 4, [1.0, 6.0, 10.0, 200.0], [1, 2, 3, 8], 2.0, 365)
+    assert list(intervals) == [1.0, 6.0, 20.0, 365.0]
+    assert list(due) == [reviewed + timedelta(days=days) for days in (1, 6, 20, 365)]
+
+    intervals, _ = reschedule_intervals([reviewed] * 2, [6.0, 10.0], [2, 3], 0.5, 4)
+    assert list(intervals) == [4.0, 4.0]
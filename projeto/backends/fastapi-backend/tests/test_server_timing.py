@@ -0,0 +1,57 @@
+"""Server-Timing: consultas, tempo de banco, serialização e chamadas externas por requisição"""
+import asyncio
+import re
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.database import engine
+from app.utils.timing import RequestTimings, ServerTimingMiddleware, current_timings, instrument_engine
+
+def parse_server_timing(header: str) -> dict:
+    metrics = {}
+    for entry in header.split(","):
+        name, *params = [part.strip() for part in entry.split(";")]
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+def test_server_timing_header(client, auth_headers):
+    # O app de testes roda com a medição desligada; aqui ela é ligada só neste cliente
+    from main import app
+    instrument_engine(engine)
+    timed = TestClient(ServerTimingMiddleware(app))
+
+    response = timed.get("/collections/", headers=auth_headers)
+    assert response.status_code == 200
+    metrics = parse_server_timing(response.headers["server-timing"])
+    assert int(re.match(r'"(\d+) queries"', metrics["db"]["desc"]).group(1)) >= 1
+    assert float(metrics["db"]["dur"]) > 0
+    assert "dur" in metrics["serialize"]
+    assert float(metrics["total"]["dur"]) >= float(metrics["db"]["dur"])
+
+    response = timed.post("/auth/login", json={"email": "tests@example.com", "password": "password123"})
+    assert float(parse_server_timing(response.headers["server-timing"])["bcrypt"]["dur"]) > 0
+
+def test_disabled_by_default(client):
+    assert "server-timing" not in client.get("/health").headers
+
+def test_failed_statement_is_timed():
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        instrument_engine(engine)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            async with engine.connect() as conn:
+                with pytest.raises(OperationalError):
+                    await conn.execute(text("SELECT * FROM tabela_inexistente"))
+                await conn.execute(text("SELECT 1"))
+        finally:
+            current_timings.reset(token)
+            await engine.dispose()
+        return timings
+
+    timings = asyncio.run(run())
+    assert timings.db_queries == 2
+    assert timings.db_ms >= 0
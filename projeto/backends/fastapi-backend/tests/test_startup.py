@@ -0,0 +1,67 @@
+"""Boot do worker: importar a aplicação e iniciar o lifespan não deve ter efeitos colaterais
+
+Os tempos de import/boot ficam em benchmarks/startup.py; aqui só o comportamento.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("openai", "numpy", "alembic")
+
+# Processo próprio: o pytest já importou parte dessas dependências
+INSPECT_BOOT = """
+import asyncio, json, sys
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+connections = []
+event.listen(Pool, "connect", lambda *args: connections.append(1))
+
+def report():
+    from app.services import ai_service
+    return {
+        "modules": [m for m in %r if m in sys.modules],
+        "connections": len(connections),
+        "openai_clients": ai_service.get_client.cache_info().currsize,
+    }
+
+import main
+result = {"import": report()}
+
+async def boot():
+    async with main.app.router.lifespan_context(main.app):
+        result["lifespan"] = report()
+
+asyncio.run(boot())
+print(json.dumps(result))
+""" % (HEAVY_MODULES,)
+
+def inspect_boot(database_url: str) -> dict:
+    env = {**os.environ, "DATABASE_URL": database_url, "SQL_ECHO": "false", "SCHEMA_CHECK_ON_STARTUP": "false"}
+    result = subprocess.run(
+        [sys.executable, "-c", INSPECT_BOOT], cwd=BASE_DIR, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_import_and_lifespan_are_side_effect_free(tmp_path):
+    database_path = tmp_path / "never-created.db"
+    result = inspect_boot(f"sqlite:///{database_path}")
+    for stage in ("import", "lifespan"):
+        assert result[stage]["modules"] == [], f"{stage}: dependências pesadas devem ser importadas sob demanda"
+        assert result[stage]["connections"] == 0, f"{stage}: o boot não deve conectar ao banco"
+        assert result[stage]["openai_clients"] == 0, f"{stage}: o cliente da OpenAI é criado na primeira geração"
+    assert not database_path.exists()
+
+def test_schema_check_runs_in_background(migrated_database):
+    from fastapi.testclient import TestClient
+    from main import app
+    
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 5
+        while not (schema := client.get("/health").json()["schema"])["checked"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+    assert schema["up_to_date"], schema